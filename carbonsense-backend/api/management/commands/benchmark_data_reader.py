@@ -0,0 +1,80 @@
+"""
+Compare `json.load` against the streaming projection reader on data/*.json.
+
+Usage:
+    python manage.py benchmark_data_reader
+    python manage.py benchmark_data_reader --repeat 5
+
+For each sector file in `UC_FIELDS`, reports parse time (best of
+`--repeat`), peak Python allocation during the parse and the size still
+held by the result, measured with tracemalloc.
+"""
+
+import gc
+import json
+import os
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+
+from api.services.data_files import DATA_DIR, UC_FIELDS
+from api.services.json_projection import ijson, read_projected
+
+
+def _measure(path, parse, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        with open(path, "rb") as f:
+            started = time.perf_counter()
+            parse(f)
+            best = min(best, time.perf_counter() - started)
+
+    gc.collect()
+    tracemalloc.start()
+    with open(path, "rb") as f:
+        result = parse(f)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return best, peak, retained
+
+
+class Command(BaseCommand):
+    help = "Benchmark json.load vs the streaming field-projecting reader."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=3,
+            help="Timing runs per file; the best is reported (default: 3)",
+        )
+
+    def handle(self, *args, **options):
+        repeat = max(1, options["repeat"])
+        if ijson is None:
+            self.stdout.write(self.style.WARNING(
+                "ijson is not installed — the projection reader falls back to "
+                "json.load, so expect no memory savings."
+            ))
+
+        mb = 1024 * 1024
+        self.stdout.write(
+            f"{'file':<44} {'reader':<10} {'time ms':>9} {'peak MB':>9} {'held MB':>9}"
+        )
+        for filename, fields in UC_FIELDS.items():
+            path = os.path.join(DATA_DIR, filename)
+            if not os.path.exists(path):
+                self.stdout.write(self.style.WARNING(f"[SKIP] {filename} not found"))
+                continue
+            for label, parse in (
+                ("json.load", json.load),
+                ("projected", lambda f, fields=fields: read_projected(f, fields)),
+            ):
+                best, peak, retained = _measure(path, parse, repeat)
+                self.stdout.write(
+                    f"{filename:<44} {label:<10} {best * 1000:>9.1f} "
+                    f"{peak / mb:>9.2f} {retained / mb:>9.2f}"
+                )
@@ -0,0 +1,45 @@
+"""
+Compile the sector JSON files into a memory-mappable binary snapshot.
+
+Usage:
+    python manage.py compile_data_snapshot
+    python manage.py compile_data_snapshot --output /srv/carbonsense/snapshot
+
+Run after replacing any file in `data/` (and on deploy). Workers pick the
+new snapshot up on their next cube build; until then — or if the snapshot
+is missing or stale — they fall back to parsing the JSON files.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.services.data_snapshot import snapshot_dir, source_stamps, write_snapshot
+
+
+class Command(BaseCommand):
+    help = "Compile data/*.json into a columnar, memory-mapped emissions snapshot."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output",
+            default=None,
+            help="Snapshot directory (default: settings.DATA_SNAPSHOT_DIR)",
+        )
+
+    def handle(self, *args, **options):
+        directory = options["output"] or snapshot_dir()
+
+        missing = [name for name, stamp in source_stamps().items() if stamp is None]
+        for name in missing:
+            self.stdout.write(self.style.WARNING(f"[SKIP] {name} not found"))
+
+        started = time.perf_counter()
+        written = write_snapshot(directory)
+        elapsed = time.perf_counter() - started
+
+        for name, size in written.items():
+            self.stdout.write(f"  [OK] {name}: {size / 1024:.1f} KB")
+        self.stdout.write(self.style.SUCCESS(
+            f"\nSnapshot written to {directory} in {elapsed:.2f}s"
+        ))
@@ -0,0 +1,218 @@
+"""
+Create the indexes the API needs on the unmanaged forecast tables.
+
+Usage:
+    python manage.py ensure_indexes
+    python manage.py ensure_indexes --dry-run
+    python manage.py ensure_indexes --report-only
+
+`forecast_runs`, `locations`, `emission_points`, `location_summaries` and
+`aggregate_forecast_points` are `managed = False`, so migrations never
+index them, yet every endpoint filters `emission_points` by the location's
+run, `point_type` and `date`. For each index in `INDEXES` this command
+checks the live schema and:
+
+- skips it if the table or one of its columns doesn't exist,
+- skips it if an index with the same definition already exists (under any
+  name),
+- drops and rebuilds it if a previous `CONCURRENTLY` build left it invalid,
+- otherwise runs `CREATE INDEX CONCURRENTLY IF NOT EXISTS`, which doesn't
+  block the loader or the API while it builds. Partitioned tables (see
+  `partition_emission_points`) can't be indexed concurrently; they get a
+  plain `CREATE INDEX`, which every current and future partition inherits.
+
+It then prints `pg_stat_user_indexes` scan counts and sizes for every index
+on those tables, so unused ones are easy to spot.
+"""
+
+import os
+
+import psycopg2
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api.services.partitions import is_partitioned
+
+# (name, table, key columns, INCLUDE columns) — the INCLUDE columns make the
+# listed queries index-only scans.
+INDEXES = (
+    # Per-location series, latest-point lookups and the rollup refresh.
+    (
+        "emission_points_location_type_date",
+        "emission_points",
+        ("location_id", "point_type", "date"),
+        ("emissions",),
+    ),
+    # Timeline / stats over raw points, and `data_type` + date-range filters.
+    (
+        "emission_points_type_date",
+        "emission_points",
+        ("point_type", "date"),
+        ("location_id", "emissions"),
+    ),
+    # `/api/emissions/` ordering and keyset pagination on (date, id).
+    ("emission_points_date_id", "emission_points", ("date", "id"), ()),
+    # Every "active runs" filter joins through `locations.forecast_run_id`.
+    ("locations_forecast_run", "locations", ("forecast_run_id",), ("source",)),
+    # Recommendation analyzer looks locations up by source name.
+    ("locations_source", "locations", ("source",), ()),
+    # Loader replaces runs by sector + region.
+    ("forecast_runs_sector_region", "forecast_runs", ("sector", "region"), ()),
+    (
+        "aggregate_forecast_points_run_date",
+        "aggregate_forecast_points",
+        ("forecast_run_id", "date"),
+        (),
+    ),
+)
+
+TABLES = (
+    "forecast_runs",
+    "locations",
+    "emission_points",
+    "location_summaries",
+    "aggregate_forecast_points",
+)
+
+
+def _definition(columns, include):
+    sql = f"({', '.join(columns)})"
+    if include:
+        sql += f" INCLUDE ({', '.join(include)})"
+    return sql
+
+
+def _table_columns(cur, table):
+    cur.execute(
+        "SELECT column_name FROM information_schema.columns "
+        "WHERE table_schema = current_schema() AND table_name = %s",
+        (table,),
+    )
+    return {row[0] for row in cur.fetchall()}
+
+
+def _existing_indexes(cur, table):
+    """`{name: (definition tail, is_valid)}` for the indexes on `table`."""
+    cur.execute(
+        """
+        SELECT c.relname, pg_get_indexdef(i.indexrelid), i.indisvalid
+        FROM pg_index i
+        JOIN pg_class c ON c.oid = i.indexrelid
+        JOIN pg_class t ON t.oid = i.indrelid
+        WHERE t.relname = %s AND t.relnamespace = current_schema()::regnamespace
+        """,
+        (table,),
+    )
+    existing = {}
+    for name, indexdef, valid in cur.fetchall():
+        # "CREATE INDEX name ON public.t USING btree (a, b) INCLUDE (c)"
+        tail = indexdef.split(" USING btree ", 1)[-1]
+        existing[name] = (tail, valid)
+    return existing
+
+
+class Command(BaseCommand):
+    help = "Create missing indexes on the forecast tables and report index usage."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Print the statements that would run without executing them",
+        )
+        parser.add_argument(
+            "--report-only",
+            action="store_true",
+            help="Skip index creation; only print usage stats",
+        )
+
+    def handle(self, *args, **options):
+        db_url = os.environ.get("SUPABASE_DB_URL") or settings.DATABASES["default"].get("NAME")
+        if not db_url or not db_url.startswith(("postgres://", "postgresql://")):
+            raise CommandError(
+                "SUPABASE_DB_URL must be set to a Postgres URL for this command "
+                "(SQLite is not supported by the forecast schema)."
+            )
+
+        conn = psycopg2.connect(db_url, sslmode="require")
+        # CREATE INDEX CONCURRENTLY can't run inside a transaction block.
+        conn.autocommit = True
+        cur = conn.cursor()
+        try:
+            if not options["report_only"]:
+                self._ensure(cur, dry_run=options["dry_run"])
+            self._report(cur)
+        finally:
+            cur.close()
+            conn.close()
+
+    def _ensure(self, cur, dry_run):
+        columns_by_table = {}
+        for name, table, columns, include in INDEXES:
+            if table not in columns_by_table:
+                columns_by_table[table] = _table_columns(cur, table)
+            available = columns_by_table[table]
+            if not available:
+                self.stdout.write(f"  [SKIP] {name}: table {table} not found")
+                continue
+            missing = [c for c in (*columns, *include) if c not in available]
+            if missing:
+                self.stdout.write(f"  [SKIP] {name}: {table} has no {', '.join(missing)}")
+                continue
+
+            definition = _definition(columns, include)
+            existing = _existing_indexes(cur, table)
+            twin = next(
+                (n for n, (tail, valid) in existing.items() if tail == definition and valid),
+                None,
+            )
+            if twin is not None:
+                self.stdout.write(f"  [OK] {name}: present as {twin}")
+                continue
+
+            concurrently = "" if is_partitioned(cur, table) else " CONCURRENTLY"
+            statements = []
+            if name in existing:
+                # A failed or cancelled CONCURRENTLY build leaves an invalid
+                # index behind that IF NOT EXISTS would happily keep.
+                statements.append(f"DROP INDEX{concurrently} IF EXISTS {name}")
+            statements.append(
+                f"CREATE INDEX{concurrently} IF NOT EXISTS {name} ON {table} {definition}"
+            )
+
+            for sql in statements:
+                if dry_run:
+                    self.stdout.write(f"  [DRY-RUN] {sql}")
+                    continue
+                self.stdout.write(f"  [RUN] {sql}")
+                cur.execute(sql)
+            if not dry_run:
+                self.stdout.write(self.style.SUCCESS(f"  [OK] {name} created"))
+
+    def _report(self, cur):
+        cur.execute(
+            """
+            SELECT s.relname, s.indexrelname, s.idx_scan, s.idx_tup_read,
+                   s.idx_tup_fetch, pg_relation_size(s.indexrelid)
+            FROM pg_stat_user_indexes s
+            WHERE s.relname = ANY(%s) OR s.relname LIKE 'emission_points_run_%%'
+            ORDER BY s.relname, s.idx_scan DESC
+            """,
+            (list(TABLES),),
+        )
+        rows = cur.fetchall()
+        if not rows:
+            self.stdout.write("\nNo indexes found on the forecast tables.")
+            return
+
+        self.stdout.write("\nIndex usage (since the last stats reset):")
+        self.stdout.write(
+            f"  {'table':<26} {'index':<42} {'scans':>10} {'tup read':>12} "
+            f"{'tup fetch':>12} {'size':>10}"
+        )
+        for table, index, scans, read, fetched, size in rows:
+            marker = "  <- unused" if scans == 0 else ""
+            self.stdout.write(
+                f"  {table:<26} {index:<42} {scans:>10} {read:>12} "
+                f"{fetched:>12} {size / 1024 / 1024:>8.1f}MB{marker}"
+            )
@@ -6,10 +6,21 @@ Usage:
     python manage.py load_forecast_json data/transport.json
     python manage.py load_forecast_json data/waste.json
     python manage.py load_forecast_json data/transport_new.json
+    python manage.py load_forecast_json data/waste.json --warm-caches
 
-- Deletes any existing forecast_run for the same sector+region (cascade)
 - Inserts forecast_run, aggregate points, locations, model info, summaries, emission points
+  (into a new partition for the run when emission_points is partitioned,
+  see api.services.partitions)
 - Marks the new run as active
+- Refreshes the run's emission rollups (api.services.rollups)
+- Records each location's area_id slug for indexed lookups (api.services.area_index)
+- Just before commit, deletes any previous forecast_run for the same sector+region
+  (cascade), dropping its emission_points partition first when partitioned.
+  If forecast_runs or locations carry a unique index the new rows could
+  collide with (one not scoped by run id), the old runs are deleted first
+  instead, as before.
+- Bumps the dataset generation, invalidating every cached API payload
+- With --warm-caches, rebuilds every cached endpoint payload after commit
 - Handles v1 (LSTM), v2 (XGBoost+Prophet), v3 (waste), and v5 (transport_new) JSON formats
 
 NOTE: Before loading transport_new.json for the first time, run in your DB:
@@ -24,9 +35,15 @@ from datetime import datetime
 import psycopg2
 from dateutil.relativedelta import relativedelta
 from django.conf import settings
+from django.core.management import call_command
 from django.core.management.base import BaseCommand, CommandError
 from psycopg2.extras import execute_values
 
+from api.services.area_index import ensure_area_slug_table, refresh_run_area_slugs
+from api.services.generation import bump_generation_if_present, publish_generation
+from api.services.partitions import create_run_partition, drop_run_partitions, is_partitioned
+from api.services.rollups import ensure_rollup_tables, refresh_run_rollups
+
 
 def _load_json(filepath):
     with open(filepath, encoding="utf-8") as f:
@@ -188,6 +205,37 @@ def _insert_forecast_run(cur, meta):
     return cur.fetchone()[0]
 
 
+# Unique indexes on `table` that don't include any of `columns` — i.e. that
+# could be violated by a new run's rows while the old run's still exist.
+_CROSS_RUN_UNIQUE_SQL = """
+    SELECT i.indexrelid::regclass::text
+    FROM pg_index i
+    WHERE i.indrelid = to_regclass(%s) AND i.indisunique
+      AND NOT EXISTS (
+          SELECT 1 FROM pg_attribute a
+          WHERE a.attrelid = i.indrelid
+            AND a.attnum = ANY(i.indkey)
+            AND a.attname = ANY(%s)
+      )
+"""
+
+
+def _cross_run_unique_indexes(cur):
+    """
+    Unique indexes on `forecast_runs` / `locations` (tables this project
+    doesn't manage) that a replacement run could collide with before the
+    run it replaces is deleted.
+    """
+    found = []
+    for table, scoped_by in (
+        ("forecast_runs", ["id"]),
+        ("locations", ["id", "forecast_run_id"]),
+    ):
+        cur.execute(_CROSS_RUN_UNIQUE_SQL, (table, scoped_by))
+        found += [row[0] for row in cur.fetchall()]
+    return found
+
+
 def _insert_aggregate_points(cur, run_id, agg):
     rows = []
     dates = agg["dates"]
@@ -356,7 +404,11 @@ def _insert_summary(cur, location_id, loc):
         ))
 
 
-def _insert_emission_points(cur, location_id, loc):
+def _insert_emission_points(cur, location_id, loc, forecast_run_id=None):
+    """
+    Insert a location's chart points. Pass `forecast_run_id` when
+    `emission_points` is partitioned — it's the partition key.
+    """
     rows = []
     chart = loc.get("chart_data", {})
     if not chart:
@@ -407,7 +459,16 @@ def _insert_emission_points(cur, location_id, loc):
             actual, predicted, residual,
         ))
 
-    if rows:
+    if rows and forecast_run_id is not None:
+        execute_values(cur, """
+            INSERT INTO emission_points
+                (location_id, date, month_label, emissions, point_type,
+                 temperature, cdd, humidity,
+                 lower_ci, upper_ci, confidence,
+                 actual, predicted, residual, forecast_run_id)
+            VALUES %s
+        """, [row + (forecast_run_id,) for row in rows])
+    elif rows:
         execute_values(cur, """
             INSERT INTO emission_points
                 (location_id, date, month_label, emissions, point_type,
@@ -428,6 +489,11 @@ class Command(BaseCommand):
             "json_file",
             help="Path to a forecast JSON file (e.g. data/power_new.json)",
         )
+        parser.add_argument(
+            "--warm-caches",
+            action="store_true",
+            help="Run `warm_caches` after the load commits",
+        )
 
     def handle(self, *args, **options):
         filepath = options["json_file"]
@@ -461,18 +527,33 @@ class Command(BaseCommand):
         conn = psycopg2.connect(db_url, sslmode="require")
         cur = conn.cursor()
         try:
+            partitioned = is_partitioned(cur)
+            # The runs this load replaces. They're retired at the end, just
+            # before commit: dropping a partition takes an ACCESS EXCLUSIVE
+            # lock on emission_points that would otherwise block every
+            # reader for the whole load.
             cur.execute(
-                "DELETE FROM forecast_runs WHERE sector = %s AND region = %s",
+                "SELECT id FROM forecast_runs WHERE sector = %s AND region = %s",
                 (meta["sector"], meta["region"]),
             )
-            if cur.rowcount:
-                self.stdout.write(
-                    f"[CLEANUP] Deleted {cur.rowcount} previous run(s) for "
-                    f"{meta['sector']}/{meta['region']}"
-                )
+            retiring = [row[0] for row in cur.fetchall()]
+
+            # Inserting before deleting is only safe if nothing the new run
+            # writes is unique across runs; otherwise retire up front.
+            blocking = _cross_run_unique_indexes(cur) if retiring else []
+            if blocking:
+                self.stdout.write(self.style.WARNING(
+                    f"[WARN] unique index(es) {', '.join(blocking)} span runs; "
+                    "retiring the previous run before the load"
+                ))
+                self._retire_runs(cur, retiring, partitioned, meta)
+                retiring = []
 
             run_id = _insert_forecast_run(cur, meta)
             self.stdout.write(f"[OK] forecast_run inserted (id={run_id})")
+            if partitioned:
+                create_run_partition(cur, run_id)
+                self.stdout.write(f"[OK] emission_points partition created for run {run_id}")
 
             agg_count = 0
             if agg:
@@ -486,13 +567,31 @@ class Command(BaseCommand):
                 loc_id = _insert_location(cur, run_id, loc)
                 _insert_model_info(cur, loc_id, loc)
                 _insert_summary(cur, loc_id, loc)
-                ep_count = _insert_emission_points(cur, loc_id, loc)
+                ep_count = _insert_emission_points(
+                    cur, loc_id, loc, forecast_run_id=run_id if partitioned else None
+                )
                 total_ep += ep_count
                 status = loc.get("status", "ok")
                 name = loc.get("source") or loc.get("source_name") or "unknown"
                 self.stdout.write(f"  [OK] {name} ({status}): {ep_count} emission_points")
 
+            ensure_rollup_tables(cur)
+            refresh_run_rollups(cur, run_id)
+            self.stdout.write("[OK] emission rollups refreshed")
+
+            ensure_area_slug_table(cur)
+            slug_count = refresh_run_area_slugs(cur, run_id)
+            self.stdout.write(f"[OK] {slug_count} area slugs indexed")
+
+            if retiring:
+                self._retire_runs(cur, retiring, partitioned, meta)
+
+            generation = self._bump_generation(cur)
+
             conn.commit()
+            if generation is not None:
+                publish_generation(generation)
+                self.stdout.write(f"[OK] dataset generation -> {generation}")
             self.stdout.write(self.style.SUCCESS(
                 f"\nDONE — run={run_id}, aggregate={agg_count}, "
                 f"locations={len(locations)}, emission_points={total_ep}"
@@ -503,3 +602,33 @@ class Command(BaseCommand):
         finally:
             cur.close()
             conn.close()
+
+        if options["warm_caches"]:
+            call_command("warm_caches")
+
+    def _retire_runs(self, cur, run_ids, partitioned, meta):
+        """Delete the replaced runs (cascade), dropping their point partitions first."""
+        if partitioned:
+            # Drop the retiring runs' point partitions outright so the
+            # cascade below has no emission_points rows to delete.
+            dropped = drop_run_partitions(cur, run_ids)
+            if dropped:
+                self.stdout.write(f"[CLEANUP] Dropped {dropped} emission_points partition(s)")
+        cur.execute("DELETE FROM forecast_runs WHERE id = ANY(%s)", (run_ids,))
+        self.stdout.write(
+            f"[CLEANUP] Deleted {cur.rowcount} previous run(s) for "
+            f"{meta['sector']}/{meta['region']}"
+        )
+
+    def _bump_generation(self, cur):
+        """
+        Bump the cache generation in the load's transaction. A database that
+        hasn't been migrated yet has no counter table; the load still goes
+        through, but cached payloads then only refresh on CACHE_TTL.
+        """
+        generation = bump_generation_if_present(cur)
+        if generation is None:
+            self.stdout.write(self.style.WARNING(
+                "[SKIP] dataset_generation table missing — run `manage.py migrate`"
+            ))
+        return generation
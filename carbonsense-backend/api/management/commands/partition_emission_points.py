@@ -0,0 +1,66 @@
+"""
+Convert `emission_points` to a table partitioned by forecast run and point type.
+
+Usage:
+    python manage.py partition_emission_points
+    python manage.py partition_emission_points --drop-old
+
+Rebuilds the table in one transaction (see `api.services.partitions` for
+the layout): copies every row into per-run, per-point_type partitions,
+swaps the new table in under the old name and keeps the original as
+`emission_points_unpartitioned` unless `--drop-old` is given. Then runs
+`ensure_indexes` so the partitions get the API's indexes.
+
+The copy holds an exclusive lock on `emission_points` until it commits, so
+run it in a quiet window. From then on `load_forecast_json` creates and
+drops run partitions itself.
+"""
+
+import os
+
+import psycopg2
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from api.services.partitions import convert_to_partitioned, is_partitioned
+
+
+class Command(BaseCommand):
+    help = "Partition emission_points by forecast_run_id and point_type."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--drop-old",
+            action="store_true",
+            help="Drop the unpartitioned table after the copy instead of keeping it",
+        )
+
+    def handle(self, *args, **options):
+        db_url = os.environ.get("SUPABASE_DB_URL") or settings.DATABASES["default"].get("NAME")
+        if not db_url or not db_url.startswith(("postgres://", "postgresql://")):
+            raise CommandError(
+                "SUPABASE_DB_URL must be set to a Postgres URL for this command "
+                "(SQLite is not supported by the forecast schema)."
+            )
+
+        conn = psycopg2.connect(db_url, sslmode="require")
+        cur = conn.cursor()
+        try:
+            if is_partitioned(cur):
+                self.stdout.write("emission_points is already partitioned; nothing to do.")
+                return
+            copied = convert_to_partitioned(cur, keep_old=not options["drop_old"])
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cur.close()
+            conn.close()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Partitioned emission_points: {copied} rows copied"
+            + ("" if options["drop_old"] else " (old table kept as emission_points_unpartitioned)")
+        ))
+        call_command("ensure_indexes")
@@ -0,0 +1,80 @@
+"""
+Rebuild the emission rollup tables from `emission_points`, and the
+`location_area_slugs` index from `locations`.
+
+Usage:
+    python manage.py refresh_rollups
+    python manage.py refresh_rollups --run 42 --run 43
+
+`load_forecast_json` refreshes a run's rollups as part of every load; this
+is for backfilling runs loaded before the rollups existed, or repairing
+them after editing `emission_points` by hand. Until a run has rollups the
+aggregate endpoints read the raw points instead.
+"""
+
+import os
+
+import psycopg2
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api.services.area_index import ensure_area_slug_table, refresh_run_area_slugs
+from api.services.generation import bump_generation_if_present, publish_generation
+from api.services.rollups import ensure_rollup_tables, refresh_run_rollups
+
+
+class Command(BaseCommand):
+    help = "Rebuild emission rollups for every forecast run (or the given ones)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--run",
+            type=int,
+            action="append",
+            dest="run_ids",
+            help="Only refresh this forecast_run id (repeatable)",
+        )
+
+    def handle(self, *args, **options):
+        db_url = os.environ.get("SUPABASE_DB_URL") or settings.DATABASES["default"].get("NAME")
+        if not db_url or not db_url.startswith(("postgres://", "postgresql://")):
+            raise CommandError(
+                "SUPABASE_DB_URL must be set to a Postgres URL for this command "
+                "(SQLite is not supported by the forecast schema)."
+            )
+
+        conn = psycopg2.connect(db_url, sslmode="require")
+        cur = conn.cursor()
+        try:
+            ensure_rollup_tables(cur)
+            ensure_area_slug_table(cur)
+            run_ids = options["run_ids"]
+            if not run_ids:
+                cur.execute("SELECT id FROM forecast_runs ORDER BY id")
+                run_ids = [row[0] for row in cur.fetchall()]
+
+            for run_id in run_ids:
+                refresh_run_rollups(cur, run_id)
+                refresh_run_area_slugs(cur, run_id)
+                self.stdout.write(f"  [OK] run {run_id}")
+
+            generation = bump_generation_if_present(cur)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cur.close()
+            conn.close()
+
+        if generation is None:
+            self.stdout.write(self.style.WARNING(
+                "[SKIP] dataset_generation table missing — run `manage.py migrate`"
+            ))
+            self.stdout.write(self.style.SUCCESS(f"\nRefreshed rollups for {len(run_ids)} run(s)"))
+            return
+        publish_generation(generation)
+        self.stdout.write(self.style.SUCCESS(
+            f"\nRefreshed rollups for {len(run_ids)} run(s); "
+            f"dataset generation -> {generation}"
+        ))
@@ -0,0 +1,128 @@
+"""
+Build and store every cached read-endpoint payload ahead of traffic.
+
+Usage:
+    python manage.py warm_caches
+    python manage.py warm_caches --parallel 4
+    python manage.py warm_caches --only uc_summary --only stats
+
+Enumerates every parameter combination from the live data — `uc-summary`
+for each `data_type` × yearly / every available month, `stats`,
+`leaderboard`, `areas`, `point-sources` per sector and data type, the
+`emissions/latest` + `emissions/timeline` aggregates and `uc-boundaries` per
+zoom level — builds each payload with the same function the view uses and
+writes it under the same cache key. Run after `load_forecast_json` (or pass
+`--warm-caches` to it) and on deploy so no user request pays for a cold
+build.
+"""
+
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection
+
+from api.services.caching import store
+from api.services.runs import get_active_runs
+from api.views import (
+    areas,
+    emissions_aggregates,
+    leaderboard,
+    point_sources,
+    stats,
+    uc_boundaries,
+    uc_summary,
+)
+
+# Group name (for --only) → module exposing `warm_payloads()`.
+WARMERS = {
+    "uc_summary": uc_summary,
+    "stats": stats,
+    "leaderboard": leaderboard,
+    "areas": areas,
+    "point_sources": point_sources,
+    "emissions": emissions_aggregates,
+    "uc_boundaries": uc_boundaries,
+}
+
+
+def _payload_size(payload):
+    """Approximate response size: the payload as compact JSON."""
+    return len(json.dumps(payload, cls=DjangoJSONEncoder, separators=(",", ":")))
+
+
+def _warm_one(label, cache_key, build):
+    """Build one payload and store it. Returns (label, ms, bytes, error)."""
+    started = time.perf_counter()
+    try:
+        payload = build()
+        store(cache_key, payload)
+        return label, (time.perf_counter() - started) * 1000, _payload_size(payload), None
+    except Exception as e:  # noqa: BLE001 — report and keep warming the rest
+        return label, (time.perf_counter() - started) * 1000, 0, e
+    finally:
+        # Worker threads each open their own DB connection; don't leak them.
+        connection.close()
+
+
+class Command(BaseCommand):
+    help = "Pre-build and cache every read-endpoint payload."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--parallel",
+            type=int,
+            default=1,
+            help="Number of payloads to build concurrently (default 1)",
+        )
+        parser.add_argument(
+            "--only",
+            action="append",
+            choices=sorted(WARMERS),
+            help="Only warm this endpoint group (repeatable)",
+        )
+
+    def handle(self, *args, **options):
+        groups = options["only"] or list(WARMERS)
+        parallel = max(1, options["parallel"])
+
+        # The active-run list gates every DB-backed payload; re-read it so a
+        # load that just committed is what gets warmed.
+        runs = get_active_runs(refresh=True)
+        self.stdout.write(f"Active forecast runs: {len(runs)}")
+
+        jobs = []
+        for group in groups:
+            try:
+                jobs.extend(WARMERS[group].warm_payloads())
+            except Exception as e:  # noqa: BLE001
+                self.stdout.write(self.style.ERROR(f"  [FAIL] {group}: {e}"))
+
+        started = time.perf_counter()
+        if parallel == 1:
+            results = [_warm_one(*job) for job in jobs]
+        else:
+            with ThreadPoolExecutor(max_workers=parallel) as pool:
+                results = list(pool.map(lambda job: _warm_one(*job), jobs))
+        elapsed = time.perf_counter() - started
+
+        total_bytes = 0
+        failed = 0
+        for label, ms, size, error in results:
+            if error is not None:
+                failed += 1
+                self.stdout.write(self.style.ERROR(f"  [FAIL] {label}: {error}"))
+                continue
+            total_bytes += size
+            self.stdout.write(f"  [OK] {label}: {ms:.0f} ms, {size / 1024:.1f} KB")
+
+        summary = (
+            f"\nWarmed {len(results) - failed}/{len(results)} payloads "
+            f"({total_bytes / 1024:.1f} KB) in {elapsed:.2f}s"
+        )
+        if failed:
+            self.stdout.write(self.style.WARNING(summary))
+        else:
+            self.stdout.write(self.style.SUCCESS(summary))
@@ -159,3 +159,119 @@ class AggregateForecastPoint(models.Model):
     class Meta:
         managed = False
         db_table = 'aggregate_forecast_points'
+
+
+# ============================================================================
+# Managed bookkeeping
+# ============================================================================
+
+class DatasetGeneration(models.Model):
+    """
+    Single-row counter that `load_forecast_json` bumps in the same
+    transaction as every data load. Cache keys are namespaced by it (see
+    `api.services.generation`), so a load invalidates every cached payload
+    at once without waiting for a TTL.
+    """
+
+    generation = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'dataset_generation'
+
+    def __str__(self):
+        return f"generation {self.generation}"
+
+
+# ============================================================================
+# Unmanaged rollups — written by `load_forecast_json` (api.services.rollups)
+# ============================================================================
+
+class EmissionMonthlyRollup(models.Model):
+    """Sum of `emission_points.emissions` per run × point_type × date."""
+
+    forecast_run = models.ForeignKey(ForecastRun, on_delete=models.DO_NOTHING,
+                                     related_name='monthly_rollups')
+    point_type = models.CharField(max_length=20)
+    date = models.DateField()
+    total = models.FloatField()
+    point_count = models.IntegerField()
+
+    class Meta:
+        managed = False
+        db_table = 'emission_monthly_rollups'
+
+    def __str__(self):
+        return f"run {self.forecast_run_id} {self.point_type} {self.date}: {self.total}"
+
+
+class LocationPointTotal(models.Model):
+    """Sum and date range of a location's points, per point_type."""
+
+    location = models.ForeignKey(Location, on_delete=models.DO_NOTHING,
+                                 related_name='point_totals')
+    forecast_run = models.ForeignKey(ForecastRun, on_delete=models.DO_NOTHING,
+                                     related_name='location_totals')
+    point_type = models.CharField(max_length=20)
+    total = models.FloatField()
+    point_count = models.IntegerField()
+    first_date = models.DateField()
+    last_date = models.DateField()
+
+    class Meta:
+        managed = False
+        db_table = 'location_point_totals'
+
+    def __str__(self):
+        return f"location {self.location_id} {self.point_type}: {self.total}"
+
+
+class LocationLatestPoint(models.Model):
+    """A location's most recent point, per point_type."""
+
+    location = models.ForeignKey(Location, on_delete=models.DO_NOTHING,
+                                 related_name='latest_points')
+    forecast_run = models.ForeignKey(ForecastRun, on_delete=models.DO_NOTHING,
+                                     related_name='latest_points')
+    point_type = models.CharField(max_length=20)
+    date = models.DateField()
+    emissions = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = 'location_latest_points'
+
+    def __str__(self):
+        return f"location {self.location_id} {self.point_type} @ {self.date}"
+
+
+class RollupRun(models.Model):
+    """Marks a forecast run whose rollups have been refreshed."""
+
+    forecast_run = models.OneToOneField(ForecastRun, on_delete=models.DO_NOTHING,
+                                        primary_key=True)
+    refreshed_at = models.DateTimeField()
+
+    class Meta:
+        managed = False
+        db_table = 'emission_rollup_runs'
+
+    def __str__(self):
+        return f"run {self.forecast_run_id} refreshed {self.refreshed_at}"
+
+
+class LocationAreaSlug(models.Model):
+    """`make_area_id` slug of a location, for indexed area lookups."""
+
+    location = models.OneToOneField(Location, on_delete=models.DO_NOTHING,
+                                    primary_key=True, related_name='area_slug')
+    forecast_run = models.ForeignKey(ForecastRun, on_delete=models.DO_NOTHING,
+                                     related_name='area_slugs')
+    area_id = models.TextField()
+
+    class Meta:
+        managed = False
+        db_table = 'location_area_slugs'
+
+    def __str__(self):
+        return self.area_id
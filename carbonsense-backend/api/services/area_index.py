@@ -0,0 +1,140 @@
+"""
+`area_id` slug → location ids, without scanning `locations` per request.
+
+An area's public id is `make_area_id(source, sector)`, computed in Python,
+so every slug lookup (`/api/emissions/?area_id=`, `/api/areas/<id>/`, the
+recommendation analyzer) used to load every active location and slugify
+each one to find a match. Two layers replace that:
+
+- `location_area_slugs` — one row per location with its slug, indexed on
+  `area_id`, written by `load_forecast_json` in the load transaction
+  (`refresh_run_area_slugs`) and cascading from `locations`.
+- `area_slug_index()` — a per-process `{area_id: (location_id, ...)}` dict
+  built from that table with one query, once per dataset version (the
+  `dataset_key` changes on every load, so a reload rebuilds it).
+
+If the table is missing or doesn't cover every active run (data loaded
+before it existed), the dict is built by slugifying the active locations
+once instead — still one scan per version rather than one per request.
+"""
+
+import logging
+import threading
+
+from django.db import DatabaseError
+
+from api.models import Location, LocationAreaSlug, make_area_id
+
+from .generation import dataset_key
+from .runs import SECTOR_MAP, get_active_runs, sector_field
+
+logger = logging.getLogger(__name__)
+
+
+CREATE_AREA_SLUG_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS location_area_slugs (
+        location_id integer PRIMARY KEY REFERENCES locations(id) ON DELETE CASCADE,
+        forecast_run_id integer NOT NULL REFERENCES forecast_runs(id) ON DELETE CASCADE,
+        area_id text NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS location_area_slugs_area_id
+        ON location_area_slugs (area_id);
+    CREATE INDEX IF NOT EXISTS location_area_slugs_run
+        ON location_area_slugs (forecast_run_id);
+"""
+
+
+def ensure_area_slug_table(cur):
+    """Create `location_area_slugs` if this database doesn't have it yet."""
+    cur.execute(CREATE_AREA_SLUG_TABLE_SQL)
+
+
+def refresh_run_area_slugs(cur, run_id):
+    """Rewrite the slugs of one forecast run's locations, in the caller's transaction."""
+    cur.execute("SELECT sector FROM forecast_runs WHERE id = %s", (run_id,))
+    row = cur.fetchone()
+    sector = SECTOR_MAP.get((row[0] if row else "").lower(), "energy")
+
+    cur.execute("DELETE FROM location_area_slugs WHERE forecast_run_id = %s", (run_id,))
+    cur.execute("SELECT id, source FROM locations WHERE forecast_run_id = %s", (run_id,))
+    rows = [(loc_id, run_id, make_area_id(source, sector)) for loc_id, source in cur.fetchall()]
+    if rows:
+        cur.executemany(
+            "INSERT INTO location_area_slugs (location_id, forecast_run_id, area_id) "
+            "VALUES (%s, %s, %s)",
+            rows,
+        )
+    return len(rows)
+
+
+# ----------------------------------------------------------------------------
+# Per-process index
+# ----------------------------------------------------------------------------
+
+_index_lock = threading.Lock()
+_index = (None, {})  # (dataset key it was built for, {area_id: location ids})
+
+
+def _slug_pairs_from_table(run_ids):
+    """`[(area_id, location_id)]` from `location_area_slugs`, or None if it can't serve."""
+    try:
+        covered = set(
+            LocationAreaSlug.objects.filter(forecast_run_id__in=run_ids)
+            .values_list("forecast_run_id", flat=True)
+            .distinct()
+        )
+        if covered != set(run_ids):
+            return None
+        return list(
+            LocationAreaSlug.objects.filter(forecast_run_id__in=run_ids)
+            .order_by("location_id")
+            .values_list("area_id", "location_id")
+        )
+    except DatabaseError as e:
+        logger.warning("Area slug table unavailable (%s); slugifying locations", e)
+        return None
+
+
+def _slug_pairs_from_locations(runs):
+    run_sector = {r.id: sector_field(r) for r in runs}
+    locs = (
+        Location.objects.filter(forecast_run_id__in=list(run_sector))
+        .order_by("id")
+        .values_list("id", "source", "forecast_run_id")
+    )
+    return [
+        (make_area_id(source, run_sector.get(run_id, "energy")), loc_id)
+        for loc_id, source, run_id in locs
+    ]
+
+
+def area_slug_index():
+    """`{area_id: (location_id, ...)}` over the active runs, rebuilt per dataset version."""
+    global _index
+    version = dataset_key("area_slug_index")
+    built_for, index = _index
+    if built_for == version:
+        return index
+
+    with _index_lock:
+        built_for, index = _index
+        if built_for == version:
+            return index
+
+        runs = get_active_runs()
+        run_ids = [r.id for r in runs]
+        pairs = _slug_pairs_from_table(run_ids) if run_ids else []
+        if pairs is None:
+            pairs = _slug_pairs_from_locations(runs)
+
+        grouped = {}
+        for area_id, loc_id in pairs:
+            grouped.setdefault(area_id, []).append(loc_id)
+        index = {area_id: tuple(ids) for area_id, ids in grouped.items()}
+        _index = (version, index)
+        return index
+
+
+def location_ids_for_area(area_id):
+    """Location ids (ascending) whose slug is `area_id`; empty if unknown."""
+    return area_slug_index().get(area_id, ())
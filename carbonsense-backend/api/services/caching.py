@@ -0,0 +1,122 @@
+"""
+Stampede-safe read-through caching for the API views.
+
+A plain `cache.get` → build → `cache.set` lets every request that misses at
+the same moment rebuild the same payload: when `uc_summary_*`, `api_stats`
+or a large `emissions:*` entry expires under load, Postgres and the JSON
+builders see one rebuild per concurrent request. `get_or_build` instead:
+
+- **Single-flight across workers.** Only the request that wins
+  `cache.add(<key>:lock)` builds. `add` is atomic on Redis and locmem, so
+  this holds across processes and nodes sharing the cache. Losers wait
+  briefly for the winner's value, and build themselves only if the lock
+  holder takes longer than `lock_timeout` (e.g. it crashed).
+- **Soft and hard expiry.** Entries are stored as `(payload, soft_expiry)`
+  with the backend timeout as the hard expiry. Past the soft expiry the
+  stale payload is still served while one worker refreshes it in a
+  background thread (stale-while-revalidate), so nobody waits on the
+  rebuild at the TTL boundary.
+
+Writers that fill the cache ahead of traffic (`manage.py warm_caches`) use
+`store()` so entries have the same shape.
+"""
+
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+
+from .runs import CACHE_TTL
+
+logger = logging.getLogger(__name__)
+
+
+# How long after a store an entry counts as fresh. Past this it is served
+# stale and refreshed in the background; CACHE_TTL is the hard expiry.
+SOFT_TTL = getattr(settings, "API_CACHE_SOFT_TTL", 3600)
+
+# Upper bound on one build; a lock older than this is treated as abandoned.
+LOCK_TIMEOUT = 30
+
+_WAIT_STEP = 0.05
+_WAIT_MAX_STEP = 0.5
+
+
+def _lock_key(key):
+    return f"{key}:lock"
+
+
+def store(key, payload, ttl=None, soft_ttl=None):
+    """Write `payload` under `key` in the envelope `get_or_build` reads."""
+    soft_ttl = SOFT_TTL if soft_ttl is None else soft_ttl
+    cache.set(key, (payload, time.time() + soft_ttl), CACHE_TTL if ttl is None else ttl)
+
+
+def _unwrap(entry):
+    """(payload, soft_expiry) from a cached envelope, or (None, None)."""
+    if isinstance(entry, tuple) and len(entry) == 2 and isinstance(entry[1], float):
+        return entry
+    return None, None
+
+
+def _build_and_store(key, build, ttl, soft_ttl, cache_if):
+    payload = build()
+    if cache_if is None or cache_if(payload):
+        store(key, payload, ttl, soft_ttl)
+    return payload
+
+
+def _refresh_in_background(key, build, ttl, soft_ttl, cache_if):
+    def run():
+        try:
+            _build_and_store(key, build, ttl, soft_ttl, cache_if)
+        except Exception:
+            logger.exception("Background refresh of %s failed; serving stale", key)
+        finally:
+            cache.delete(_lock_key(key))
+            # The thread got its own DB connection; don't leave it open.
+            connection.close()
+
+    threading.Thread(target=run, daemon=True, name=f"refresh:{key}").start()
+
+
+def get_or_build(key, build, ttl=None, soft_ttl=None, cache_if=None,
+                 lock_timeout=LOCK_TIMEOUT):
+    """
+    Cached value of `build()` under `key`, built at most once at a time.
+
+    `cache_if(payload)` can veto storing a result (e.g. an empty list while
+    no forecast runs are active), so it gets rebuilt on the next request.
+    """
+    payload, soft_expiry = _unwrap(cache.get(key))
+    if soft_expiry is not None:
+        if soft_expiry > time.time():
+            return payload
+        # Stale: one worker refreshes, everyone keeps getting the old value.
+        if cache.add(_lock_key(key), 1, lock_timeout):
+            _refresh_in_background(key, build, ttl, soft_ttl, cache_if)
+        return payload
+
+    # Cold miss: one worker builds, the rest wait for its result.
+    lock_key = _lock_key(key)
+    if cache.add(lock_key, 1, lock_timeout):
+        try:
+            return _build_and_store(key, build, ttl, soft_ttl, cache_if)
+        finally:
+            cache.delete(lock_key)
+
+    deadline = time.monotonic() + lock_timeout
+    step = _WAIT_STEP
+    while time.monotonic() < deadline:
+        time.sleep(step)
+        step = min(step * 2, _WAIT_MAX_STEP)
+        payload, soft_expiry = _unwrap(cache.get(key))
+        if soft_expiry is not None:
+            return payload
+        if cache.get(lock_key) is None:
+            # The builder finished without storing (vetoed or failed).
+            break
+    return _build_and_store(key, build, ttl, soft_ttl, cache_if)
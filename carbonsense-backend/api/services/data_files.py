@@ -3,37 +3,116 @@ Per-UC sector builders that read forecast JSON files in `data/`.
 
 The dashboard's UC-summary endpoint joins four files (transport, buildings,
 waste, industry) at request time. Parsing is expensive — these files run
-into the megabytes — so each file is parsed once per worker and held in an
-in-process dict (`_json_cache`). After the first request, all subsequent
-ones are dict lookups.
+into the megabytes — so each file is parsed once per worker, keeping only
+the paths the builders read (`UC_FIELDS`), and held in a `DataFileRegistry`.
+The registry reloads a file in the background when it changes on disk and
+publishes a dataset version (`data_version()`) for response cache keys.
 
 The energy total still comes from the DB but uses an aggregate query, not
-a per-location loop.
+a per-location loop; the per-UC energy split locates each facility in its
+UC polygon (`uc_geometry.locate_ucs`).
 """
 
-import json
-import math
 import os
 
 from django.conf import settings
 from django.db.models import Sum
 
-from api.models import EmissionPoint, Location
+from api.models import Location
 
+from .caching import get_or_build
+from .data_registry import DataFileRegistry
+from .generation import dataset_key
+from .rollups import location_monthly_means, monthly_totals
 from .runs import get_active_runs, safe_float, sector_field
 
 
 DATA_DIR = os.path.join(settings.BASE_DIR, "data")
 
-_json_cache: dict = {}
+_registry = DataFileRegistry(
+    DATA_DIR,
+    check_interval=getattr(settings, "DATA_FILE_CHECK_INTERVAL", 5.0),
+)
+
+
+# Paths the UC builders, date readers and emissions cube read from each
+# sector file. Everything else (rag_chunks, mitigation_index, run_audit,
+# per-UC point_sources, …) is skipped by the streaming reader.
+UC_FIELDS = {
+    "carbonsense_transport_v16.json": (
+        "division_total.dates",
+        *(
+            f"uc_emissions.*.{key}"
+            for key in (
+                "uc_code", "uc_name", "centroid_lat", "centroid_lon", "area_km2",
+                "forecast", "historical", "spatial_weights", "dominant_source",
+                "risk_flags",
+            )
+        ),
+    ),
+    "carbonsense_buildings_v15.json": (
+        *(
+            f"uc_data.*.{key}"
+            for key in (
+                "uc_code", "uc_name", "coordinates", "area_km2", "annual_emissions",
+                "risk",
+            )
+        ),
+        *(
+            f"uc_data.*.{series}.*.{key}"
+            for series in ("historical", "forecast")
+            for key in ("date", "total_t", "residential_t", "non_residential_t")
+        ),
+    ),
+    "carbonsense_per_location_waste_v2_3.json": (
+        *(
+            f"aggregate_forecast.uc_allocation.*.{key}"
+            for key in (
+                "uc_code", "emissions", "historical", "historical_annual",
+                "rank_in_district", "intensity_t_per_km2",
+            )
+        ),
+        *(
+            f"aggregate_forecast.uc_allocation.*.chart_data.*.{key}"
+            for key in (
+                "date", "predicted", "point_src_share", "area_sw_share",
+                "area_ww_share",
+            )
+        ),
+    ),
+    "carbonsense_lahore_spatial_v1.2.json": tuple(
+        f"uc_emissions.*.{key}"
+        for key in (
+            "uc_id", "centroid", "area_km2", "forecast", "historical",
+            "dominant_sector", "risk_flags",
+        )
+    ),
+}
+
+
+def load_data_file(filename, fields=None):
+    """
+    Load + cache a JSON file under `data/` (reloaded when it changes).
+
+    `fields` is an optional projection of dotted paths (see
+    `json_projection`); only those parts of the file are materialised.
+    """
+    return _registry.get(filename, fields)
+
 
+def load_uc_file(filename):
+    """`load_data_file` projected to what the UC builders need."""
+    return load_data_file(filename, UC_FIELDS.get(filename))
 
-def load_data_file(filename):
-    """Load + cache a JSON file under `data/`."""
-    if filename not in _json_cache:
-        with open(os.path.join(DATA_DIR, filename), encoding="utf-8") as f:
-            _json_cache[filename] = json.load(f)
-    return _json_cache[filename]
+
+def data_version():
+    """Content hash of the data files currently served by this worker."""
+    return _registry.version()
+
+
+def derived_data(key, build):
+    """Memoize `build()` until any data file changes."""
+    return _registry.derived(key, build)
 
 
 # ----------------------------------------------------------------------------
@@ -43,7 +122,7 @@ def load_data_file(filename):
 
 def build_transport_by_uc(data_type):
     """Transport: 151 UCs from carbonsense_transport_v16.json."""
-    data = load_data_file("carbonsense_transport_v16.json")
+    data = load_uc_file("carbonsense_transport_v16.json")
     result = {}
     for uc in data.get("uc_emissions", []):
         code = uc.get("uc_code", "")
@@ -99,7 +178,7 @@ def build_transport_by_uc(data_type):
 
 def build_buildings_by_uc(data_type):
     """Buildings: 151 UCs from carbonsense_buildings_v15.json."""
-    data = load_data_file("carbonsense_buildings_v15.json")
+    data = load_uc_file("carbonsense_buildings_v15.json")
     result = {}
     for uc in data.get("uc_data", []):
         code = uc.get("uc_code", "")
@@ -141,7 +220,7 @@ def build_buildings_by_uc(data_type):
 
 def build_waste_by_uc(data_type):
     """Waste: 108 UCs from carbonsense_per_location_waste_v2_3.json."""
-    data = load_data_file("carbonsense_per_location_waste_v2_3.json")
+    data = load_uc_file("carbonsense_per_location_waste_v2_3.json")
     alloc = data.get("aggregate_forecast", {}).get("uc_allocation", [])
     result = {}
 
@@ -186,39 +265,29 @@ def build_waste_by_uc(data_type):
 
 
 def build_industry_uc_mapping():
-    """Build UC_XXXX -> PB-LAH-UCYYY mapping via centroid matching (cached)."""
-    cache_key = "_industry_uc_mapping"
-    if cache_key in _json_cache:
-        return _json_cache[cache_key]
-
-    spatial = load_data_file("carbonsense_lahore_spatial_v1.2.json")
-    geo_path = os.path.join(DATA_DIR, "lahore_ucs.geojson")
-    with open(geo_path, encoding="utf-8") as f:
-        geo = json.load(f)
-
-    def _dist(lat1, lon1, lat2, lon2):
-        return math.sqrt((lat1 - lat2) ** 2 + (lon1 - lon2) ** 2)
-
-    mapping = {}
-    for suc in spatial.get("uc_emissions", []):
-        sc = suc["centroid"]
-        best_dist = 999
-        best_code = ""
-        for gf in geo["features"]:
-            gp = gf["properties"]
-            d = _dist(sc[0], sc[1], gp["centroid_lat"], gp["centroid_lon"])
-            if d < best_dist:
-                best_dist = d
-                best_code = f"PB-LAH-UC{gp['uc_id']:03d}"
-        mapping[suc["uc_id"]] = best_code
-
-    _json_cache[cache_key] = mapping
-    return mapping
+    """Build UC_XXXX -> PB-LAH-UCYYY mapping via point-in-polygon (cached)."""
+    return derived_data("industry_uc_mapping", _build_industry_uc_mapping)
+
+
+def _build_industry_uc_mapping():
+    # Deferred: uc_geometry reads its geojson through this module.
+    from .uc_geometry import locate_ucs
+
+    spatial = load_uc_file("carbonsense_lahore_spatial_v1.2.json")
+    ucs = [suc for suc in spatial.get("uc_emissions", []) if suc.get("centroid")]
+    # Spatial UCs carry `centroid` as [lat, lon]. The few whose centroid
+    # falls just outside every boundary go to the nearest UC, as before.
+    codes = locate_ucs(
+        [suc["centroid"][1] for suc in ucs],
+        [suc["centroid"][0] for suc in ucs],
+        nearest=True,
+    )
+    return {suc["uc_id"]: code or "" for suc, code in zip(ucs, codes, strict=True)}
 
 
 def build_industry_by_uc(data_type):
     """Industry/Manufacturing: 151 UCs from carbonsense_lahore_spatial_v1.2.json."""
-    data = load_data_file("carbonsense_lahore_spatial_v1.2.json")
+    data = load_uc_file("carbonsense_lahore_spatial_v1.2.json")
     uc_mapping = build_industry_uc_mapping()
     result = {}
 
@@ -268,22 +337,17 @@ def build_energy_total(data_type):
     """
     Power/Energy: total emissions across all energy point sources.
 
-    Single aggregate query over `EmissionPoint` (was a per-location loop
-    that fired one query per site). Falls back to JSON if the DB has no
-    energy data for the requested point type.
+    Single aggregate query over the per-date rollups (or `EmissionPoint`
+    when they aren't current). Falls back to JSON if the DB has no energy
+    data for the requested point type.
     """
     energy_run_ids = [
         run.id for run in get_active_runs() if sector_field(run) == "energy"
     ]
     total = 0.0
     if energy_run_ids:
-        agg = (
-            EmissionPoint.objects.filter(
-                location__forecast_run_id__in=energy_run_ids,
-                point_type=data_type,
-            )
-            .aggregate(total=Sum("emissions"))
-        )
+        points_qs, value_field, _ = monthly_totals(energy_run_ids)
+        agg = points_qs.filter(point_type=data_type).aggregate(total=Sum(value_field))
         total = safe_float(agg.get("total"))
 
     if total == 0.0:
@@ -298,47 +362,96 @@ def build_energy_total(data_type):
     return total
 
 
-def get_monthly_dates(data_type):
-    """Return the list of date strings for each sector's monthly_t arrays."""
-    t_data = load_data_file("carbonsense_transport_v16.json")
+def build_energy_by_uc(data_type):
+    """
+    `{uc_code: mean monthly tonnes}` for the energy point sources, each
+    facility attributed to the UC polygon its coordinates fall in.
+    Facilities outside every UC (most plants sit beyond the city) aren't
+    attributed. Cached per data type and dataset version.
+    """
+    return get_or_build(
+        dataset_key("energy_by_uc", data_type), lambda: _build_energy_by_uc(data_type)
+    )
+
+
+def _build_energy_by_uc(data_type):
+    from .uc_geometry import locate_ucs
+
+    energy_run_ids = [
+        run.id for run in get_active_runs() if sector_field(run) == "energy"
+    ]
+    if not energy_run_ids:
+        return {}
+
+    # Each facility over its own months, so one with a shorter history
+    # isn't diluted by the other facilities' dates.
+    means = location_monthly_means(energy_run_ids, data_type)
+    locations = list(
+        Location.objects.filter(
+            id__in=list(means), latitude__isnull=False, longitude__isnull=False
+        ).values_list("id", "latitude", "longitude")
+    )
+    if not locations:
+        return {}
+
+    codes = locate_ucs([lon for _, _, lon in locations], [lat for _, lat, _ in locations])
+    by_uc = {}
+    for (loc_id, _, _), code in zip(locations, codes, strict=True):
+        if code:
+            by_uc[code] = by_uc.get(code, 0.0) + means[loc_id]
+    return by_uc
+
+
+def _transport_dates(data_type):
+    t_data = load_uc_file("carbonsense_transport_v16.json")
     if data_type == "forecast":
-        t_dates = t_data.get("division_total", {}).get("dates", [])
-    else:
-        first_uc = t_data["uc_emissions"][0] if t_data.get("uc_emissions") else {}
-        series = first_uc.get("historical", {}).get("monthly_series", [])
-        t_dates = [m["date"] for m in series]
+        return t_data.get("division_total", {}).get("dates", [])
+    first_uc = t_data["uc_emissions"][0] if t_data.get("uc_emissions") else {}
+    series = first_uc.get("historical", {}).get("monthly_series", [])
+    return [m["date"] for m in series]
+
 
-    b_data = load_data_file("carbonsense_buildings_v15.json")
+def _buildings_dates(data_type):
+    b_data = load_uc_file("carbonsense_buildings_v15.json")
     first_buc = b_data["uc_data"][0] if b_data.get("uc_data") else {}
     b_series = first_buc.get(
         "forecast" if data_type == "forecast" else "historical", []
     )
-    b_dates = [row["date"] for row in b_series if isinstance(row, dict)]
+    return [row["date"] for row in b_series if isinstance(row, dict)]
+
 
-    w_data = load_data_file("carbonsense_per_location_waste_v2_3.json")
+def _waste_dates(data_type):
+    w_data = load_uc_file("carbonsense_per_location_waste_v2_3.json")
     alloc = w_data.get("aggregate_forecast", {}).get("uc_allocation", [])
     first_wuc = alloc[0] if alloc else {}
     if data_type == "forecast":
         w_series = first_wuc.get("chart_data", [])
-        w_dates = [row["date"] for row in w_series if isinstance(row, dict)]
     else:
         w_series = first_wuc.get("historical", [])
-        w_dates = [row["date"] for row in w_series if isinstance(row, dict)]
+    return [row["date"] for row in w_series if isinstance(row, dict)]
 
-    i_data = load_data_file("carbonsense_lahore_spatial_v1.2.json")
+
+def _industry_dates(data_type):
+    i_data = load_uc_file("carbonsense_lahore_spatial_v1.2.json")
     first_iuc = i_data["uc_emissions"][0] if i_data.get("uc_emissions") else {}
     if data_type == "forecast":
         i_series = first_iuc.get("forecast", {}).get("monthly_series", [])
     else:
         i_series = first_iuc.get("historical", {}).get("monthly_series", [])
-    i_dates = [m["date"] for m in i_series if isinstance(m, dict)]
-
-    return {
-        "transport": t_dates,
-        "buildings": b_dates,
-        "waste": w_dates,
-        "industry": i_dates,
-    }
+    return [m["date"] for m in i_series if isinstance(m, dict)]
+
+
+SECTOR_DATES = {
+    "transport": _transport_dates,
+    "buildings": _buildings_dates,
+    "waste": _waste_dates,
+    "industry": _industry_dates,
+}
+
+
+def get_monthly_dates(data_type):
+    """Return the list of date strings for each sector's monthly_t arrays."""
+    return {sector: dates(data_type) for sector, dates in SECTOR_DATES.items()}
 
 
 def find_month_index(dates, target_month):
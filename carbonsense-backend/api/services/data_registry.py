@@ -0,0 +1,243 @@
+"""
+Hot-reloadable, version-stamped registry for the JSON files in `data/`.
+
+Replaces the old never-invalidated `_json_cache` dict:
+
+- **Keyed by path, stamp and content hash.** Each loaded file remembers the
+  `(size, mtime_ns)` it was read at and the SHA-256 of its bytes.
+- **Background reload.** At most every `DATA_FILE_CHECK_INTERVAL` seconds an
+  access re-stats the file. If it changed, a daemon thread re-parses it
+  while requests keep being served from the current copy; the new copy is
+  swapped in with a single dict assignment. A touch that doesn't change the
+  bytes only refreshes the stamp.
+- **Projections.** `get(name, fields=(...))` streams the file through
+  `json_projection.read_projected`, so only the declared paths are ever
+  materialised; each projection is its own view of the same digest.
+- **Single-flight.** Concurrent first loads of the same file (threaded
+  workers) share one parse; the other callers wait on a per-file lock.
+- **Dataset version.** `version()` is a short hash over the content digest
+  of every file in `data/` — the *served* digest for loaded files, so the
+  version only moves once the new data is actually live. It is identical
+  across workers for identical files, which makes it safe to embed in
+  shared cache keys (`uc_summary_*`, …).
+- **Derived values.** `derived(key, build)` memoizes anything computed from
+  the files (the emissions cube, the industry UC mapping) and rebuilds it
+  when the version moves.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+
+from .json_projection import read_projected
+
+logger = logging.getLogger(__name__)
+
+
+DATA_FILE_SUFFIXES = (".json", ".geojson")
+
+
+class _DataFile:
+    """One file at one content digest, with every projection parsed from it."""
+
+    __slots__ = ("stamp", "digest", "views", "checked_at", "reloading")
+
+    def __init__(self, stamp, digest, views):
+        self.stamp = stamp
+        self.digest = digest
+        self.views = views
+        self.checked_at = time.monotonic()
+        self.reloading = False
+
+
+class _HashingReader:
+    """File wrapper that hashes bytes as the parser pulls them."""
+
+    def __init__(self, f):
+        self._f = f
+        self.sha = hashlib.sha256()
+
+    def read(self, size=-1):
+        chunk = self._f.read(size)
+        self.sha.update(chunk)
+        return chunk
+
+    def hexdigest(self):
+        # Parsers may stop before EOF (trailing whitespace); hash the rest.
+        for chunk in iter(lambda: self._f.read(1 << 20), b""):
+            self.sha.update(chunk)
+        return self.sha.hexdigest()
+
+
+def _stamp(path):
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+
+def _digest_file(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class DataFileRegistry:
+    def __init__(self, directory, check_interval=5.0):
+        self.directory = directory
+        self.check_interval = check_interval
+        self._files: dict[str, _DataFile] = {}
+        self._derived: dict = {}
+        # Digests of files on disk that haven't been loaded: {name: (stamp, digest)}.
+        self._disk_digests: dict = {}
+        self._version = None
+        self._version_checked_at = 0.0
+        self._mutex = threading.Lock()
+        self._locks = defaultdict(threading.Lock)
+
+    def _lock_for(self, key):
+        with self._mutex:
+            return self._locks[key]
+
+    def _path(self, filename):
+        return os.path.join(self.directory, filename)
+
+    def _read(self, filename, fields):
+        """(stamp, digest, data) for one projection. Raises if the file is absent."""
+        path = self._path(filename)
+        stamp = _stamp(path)
+        with open(path, "rb") as f:
+            reader = _HashingReader(f)
+            data = read_projected(reader, fields)
+            return stamp, reader.hexdigest(), data
+
+    # ------------------------------------------------------------------
+    # Files
+    # ------------------------------------------------------------------
+
+    def get(self, filename, fields=None):
+        """
+        Parsed contents of `data/<filename>`, projected to `fields`.
+
+        Each distinct projection is parsed once and kept for as long as the
+        file's bytes don't change; all projections of a file reload together.
+        """
+        entry = self._files.get(filename)
+        if entry is not None:
+            self._maybe_reload(filename, entry)
+            if fields in entry.views:
+                return entry.views[fields]
+
+        with self._lock_for(filename):
+            entry = self._files.get(filename)
+            if entry is not None and fields in entry.views:
+                return entry.views[fields]
+            stamp, digest, data = self._read(filename, fields)
+            if entry is not None and entry.digest == digest:
+                entry.views[fields] = data
+            else:
+                # First load, or the file changed under us: start a new
+                # entry so every view it holds comes from the same bytes.
+                self._files[filename] = _DataFile(stamp, digest, {fields: data})
+                self._version_checked_at = 0.0
+            return data
+
+    def _maybe_reload(self, filename, entry):
+        now = time.monotonic()
+        if entry.reloading or now - entry.checked_at < self.check_interval:
+            return
+        entry.checked_at = now
+        try:
+            stamp = _stamp(self._path(filename))
+        except FileNotFoundError:
+            # Mid-replace or deleted: keep serving what we have.
+            return
+        if stamp == entry.stamp:
+            return
+        entry.reloading = True
+        threading.Thread(
+            target=self._reload, args=(filename, entry), daemon=True
+        ).start()
+
+    def _reload(self, filename, entry):
+        try:
+            with self._lock_for(filename):
+                views = {}
+                stamp = digest = None
+                for fields in list(entry.views):
+                    stamp, digest, views[fields] = self._read(filename, fields)
+                if digest == entry.digest:
+                    entry.stamp = stamp
+                    return
+                self._files[filename] = _DataFile(stamp, digest, views)
+                self._version_checked_at = 0.0
+            logger.info("Reloaded data file %s (%s)", filename, digest[:12])
+        except (OSError, ValueError) as e:
+            # Half-written file or bad JSON — retry on a later check.
+            logger.warning("Could not reload data file %s: %s", filename, e)
+        finally:
+            entry.reloading = False
+
+    # ------------------------------------------------------------------
+    # Version
+    # ------------------------------------------------------------------
+
+    def _served_digest(self, name):
+        entry = self._files.get(name)
+        if entry is not None:
+            # Make sure a change on disk gets picked up even if nobody has
+            # asked for this file since.
+            self._maybe_reload(name, entry)
+            return entry.digest
+        path = self._path(name)
+        try:
+            stamp = _stamp(path)
+        except FileNotFoundError:
+            return None
+        known = self._disk_digests.get(name)
+        if known and known[0] == stamp:
+            return known[1]
+        digest = _digest_file(path)
+        self._disk_digests[name] = (stamp, digest)
+        return digest
+
+    def version(self):
+        """Short content hash over every data file, as currently served."""
+        now = time.monotonic()
+        if self._version is not None and now - self._version_checked_at < self.check_interval:
+            return self._version
+        try:
+            names = sorted(
+                n for n in os.listdir(self.directory) if n.endswith(DATA_FILE_SUFFIXES)
+            )
+        except FileNotFoundError:
+            names = []
+        h = hashlib.sha256()
+        for name in names:
+            digest = self._served_digest(name)
+            if digest:
+                h.update(f"{name}:{digest}\n".encode())
+        self._version = h.hexdigest()[:12]
+        self._version_checked_at = now
+        return self._version
+
+    # ------------------------------------------------------------------
+    # Derived values
+    # ------------------------------------------------------------------
+
+    def derived(self, key, build):
+        """`build()` memoized per dataset version, single-flight per key."""
+        version = self.version()
+        hit = self._derived.get(key)
+        if hit is not None and hit[0] == version:
+            return hit[1]
+        with self._lock_for(f"derived:{key}"):
+            hit = self._derived.get(key)
+            if hit is not None and hit[0] == version:
+                return hit[1]
+            value = build()
+            self._derived[key] = (version, value)
+            return value
@@ -0,0 +1,181 @@
+"""
+Compiled binary snapshot of the sector JSON files.
+
+`load_data_file` parses the multi-MB transport / buildings / waste files
+separately in every worker and keeps the full Python object tree alive.
+`manage.py compile_data_snapshot` instead writes the emissions cube once,
+in a columnar on-disk layout:
+
+    <DATA_SNAPSHOT_DIR>/
+        snapshot.json                  string table + per-UC scalar records
+        historical-<digest>.npy        float64 values[uc, month, field]
+        forecast-<digest>.npy
+
+The `.npy` files are opened with `mmap_mode="r"`, so every worker on a node
+maps the same physical pages and nobody pays the JSON parse at startup.
+Only the small `snapshot.json` (names, date axes, scalar fields) is parsed
+per process.
+
+The manifest records the size + mtime of every source file it was built
+from. If any of them has changed since, the snapshot is ignored and
+`get_cube` falls back to building from JSON — a stale snapshot never
+serves wrong numbers, it just stops being fast until it is recompiled.
+"""
+
+import hashlib
+import json
+import logging
+import os
+
+import numpy as np
+from django.conf import settings
+
+from .data_files import DATA_DIR
+from .emissions_cube import DATA_TYPES, FIELDS, EmissionsCube
+
+logger = logging.getLogger(__name__)
+
+
+SNAPSHOT_FORMAT = 1
+MANIFEST_NAME = "snapshot.json"
+
+# Every file the emissions cube reads. A change to any of them invalidates
+# the snapshot.
+SOURCE_FILES = (
+    "carbonsense_transport_v16.json",
+    "carbonsense_buildings_v15.json",
+    "carbonsense_per_location_waste_v2_3.json",
+    "carbonsense_lahore_spatial_v1.2.json",
+    "lahore_ucs.geojson",
+)
+
+
+def snapshot_dir():
+    return getattr(settings, "DATA_SNAPSHOT_DIR", os.path.join(DATA_DIR, "snapshot"))
+
+
+def source_stamps():
+    """{filename: [size, mtime_ns]} for each source file (None if absent)."""
+    stamps = {}
+    for name in SOURCE_FILES:
+        try:
+            st = os.stat(os.path.join(DATA_DIR, name))
+        except FileNotFoundError:
+            stamps[name] = None
+        else:
+            stamps[name] = [st.st_size, st.st_mtime_ns]
+    return stamps
+
+
+def _atomic_write(path, write):
+    tmp = f"{path}.tmp-{os.getpid()}"
+    with open(tmp, "wb") as f:
+        write(f)
+    os.replace(tmp, path)
+
+
+def write_snapshot(directory=None):
+    """
+    Build both cubes from JSON and write them as a snapshot.
+
+    The array files are content-addressed and the manifest is replaced
+    last, so a worker reading concurrently sees either the old snapshot or
+    the new one — never a mix. Returns {filename: size_in_bytes}.
+    """
+    directory = directory or snapshot_dir()
+    os.makedirs(directory, exist_ok=True)
+
+    stamps = source_stamps()
+    manifest = {
+        "format": SNAPSHOT_FORMAT,
+        "fields": list(FIELDS),
+        "sources": stamps,
+        "cubes": {},
+    }
+    written = {}
+    for data_type in DATA_TYPES:
+        cube = EmissionsCube.from_json(data_type)
+        values = np.ascontiguousarray(cube.values, dtype=np.float64)
+        digest = hashlib.sha256(values.tobytes()).hexdigest()[:16]
+        filename = f"{data_type}-{digest}.npy"
+        path = os.path.join(directory, filename)
+        _atomic_write(path, lambda f, arr=values: np.save(f, arr))
+        written[filename] = os.path.getsize(path)
+        manifest["cubes"][data_type] = {
+            "values": filename,
+            "shape": list(values.shape),
+            "sector_dates": cube.sector_dates,
+            "records": cube.records,
+            "uc_meta": cube.uc_meta,
+        }
+
+    payload = json.dumps(manifest, separators=(",", ":")).encode("utf-8")
+    _atomic_write(os.path.join(directory, MANIFEST_NAME), lambda f: f.write(payload))
+    written[MANIFEST_NAME] = len(payload)
+
+    # Drop array files no manifest points at any more.
+    live = {c["values"] for c in manifest["cubes"].values()}
+    for name in os.listdir(directory):
+        if name.endswith(".npy") and name not in live:
+            try:
+                os.remove(os.path.join(directory, name))
+            except OSError:
+                pass
+    return written
+
+
+_manifest_cache: dict = {}
+
+
+def _read_manifest(directory):
+    """Parse `snapshot.json` once per (path, mtime)."""
+    path = os.path.join(directory, MANIFEST_NAME)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    cached = _manifest_cache.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    with open(path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    _manifest_cache[path] = (mtime, manifest)
+    return manifest
+
+
+def load_snapshot(data_type, directory=None):
+    """
+    Memory-mapped `EmissionsCube` for `data_type`, or None.
+
+    None means "no usable snapshot" (missing, other format, or built from
+    different source files) and callers should build from JSON instead.
+    """
+    directory = directory or snapshot_dir()
+    try:
+        manifest = _read_manifest(directory)
+    except (OSError, ValueError) as e:
+        logger.warning("Data snapshot unreadable, ignoring: %s", e)
+        return None
+    if not manifest or manifest.get("format") != SNAPSHOT_FORMAT:
+        return None
+    if manifest.get("fields") != list(FIELDS):
+        return None
+    if manifest.get("sources") != source_stamps():
+        logger.info("Data snapshot is stale (source files changed); using JSON")
+        return None
+
+    entry = manifest["cubes"].get(data_type)
+    if not entry:
+        return None
+    try:
+        values = np.load(os.path.join(directory, entry["values"]), mmap_mode="r")
+        return EmissionsCube(
+            data_type,
+            sector_dates=entry["sector_dates"],
+            records=entry["records"],
+            values=values,
+            uc_meta=entry["uc_meta"],
+        )
+    except (OSError, ValueError) as e:
+        logger.warning("Data snapshot for %s unusable, ignoring: %s", data_type, e)
+        return None
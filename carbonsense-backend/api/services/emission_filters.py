@@ -0,0 +1,59 @@
+"""
+Row filters shared by `/api/emissions/` and `/api/emissions/export/`.
+
+    area_id      area slug (see `area_index`)
+    data_type    point_type, e.g. historical / forecast
+    start_date   inclusive `YYYY-MM-DD`
+    end_date     inclusive `YYYY-MM-DD`
+
+`parse_emission_filters` validates the query params up front, so a bad
+value is a 400 before anything is queried or streamed; `filtered_points`
+turns the parsed filters into the active-run `EmissionPoint` queryset.
+"""
+
+import datetime
+
+from api.models import EmissionPoint
+
+from .area_index import location_ids_for_area
+
+
+class InvalidFilter(ValueError):
+    pass
+
+
+def _parse_date(params, name):
+    raw = params.get(name)
+    if not raw:
+        return None
+    try:
+        return datetime.date.fromisoformat(raw)
+    except ValueError as e:
+        raise InvalidFilter(f"{name} must be a date in YYYY-MM-DD format") from e
+
+
+def parse_emission_filters(params):
+    """`{area_id, data_type, start_date, end_date}` (None when absent). Raises InvalidFilter."""
+    return {
+        "area_id": params.get("area_id") or None,
+        "data_type": params.get("data_type") or None,
+        "start_date": _parse_date(params, "start_date"),
+        "end_date": _parse_date(params, "end_date"),
+    }
+
+
+def filtered_points(filters, runs):
+    """Active-run emission points narrowed by parsed `filters`."""
+    queryset = EmissionPoint.objects.filter(
+        location__forecast_run_id__in=[r.id for r in runs],
+    ).select_related("location", "location__forecast_run")
+
+    if filters["area_id"]:
+        queryset = queryset.filter(location_id__in=list(location_ids_for_area(filters["area_id"])))
+    if filters["data_type"]:
+        queryset = queryset.filter(point_type=filters["data_type"])
+    if filters["start_date"]:
+        queryset = queryset.filter(date__gte=filters["start_date"])
+    if filters["end_date"]:
+        queryset = queryset.filter(date__lte=filters["end_date"])
+    return queryset
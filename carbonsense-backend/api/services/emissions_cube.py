@@ -0,0 +1,371 @@
+"""
+Array-backed UC × month × field emissions cube.
+
+The UC-summary endpoint used to call the four `build_*_by_uc` builders on
+every cache miss, walking the parsed JSON and rebuilding thousands of small
+dicts and lists for each `view_mode`/`month` combination. The cube does that
+walk once per `data_type` and keeps the monthly numbers in one float64
+array:
+
+    values[uc, month, field]
+
+- `uc` follows `uc_codes` (sorted union of every sector's UC codes).
+- `month` follows `months` (sorted union of every sector's `YYYY-MM` keys),
+  so all sectors share one aligned date axis.
+- `field` follows `fields`: one total per sector (`"transport"`) plus the
+  monthly sub-sector splits the files carry (`"buildings.residential"`, …).
+
+Cells a sector has no data for are NaN, so a UC missing from the waste file
+or a month outside the industry horizon is distinguishable from a real
+zero. Yearly, monthly and window views are vectorised slices and sums over
+the month axis instead of JSON walks. A window is summed directly over its
+slice of the month axis — a few dozen months per UC — which keeps a
+memory-mapped cube read-only and shared between workers.
+
+The non-monthly per-UC fields (annual totals, CIs, ranks, risk flags) come
+from the existing builders, called once at cube build time, so the payload
+shape stays exactly what the builders define.
+"""
+
+import logging
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+
+from .data_files import (
+    SECTOR_DATES,
+    build_buildings_by_uc,
+    build_industry_by_uc,
+    build_industry_uc_mapping,
+    build_transport_by_uc,
+    build_waste_by_uc,
+    derived_data,
+    load_uc_file,
+)
+from .runs import safe_float
+
+logger = logging.getLogger(__name__)
+
+
+DATA_TYPES = ("historical", "forecast")
+
+# Sector order is the order sectors appear in the UC-summary payload.
+SECTORS = ("transport", "buildings", "waste", "industry")
+
+# Key of each sector's annual total in its builder record.
+ANNUAL_KEYS = {
+    "transport": "annual_t",
+    "buildings": "total_t",
+    "waste": "annual_t",
+    "industry": "annual_t",
+}
+
+# Monthly series per (sector, data_type): where the per-UC rows live and
+# which row keys map onto which cube fields. The first field of each sector
+# is its total and is what `monthly_t` / `display_t` are built from.
+_MONTHLY_SPECS = {
+    "transport": {
+        "historical": {"total_t": "transport"},
+        "forecast": {"monthly_t": "transport"},
+    },
+    "buildings": {
+        "historical": {
+            "total_t": "buildings",
+            "residential_t": "buildings.residential",
+            "non_residential_t": "buildings.non_residential",
+        },
+        "forecast": {
+            "total_t": "buildings",
+            "residential_t": "buildings.residential",
+            "non_residential_t": "buildings.non_residential",
+        },
+    },
+    "waste": {
+        "historical": {
+            "total_t": "waste",
+            "point_source_t": "waste.point_source",
+            "area_sw_t": "waste.solid_waste",
+            "area_ww_t": "waste.wastewater",
+        },
+        "forecast": {
+            "predicted": "waste",
+            "point_src_share": "waste.point_source",
+            "area_sw_share": "waste.solid_waste",
+            "area_ww_share": "waste.wastewater",
+        },
+    },
+    "industry": {
+        "historical": {"total_t": "industry"},
+        "forecast": {"total_t": "industry"},
+    },
+}
+
+FIELDS = tuple(
+    dict.fromkeys(
+        field
+        for sector in SECTORS
+        for spec in _MONTHLY_SPECS[sector].values()
+        for field in spec.values()
+    )
+)
+
+_BUILDERS = {
+    "transport": build_transport_by_uc,
+    "buildings": build_buildings_by_uc,
+    "waste": build_waste_by_uc,
+    "industry": build_industry_by_uc,
+}
+
+
+# ----------------------------------------------------------------------------
+# Raw monthly rows per sector. Each returns {uc_code: [row_dict, …]} where
+# rows are aligned with that sector's `get_monthly_dates` axis.
+# ----------------------------------------------------------------------------
+
+
+def _transport_rows(data_type):
+    data = load_uc_file("carbonsense_transport_v16.json")
+    rows = {}
+    for uc in data.get("uc_emissions", []):
+        if data_type == "forecast":
+            monthly = uc.get("forecast", {}).get("monthly_t", [])
+            rows[uc.get("uc_code", "")] = [{"monthly_t": v} for v in monthly]
+        else:
+            rows[uc.get("uc_code", "")] = uc.get("historical", {}).get(
+                "monthly_series", []
+            )
+    return rows
+
+
+def _buildings_rows(data_type):
+    data = load_uc_file("carbonsense_buildings_v15.json")
+    rows = {}
+    for uc in data.get("uc_data", []):
+        series = uc.get("forecast" if data_type == "forecast" else "historical", [])
+        rows[uc.get("uc_code", "")] = series if isinstance(series, list) else []
+    return rows
+
+
+def _waste_rows(data_type):
+    data = load_uc_file("carbonsense_per_location_waste_v2_3.json")
+    rows = {}
+    for uc in data.get("aggregate_forecast", {}).get("uc_allocation", []):
+        code = uc.get("uc_code", "")
+        if not code:
+            continue
+        key = "chart_data" if data_type == "forecast" else "historical"
+        rows[code] = [m for m in uc.get(key, []) if isinstance(m, dict)]
+    return rows
+
+
+def _industry_rows(data_type):
+    data = load_uc_file("carbonsense_lahore_spatial_v1.2.json")
+    uc_mapping = build_industry_uc_mapping()
+    rows = {}
+    for suc in data.get("uc_emissions", []):
+        uc_code = uc_mapping.get(suc["uc_id"], "")
+        if uc_code:
+            rows[uc_code] = suc.get(data_type, {}).get("monthly_series", [])
+    return rows
+
+
+_ROW_READERS = {
+    "transport": _transport_rows,
+    "buildings": _buildings_rows,
+    "waste": _waste_rows,
+    "industry": _industry_rows,
+}
+
+
+def _load_sector(sector, data_type):
+    """(dates, records, rows) for one sector; empty if its file is missing."""
+    try:
+        dates = SECTOR_DATES[sector](data_type)
+        records = _BUILDERS[sector](data_type)
+        rows = _ROW_READERS[sector](data_type)
+    except FileNotFoundError as e:
+        logger.warning("Emissions cube: %s data unavailable (%s)", sector, e)
+        return [], {}, {}
+    # `monthly_t` lives in the cube; keep only the scalar fields here.
+    records = {
+        code: {k: v for k, v in rec.items() if k != "monthly_t"}
+        for code, rec in records.items()
+    }
+    return dates, records, rows
+
+
+def _build_uc_meta(uc_codes):
+    """Name / area / centroid per UC, preferring transport over buildings."""
+    transport = {
+        uc["uc_code"]: uc
+        for uc in load_uc_file("carbonsense_transport_v16.json").get(
+            "uc_emissions", []
+        )
+    }
+    buildings = {
+        uc["uc_code"]: uc
+        for uc in load_uc_file("carbonsense_buildings_v15.json").get("uc_data", [])
+    }
+    meta = {}
+    for code in uc_codes:
+        tmeta = transport.get(code, {})
+        bmeta = buildings.get(code, {})
+        meta[code] = {
+            "uc_name": tmeta.get("uc_name") or bmeta.get("uc_name", ""),
+            "area_km2": safe_float(tmeta.get("area_km2") or bmeta.get("area_km2")),
+            "centroid": [
+                safe_float(
+                    tmeta.get("centroid_lat")
+                    or (bmeta.get("coordinates", {}).get("lat"))
+                ),
+                safe_float(
+                    tmeta.get("centroid_lon")
+                    or (bmeta.get("coordinates", {}).get("lon"))
+                ),
+            ],
+        }
+    return meta
+
+
+class EmissionsCube:
+    """
+    UC × month × field float64 cube for a single `data_type`.
+
+    Axes are derived from `sector_dates` and `records`; `values` may be any
+    array of the matching shape — a freshly built one, or a read-only
+    memory map from a compiled snapshot (see `data_snapshot`).
+    """
+
+    def __init__(self, data_type, sector_dates, records, values=None, uc_meta=None):
+        self.data_type = data_type
+        self.sector_dates = sector_dates
+        self.records = records
+
+        self.months = sorted(
+            {d[:7] for dates in self.sector_dates.values() for d in dates}
+        )
+        self.month_index = {m: i for i, m in enumerate(self.months)}
+
+        # Per-sector month positions on the shared axis, so a sector's own
+        # `monthly_t` is `values[uc, sector_months[sector], field]`.
+        self.sector_months = {
+            sector: np.array(
+                [self.month_index[d[:7]] for d in self.sector_dates.get(sector, [])],
+                dtype=np.intp,
+            )
+            for sector in SECTORS
+        }
+
+        self.uc_codes = sorted(
+            set().union(*(recs.keys() for recs in self.records.values()))
+        )
+        self.uc_index = {code: i for i, code in enumerate(self.uc_codes)}
+        self.fields = FIELDS
+        self.field_index = {f: i for i, f in enumerate(FIELDS)}
+
+        shape = (len(self.uc_codes), len(self.months), len(self.fields))
+        if values is None:
+            values = np.full(shape, np.nan)
+        elif values.shape != shape:
+            raise ValueError(f"Cube values have shape {values.shape}, expected {shape}")
+        self.values = values
+        self.uc_meta = uc_meta if uc_meta is not None else {}
+
+    @classmethod
+    def from_json(cls, data_type):
+        """Build the cube by walking the sector JSON files in `data/`."""
+        loaded = {sector: _load_sector(sector, data_type) for sector in SECTORS}
+        cube = cls(
+            data_type,
+            sector_dates={sector: dates for sector, (dates, _, _) in loaded.items()},
+            records={sector: recs for sector, (_, recs, _) in loaded.items()},
+        )
+        for sector, (_, records, rows) in loaded.items():
+            cube._fill_sector(sector, records, rows)
+        cube.uc_meta = _build_uc_meta(cube.uc_codes)
+        return cube
+
+    def _fill_sector(self, sector, records, rows):
+        positions = self.sector_months[sector]
+        spec = _MONTHLY_SPECS[sector][self.data_type]
+        columns = [self.field_index[f] for f in spec.values()]
+        keys = list(spec.keys())
+        for code in records:
+            series = rows.get(code, [])[: len(positions)]
+            if not series:
+                continue
+            block = np.array(
+                [[safe_float(r.get(k)) for k in keys] for r in series],
+                dtype=np.float64,
+            )
+            ui = self.uc_index[code]
+            self.values[ui, positions[: len(series)][:, None], columns] = block
+
+    # ------------------------------------------------------------------
+    # Views
+    # ------------------------------------------------------------------
+
+    def has_sector(self, sector):
+        """Boolean (n_uc,) mask of UCs that have a record for `sector`."""
+        records = self.records.get(sector, {})
+        return np.array([code in records for code in self.uc_codes], dtype=bool)
+
+    def series(self, field):
+        """(n_uc, n_month) view of one field, NaN where absent."""
+        return self.values[:, :, self.field_index[field]]
+
+    def monthly_t(self, sector, uc_code):
+        """A UC's monthly totals on the sector's own date axis."""
+        row = self.values[
+            self.uc_index[uc_code], self.sector_months[sector], self.field_index[sector]
+        ]
+        return row.tolist()
+
+    def annual(self, sector):
+        """(n_uc,) of each UC's builder annual total, 0.0 where absent."""
+        records = self.records.get(sector, {})
+        key = ANNUAL_KEYS[sector]
+        return np.array(
+            [safe_float(records.get(code, {}).get(key)) for code in self.uc_codes],
+            dtype=np.float64,
+        )
+
+    def month(self, field, month):
+        """(n_uc,) values for `YYYY-MM`, 0.0 where absent or out of range."""
+        idx = self.month_index.get(month)
+        if idx is None:
+            return np.zeros(len(self.uc_codes))
+        return np.nan_to_num(self.values[:, idx, self.field_index[field]])
+
+    def month_range(self, start="", end=""):
+        """
+        Month positions `[start, stop)` covering `YYYY-MM` months `start`
+        through `end` inclusive. Either bound may be empty (open) or fall
+        outside the axis; the range is clipped to the months present.
+        """
+        lo = bisect_left(self.months, start) if start else 0
+        hi = bisect_right(self.months, end) if end else len(self.months)
+        return lo, max(lo, hi)
+
+    def window(self, field, start, stop):
+        """
+        (n_uc,) sum of `field` over month positions `[start, stop)`, NaN as
+        0. Summed straight off `values`, so a memory-mapped cube stays
+        shared instead of growing a per-process prefix-sum copy.
+        """
+        return np.nansum(self.values[:, start:stop, self.field_index[field]], axis=1)
+
+
+def get_cube(data_type):
+    """
+    Per-`data_type` cube, rebuilt when any data file changes.
+
+    Prefers the compiled snapshot (memory-mapped, shared across workers)
+    and falls back to parsing the JSON files when there is no fresh one.
+    """
+    from .data_snapshot import load_snapshot
+
+    return derived_data(
+        f"emissions_cube:{data_type}",
+        lambda: load_snapshot(data_type) or EmissionsCube.from_json(data_type),
+    )
@@ -0,0 +1,132 @@
+"""
+Dataset generation — the namespace for every cached API payload.
+
+Cached views used to live under fixed keys (`areas_list`, `api_stats`, …)
+with a one-hour TTL, so a data load was either invisible for up to an hour
+or the TTL had to be short. Instead:
+
+- `load_forecast_json` bumps a single-row counter (`dataset_generation`)
+  in the same transaction as the load, then publishes the new value to
+  the cache.
+- Every cache key is built with `dataset_key(...)`, which embeds the
+  current generation and the `data/` file version. A load or a file swap
+  moves the namespace, so old entries are simply never read again and
+  age out of the backend on their own.
+- Because invalidation is exact, payloads are stored with a long TTL
+  (`CACHE_TTL`, default a week) rather than an hour.
+
+The generation itself is cached for `DATASET_GENERATION_TTL` seconds and
+re-read from the database after that, so a load is picked up even by
+processes whose cache the loader couldn't write to (per-process locmem in
+dev).
+"""
+
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError
+
+logger = logging.getLogger(__name__)
+
+
+GENERATION_CACHE_KEY = "dataset_generation"
+
+# Bump when the shape of a cached payload changes, so a deploy never serves
+# entries written by the previous code for the same data.
+#   2  /api/stats/ computed in one aggregation pass
+#   3  uc-summary energy attributed per UC by point-in-polygon
+#   4  leaderboard entries carry `sector` and `value`; ranked lists per metric
+#   5  columnar uc-summary keeps the window `month_label`
+#   6  per-UC energy averaged over each facility's own months
+PAYLOAD_SCHEMA = 6
+
+
+def _generation_ttl():
+    return getattr(settings, "DATASET_GENERATION_TTL", 60)
+
+
+def read_generation():
+    """Current counter from the database; 0 if the table isn't there yet."""
+    from api.models import DatasetGeneration
+
+    try:
+        row = DatasetGeneration.objects.order_by("id").only("generation").first()
+    except DatabaseError as e:
+        logger.warning("Dataset generation unavailable (%s); using 0", e)
+        return 0
+    return row.generation if row else 0
+
+
+def current_generation():
+    """Generation the cache namespace is currently keyed on."""
+    generation = cache.get(GENERATION_CACHE_KEY)
+    if generation is None:
+        generation = read_generation()
+        # `add`, not `set`: never overwrite a value the loader just published.
+        cache.add(GENERATION_CACHE_KEY, generation, _generation_ttl())
+    return generation
+
+
+def publish_generation(generation):
+    """Make `generation` live immediately (call after the bump commits)."""
+    cache.set(GENERATION_CACHE_KEY, generation, _generation_ttl())
+
+
+# Raw SQL for the loader, which writes through psycopg2 rather than the ORM.
+BUMP_GENERATION_SQL = """
+    WITH bumped AS (
+        UPDATE dataset_generation
+        SET generation = generation + 1, updated_at = now()
+        WHERE id = (SELECT min(id) FROM dataset_generation)
+        RETURNING generation
+    )
+    SELECT generation FROM bumped
+"""
+
+INSERT_GENERATION_SQL = """
+    INSERT INTO dataset_generation (generation, updated_at)
+    VALUES (1, now())
+    RETURNING generation
+"""
+
+
+def bump_generation(cur):
+    """
+    Increment the counter on a psycopg2 cursor, inside the caller's
+    transaction, and return the new value.
+    """
+    cur.execute(BUMP_GENERATION_SQL)
+    row = cur.fetchone()
+    if row is None:
+        cur.execute(INSERT_GENERATION_SQL)
+        row = cur.fetchone()
+    return row[0]
+
+
+def bump_generation_if_present(cur):
+    """
+    `bump_generation` under a savepoint; None, with the transaction still
+    usable, if the database hasn't been migrated and has no counter table.
+    """
+    import psycopg2
+
+    cur.execute("SAVEPOINT bump_generation")
+    try:
+        return bump_generation(cur)
+    except psycopg2.errors.UndefinedTable:
+        cur.execute("ROLLBACK TO SAVEPOINT bump_generation")
+        return None
+
+
+def dataset_key(*parts):
+    """
+    Cache key for a payload derived from the current dataset.
+
+        dataset_key("point_sources", sector, data_type)
+        -> "point_sources:energy:historical@s6.g7.3f9a0c1b22de"
+    """
+    from .data_files import data_version
+
+    stamp = f"s{PAYLOAD_SCHEMA}.g{current_generation()}.{data_version()}"
+    return f"{':'.join(str(p) for p in parts)}@{stamp}"
@@ -0,0 +1,188 @@
+"""
+Streaming, field-projecting reader for the JSON files in `data/`.
+
+Consumers only touch a small part of each sector file — transport's UC
+builders read `uc_emissions[*].forecast/historical/spatial_weights`, never
+`rag_chunks`, `mitigation_index`, `run_audit` or the per-UC
+`point_sources`. `json.load` still materialises all of it. `read_projected`
+walks the file as a stream of parser events (ijson) and only builds Python
+objects for a declared projection of paths, so neither the peak parse nor
+the resident result carries the unused parts.
+
+A projection is a tuple of dotted paths:
+
+    ("metadata.sector", "uc_emissions.*.uc_code", "uc_emissions.*.forecast")
+
+- Each path selects a whole subtree; everything else is skipped.
+- `*` steps into every element of an array.
+- The result keeps the original nesting: objects along a selected path keep
+  only the selected keys, arrays keep all their elements.
+
+Falls back to `json.load` + in-memory projection when ijson isn't
+installed, so results are identical either way (just without the memory
+savings).
+"""
+
+import json
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+
+_WILDCARD = "*"
+_CAPTURE = True
+
+
+def compile_projection(paths):
+    """Turn dotted paths into a nested {segment: subtree | True} spec."""
+    spec = {}
+    for path in paths:
+        node = spec
+        parts = path.split(".")
+        for part in parts[:-1]:
+            child = node.get(part)
+            if child is _CAPTURE:
+                break
+            node = node.setdefault(part, {})
+        else:
+            node[parts[-1]] = _CAPTURE
+    return spec
+
+
+def _child_spec(spec, key):
+    if spec is _CAPTURE:
+        return _CAPTURE
+    return spec.get(key)
+
+
+def project(value, spec):
+    """Apply a compiled projection to an already-parsed value."""
+    if spec is _CAPTURE:
+        return value
+    if isinstance(value, dict):
+        return {
+            k: project(v, spec[k]) for k, v in value.items() if k in spec
+        }
+    if isinstance(value, list):
+        item_spec = spec.get(_WILDCARD)
+        if item_spec is None:
+            return []
+        return [project(v, item_spec) for v in value]
+    return value
+
+
+class _Frame:
+    __slots__ = ("spec", "container", "key")
+
+    def __init__(self, spec, container):
+        self.spec = spec
+        self.container = container
+        self.key = None
+
+
+def _stream_project(fileobj, spec):
+    """Single pass over ijson events, materialising only the projection."""
+    stack = []
+    result = None
+    builder = None
+    builder_depth = 0
+    skip_depth = 0
+    # Share one str per distinct key, like `json.load` does — otherwise every
+    # one of 151 UC objects carries its own copy of every key.
+    keys = {}
+
+    def attach(value):
+        nonlocal result
+        if not stack:
+            result = value
+            return
+        frame = stack[-1]
+        if isinstance(frame.container, dict):
+            frame.container[frame.key] = value
+        else:
+            frame.container.append(value)
+
+    for event, value in ijson.basic_parse(fileobj, use_float=True):
+        if event == "map_key":
+            value = keys.setdefault(value, value)
+        if builder is not None:
+            builder.event(event, value)
+            if event in ("start_map", "start_array"):
+                builder_depth += 1
+            elif event in ("end_map", "end_array"):
+                builder_depth -= 1
+            if builder_depth == 0:
+                attach(builder.value)
+                builder = None
+            continue
+
+        if skip_depth:
+            if event in ("start_map", "start_array"):
+                skip_depth += 1
+            elif event in ("end_map", "end_array"):
+                skip_depth -= 1
+            continue
+
+        if event == "map_key":
+            stack[-1].key = value
+            continue
+        if event in ("end_map", "end_array"):
+            stack.pop()
+            continue
+
+        # A value starts here: decide whether to skip, capture or descend.
+        if not stack:
+            node_spec = spec
+        elif isinstance(stack[-1].container, dict):
+            node_spec = _child_spec(stack[-1].spec, stack[-1].key)
+        else:
+            node_spec = _child_spec(stack[-1].spec, _WILDCARD)
+
+        is_start = event in ("start_map", "start_array")
+        if node_spec is None:
+            if is_start:
+                skip_depth = 1
+            continue
+        if node_spec is _CAPTURE:
+            builder = ijson.ObjectBuilder()
+            builder.event(event, value)
+            if is_start:
+                builder_depth = 1
+            else:
+                attach(builder.value)
+                builder = None
+            continue
+
+        if event == "start_map":
+            container = {}
+        elif event == "start_array":
+            container = []
+        else:
+            # Scalar where the projection expected a container (e.g. null).
+            attach(value)
+            continue
+        attach(container)
+        stack.append(_Frame(node_spec, container))
+
+    return result
+
+
+def read_projected(fileobj, paths):
+    """
+    Parse a binary JSON stream keeping only `paths`.
+
+    `paths=None` means "everything" and is a plain full parse. Malformed
+    input raises ValueError either way.
+    """
+    if paths is None:
+        return json.load(fileobj)
+    spec = compile_projection(paths)
+    if ijson is None:
+        return project(json.load(fileobj), spec)
+    try:
+        return _stream_project(fileobj, spec)
+    except ijson.JSONError as e:
+        # Same exception family as `json.load`, so callers handle one type.
+        raise ValueError(f"Invalid JSON: {e}") from e
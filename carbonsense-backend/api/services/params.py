@@ -0,0 +1,27 @@
+"""
+Query-param parsing shared by the list endpoints.
+
+Malformed numbers fall back to the default and out-of-range ones are
+clamped, rather than failing the request — the paging contract every
+opt-in `?limit=` endpoint already follows.
+"""
+
+
+def parse_int(raw, default, lo=None, hi=None):
+    """`int(raw)` clamped to `[lo, hi]`; `default` if it isn't an integer."""
+    try:
+        n = int(raw)
+    except (TypeError, ValueError):
+        return default
+    if lo is not None:
+        n = max(lo, n)
+    if hi is not None:
+        n = min(hi, n)
+    return n
+
+
+def parse_paging(params, default_limit, max_limit):
+    """`(limit, offset)` from `?limit=` / `?offset=`; limit in `[1, max_limit]`."""
+    limit = parse_int(params.get("limit"), default=default_limit, lo=1, hi=max_limit)
+    offset = parse_int(params.get("offset"), default=0, lo=0)
+    return limit, offset
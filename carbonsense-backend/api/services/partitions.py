@@ -0,0 +1,152 @@
+"""
+Declarative partitioning of `emission_points` by forecast run and point type.
+
+Unpartitioned, every `load_forecast_json` retires the sector's previous run
+with a cascading `DELETE FROM forecast_runs`, which deletes tens of
+thousands of `emission_points` rows from one big table. That bloats the
+table and holds row locks that readers contend with. Partitioned, the table
+is laid out as
+
+    emission_points                      PARTITION BY LIST (forecast_run_id)
+      emission_points_run_42             PARTITION BY LIST (point_type)
+        emission_points_run_42_historical    FOR VALUES IN ('historical')
+        emission_points_run_42_forecast      FOR VALUES IN ('forecast')
+        emission_points_run_42_other         DEFAULT   (test_prediction, …)
+
+so retiring a run is a `DROP TABLE` of its partition, and the
+`point_type=` filter every view applies prunes to one leaf per run.
+
+Partitioning needs a `forecast_run_id` column on `emission_points` (the
+partition key, denormalised from `locations`). Run `manage.py
+partition_emission_points` once to convert an existing table; the loader
+detects the layout with `is_partitioned` and creates / drops run partitions
+itself. Unpartitioned databases keep working unchanged. The ORM model
+doesn't map the new column, so reads still filter through
+`location__forecast_run_id`.
+
+All helpers take a raw psycopg2 cursor and run in the caller's transaction.
+"""
+
+TABLE = "emission_points"
+
+# Point types with a leaf partition of their own; everything else lands in
+# the run's DEFAULT leaf.
+PARTITIONED_POINT_TYPES = ("historical", "forecast")
+
+
+def is_partitioned(cur, table=TABLE):
+    """True if `table` (default `emission_points`) is a partitioned table."""
+    cur.execute(
+        "SELECT c.relkind FROM pg_class c "
+        "WHERE c.relname = %s AND c.relnamespace = current_schema()::regnamespace",
+        (table,),
+    )
+    row = cur.fetchone()
+    return bool(row) and row[0] == "p"
+
+
+def run_partition_name(run_id):
+    return f"{TABLE}_run_{int(run_id)}"
+
+
+def create_run_partition(cur, run_id):
+    """Create the partition (and per-point_type leaves) for one forecast run."""
+    name = run_partition_name(run_id)
+    cur.execute(
+        f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {TABLE} "
+        f"FOR VALUES IN ({int(run_id)}) PARTITION BY LIST (point_type)"
+    )
+    for point_type in PARTITIONED_POINT_TYPES:
+        cur.execute(
+            f"CREATE TABLE IF NOT EXISTS {name}_{point_type} PARTITION OF {name} "
+            "FOR VALUES IN (%s)",
+            (point_type,),
+        )
+    cur.execute(f"CREATE TABLE IF NOT EXISTS {name}_other PARTITION OF {name} DEFAULT")
+
+
+def drop_run_partitions(cur, run_ids):
+    """
+    Drop the partitions of the given runs. Returns how many existed.
+
+    Dropping a partition takes an ACCESS EXCLUSIVE lock on the parent table
+    until the transaction ends, so call this as late in it as possible.
+    """
+    dropped = 0
+    for run_id in run_ids:
+        name = run_partition_name(run_id)
+        cur.execute("SELECT to_regclass(%s)", (name,))
+        if cur.fetchone()[0] is None:
+            continue
+        cur.execute(f"DROP TABLE {name}")
+        dropped += 1
+    return dropped
+
+
+def convert_to_partitioned(cur, keep_old=True):
+    """
+    Rebuild `emission_points` as a partitioned table, in the caller's
+    transaction. Copies every row (filling `forecast_run_id` from
+    `locations`), gives it a fresh id sequence and swaps the tables' names.
+    The old table is kept as `emission_points_unpartitioned` unless
+    `keep_old` is False. Returns the number of rows copied.
+    """
+    staging = f"{TABLE}_partitioned"
+    cur.execute(f"DROP TABLE IF EXISTS {staging}")
+    cur.execute(
+        f"""
+        CREATE TABLE {staging} (
+            LIKE {TABLE} INCLUDING DEFAULTS,
+            forecast_run_id integer NOT NULL
+                REFERENCES forecast_runs(id) ON DELETE CASCADE
+        ) PARTITION BY LIST (forecast_run_id)
+        """
+    )
+    # Primary keys of partitioned tables must contain the partition keys.
+    cur.execute(
+        f"ALTER TABLE {staging} "
+        "ADD PRIMARY KEY (id, forecast_run_id, point_type), "
+        "ADD FOREIGN KEY (location_id) REFERENCES locations(id) ON DELETE CASCADE"
+    )
+
+    cur.execute("SELECT id FROM forecast_runs ORDER BY id")
+    run_ids = [row[0] for row in cur.fetchall()]
+
+    cur.execute(f"ALTER TABLE {TABLE} RENAME TO {TABLE}_unpartitioned")
+    # Free the old table's index names for `ensure_indexes` to reuse.
+    cur.execute(
+        "SELECT indexname FROM pg_indexes "
+        "WHERE schemaname = current_schema() AND tablename = %s",
+        (f"{TABLE}_unpartitioned",),
+    )
+    for (index,) in cur.fetchall():
+        cur.execute(f'ALTER INDEX "{index}" RENAME TO "{index[:48]}_unpartitioned"')
+    cur.execute(f"ALTER TABLE {staging} RENAME TO {TABLE}")
+    for run_id in run_ids:
+        create_run_partition(cur, run_id)
+
+    cur.execute(
+        f"""
+        INSERT INTO {TABLE}
+        SELECT ep.*, l.forecast_run_id
+        FROM {TABLE}_unpartitioned ep
+        JOIN locations l ON l.id = ep.location_id
+        """
+    )
+    copied = cur.rowcount
+
+    # Give the new table its own id sequence, continuing from the old one,
+    # so it works whether the old id was serial or identity and dropping
+    # the old table can't take the sequence with it.
+    cur.execute(f"CREATE SEQUENCE IF NOT EXISTS {TABLE}_pk_seq OWNED BY {TABLE}.id")
+    cur.execute(
+        f"SELECT setval('{TABLE}_pk_seq', COALESCE(MAX(id), 0) + 1, false) "
+        f"FROM {TABLE}_unpartitioned"
+    )
+    cur.execute(
+        f"ALTER TABLE {TABLE} ALTER COLUMN id SET DEFAULT nextval('{TABLE}_pk_seq')"
+    )
+
+    if not keep_old:
+        cur.execute(f"DROP TABLE {TABLE}_unpartitioned")
+    return copied
@@ -0,0 +1,92 @@
+"""
+Point-in-polygon lookups over a fixed set of polygons, vectorised with numpy.
+
+`PolygonIndex.locate(lons, lats)` answers "which polygon contains each of
+these points" for a whole batch at once. Each polygon's bounding box is
+checked against every point in one array comparison; only the points
+inside it go through the even–odd crossing test, which runs over all of
+the polygon's edges as one (points × edges) array operation. Holes and
+multi-part features need no special casing: every ring's edges take part
+in the same parity count.
+
+Cost is about (points × polygons) for the bbox pass plus (candidates ×
+edges) for the few polygons each point's bbox hits, instead of a Python
+loop per point per polygon.
+"""
+
+import numpy as np
+
+
+class PolygonIndex:
+    """
+    `features` is `[(key, polygons)]` with `polygons` a list of polygons,
+    each a list of `(x, y)` rings (exterior first, holes after).
+    """
+
+    def __init__(self, features):
+        self.keys = []
+        boxes, edges, centroids = [], [], []
+        for key, polygons in features:
+            rings = [np.asarray(ring, dtype=float) for poly in polygons for ring in poly]
+            rings = [ring for ring in rings if len(ring) >= 3]
+            if not rings:
+                continue
+            points = np.concatenate(rings)
+            self.keys.append(key)
+            boxes.append((*points.min(axis=0), *points.max(axis=0)))
+            # (x1, y1, x2, y2) per edge; np.roll closes each ring.
+            edges.append(
+                np.concatenate([np.hstack([ring, np.roll(ring, -1, axis=0)]) for ring in rings])
+            )
+            centroids.append(_centroid(rings[0]))
+        self._boxes = np.asarray(boxes, dtype=float).reshape(-1, 4)
+        self._edges = edges
+        self._centroids = np.asarray(centroids, dtype=float).reshape(-1, 2)
+
+    def locate(self, xs, ys, nearest=False):
+        """
+        Key of the polygon containing each point, or None. With `nearest`,
+        points outside every polygon get the polygon with the closest
+        centroid instead (for inputs that sit just off the boundaries).
+        """
+        xs = np.asarray(xs, dtype=float)
+        ys = np.asarray(ys, dtype=float)
+        found = np.full(len(xs), -1)
+        for i, (x0, y0, x1, y1) in enumerate(self._boxes):
+            candidates = np.flatnonzero(
+                (found < 0) & (xs >= x0) & (xs <= x1) & (ys >= y0) & (ys <= y1)
+            )
+            if candidates.size:
+                inside = _contains(self._edges[i], xs[candidates], ys[candidates])
+                found[candidates[inside]] = i
+
+        if nearest and len(self.keys):
+            missing = np.flatnonzero(found < 0)
+            if missing.size:
+                dx = xs[missing, None] - self._centroids[None, :, 0]
+                dy = ys[missing, None] - self._centroids[None, :, 1]
+                found[missing] = np.argmin(dx * dx + dy * dy, axis=1)
+
+        return [self.keys[i] if i >= 0 else None for i in found]
+
+
+def _contains(edges, xs, ys):
+    """Even–odd rule for each point against every edge at once."""
+    x1, y1, x2, y2 = (edges[:, k][None, :] for k in range(4))
+    px, py = xs[:, None], ys[:, None]
+    straddles = (y1 > py) != (y2 > py)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cross_x = x1 + (py - y1) * (x2 - x1) / (y2 - y1)
+    crossings = straddles & (px < cross_x)
+    return (crossings.sum(axis=1) % 2) == 1
+
+
+def _centroid(ring):
+    """Area-weighted centroid of a ring; the vertex mean if it's degenerate."""
+    x, y = ring[:, 0], ring[:, 1]
+    xn, yn = np.roll(x, -1), np.roll(y, -1)
+    cross = x * yn - xn * y
+    area = cross.sum() / 2
+    if area == 0:
+        return x.mean(), y.mean()
+    return ((x + xn) * cross).sum() / (6 * area), ((y + yn) * cross).sum() / (6 * area)
@@ -0,0 +1,255 @@
+"""
+Precomputed rollups of `emission_points`, refreshed at load time.
+
+The aggregate endpoints (`stats`, `emissions/timeline`, `point-sources`,
+`emissions/latest`, the energy total) used to run `SUM` / `MAX` over the
+whole `emission_points` table on every cache miss, so their cost grew with
+every sector, region and year loaded. `load_forecast_json` now writes
+three small tables in the same transaction as the points themselves:
+
+    emission_monthly_rollups   run × point_type × date   → total, point_count
+    location_point_totals      location × point_type     → total, count, date range
+    location_latest_points     location × point_type     → date, emissions of the latest point
+
+plus `emission_rollup_runs`, one row per run whose rollups are current.
+All four cascade from `forecast_runs` / `locations`, so replacing a run
+drops its rollups with it.
+
+Readers go through `rollups_cover(run_ids)`: if any active run has no
+rollups yet (tables not created, or data loaded before this existed and
+not backfilled with `manage.py refresh_rollups`), they fall back to the
+raw `emission_points` aggregates, so numbers are never silently zero.
+
+Writers take a raw psycopg2 cursor, like the rest of the loader; readers use
+the ORM.
+"""
+
+import logging
+
+from django.db import DatabaseError, connection
+from django.db.models import Count, F, Sum, Window
+from django.db.models.functions import RowNumber
+
+from api.models import (
+    EmissionMonthlyRollup,
+    EmissionPoint,
+    LocationLatestPoint,
+    LocationPointTotal,
+    RollupRun,
+)
+
+logger = logging.getLogger(__name__)
+
+
+CREATE_ROLLUP_TABLES_SQL = """
+    CREATE TABLE IF NOT EXISTS emission_monthly_rollups (
+        id bigserial PRIMARY KEY,
+        forecast_run_id integer NOT NULL REFERENCES forecast_runs(id) ON DELETE CASCADE,
+        point_type text NOT NULL,
+        date date NOT NULL,
+        total double precision NOT NULL,
+        point_count integer NOT NULL,
+        UNIQUE (forecast_run_id, point_type, date)
+    );
+    CREATE TABLE IF NOT EXISTS location_point_totals (
+        id bigserial PRIMARY KEY,
+        location_id integer NOT NULL REFERENCES locations(id) ON DELETE CASCADE,
+        forecast_run_id integer NOT NULL REFERENCES forecast_runs(id) ON DELETE CASCADE,
+        point_type text NOT NULL,
+        total double precision NOT NULL,
+        point_count integer NOT NULL,
+        first_date date NOT NULL,
+        last_date date NOT NULL,
+        UNIQUE (location_id, point_type)
+    );
+    CREATE INDEX IF NOT EXISTS location_point_totals_run_type
+        ON location_point_totals (forecast_run_id, point_type);
+    CREATE TABLE IF NOT EXISTS location_latest_points (
+        id bigserial PRIMARY KEY,
+        location_id integer NOT NULL REFERENCES locations(id) ON DELETE CASCADE,
+        forecast_run_id integer NOT NULL REFERENCES forecast_runs(id) ON DELETE CASCADE,
+        point_type text NOT NULL,
+        date date NOT NULL,
+        emissions double precision NOT NULL,
+        UNIQUE (location_id, point_type)
+    );
+    CREATE INDEX IF NOT EXISTS location_latest_points_run_type
+        ON location_latest_points (forecast_run_id, point_type);
+    CREATE TABLE IF NOT EXISTS emission_rollup_runs (
+        forecast_run_id integer PRIMARY KEY REFERENCES forecast_runs(id) ON DELETE CASCADE,
+        refreshed_at timestamptz NOT NULL DEFAULT now()
+    );
+"""
+
+_DELETE_RUN_SQL = (
+    "DELETE FROM emission_monthly_rollups WHERE forecast_run_id = %(run_id)s",
+    "DELETE FROM location_point_totals WHERE forecast_run_id = %(run_id)s",
+    "DELETE FROM location_latest_points WHERE forecast_run_id = %(run_id)s",
+    "DELETE FROM emission_rollup_runs WHERE forecast_run_id = %(run_id)s",
+)
+
+_INSERT_RUN_SQL = (
+    """
+    INSERT INTO emission_monthly_rollups
+        (forecast_run_id, point_type, date, total, point_count)
+    SELECT l.forecast_run_id, ep.point_type, ep.date,
+           COALESCE(SUM(ep.emissions), 0), COUNT(*)
+    FROM emission_points ep
+    JOIN locations l ON l.id = ep.location_id
+    WHERE l.forecast_run_id = %(run_id)s
+    GROUP BY l.forecast_run_id, ep.point_type, ep.date
+    """,
+    """
+    INSERT INTO location_point_totals
+        (location_id, forecast_run_id, point_type, total, point_count,
+         first_date, last_date)
+    SELECT ep.location_id, l.forecast_run_id, ep.point_type,
+           COALESCE(SUM(ep.emissions), 0), COUNT(*), MIN(ep.date), MAX(ep.date)
+    FROM emission_points ep
+    JOIN locations l ON l.id = ep.location_id
+    WHERE l.forecast_run_id = %(run_id)s
+    GROUP BY ep.location_id, l.forecast_run_id, ep.point_type
+    """,
+    """
+    INSERT INTO location_latest_points
+        (location_id, forecast_run_id, point_type, date, emissions)
+    SELECT DISTINCT ON (ep.location_id, ep.point_type)
+           ep.location_id, l.forecast_run_id, ep.point_type, ep.date,
+           COALESCE(ep.emissions, 0)
+    FROM emission_points ep
+    JOIN locations l ON l.id = ep.location_id
+    WHERE l.forecast_run_id = %(run_id)s
+    ORDER BY ep.location_id, ep.point_type, ep.date DESC, ep.id DESC
+    """,
+    """
+    INSERT INTO emission_rollup_runs (forecast_run_id, refreshed_at)
+    VALUES (%(run_id)s, now())
+    """,
+)
+
+
+def ensure_rollup_tables(cur):
+    """Create the rollup tables if this database doesn't have them yet."""
+    cur.execute(CREATE_ROLLUP_TABLES_SQL)
+
+
+def refresh_run_rollups(cur, run_id):
+    """Rebuild every rollup for one forecast run, in the caller's transaction."""
+    params = {"run_id": run_id}
+    for sql in _DELETE_RUN_SQL + _INSERT_RUN_SQL:
+        cur.execute(sql, params)
+
+
+def rollups_cover(run_ids):
+    """True if every run in `run_ids` has current rollups to read from."""
+    run_ids = set(run_ids)
+    if not run_ids:
+        return False
+    try:
+        covered = RollupRun.objects.filter(forecast_run_id__in=run_ids).count()
+    except DatabaseError as e:
+        logger.warning("Emission rollups unavailable (%s); using emission_points", e)
+        return False
+    return covered == len(run_ids)
+
+
+# ----------------------------------------------------------------------------
+# Readers. Each uses the rollups when they cover every requested run and the
+# equivalent `emission_points` aggregate otherwise.
+# ----------------------------------------------------------------------------
+
+
+def monthly_totals(run_ids):
+    """
+    `(queryset, value_field, run_field)` for date-level aggregates.
+
+    The queryset has `point_type` and `date` columns either way; sum
+    `value_field` and group by `run_field` to get per-run figures.
+    """
+    if rollups_cover(run_ids):
+        return (
+            EmissionMonthlyRollup.objects.filter(forecast_run_id__in=run_ids),
+            "total",
+            "forecast_run_id",
+        )
+    return (
+        EmissionPoint.objects.filter(location__forecast_run_id__in=run_ids),
+        "emissions",
+        "location__forecast_run_id",
+    )
+
+
+def location_totals(run_ids, point_type):
+    """`{location_id: total emissions}` for one point_type."""
+    if rollups_cover(run_ids):
+        rows = LocationPointTotal.objects.filter(
+            forecast_run_id__in=run_ids, point_type=point_type
+        ).values_list("location_id", "total")
+    else:
+        rows = (
+            EmissionPoint.objects.filter(
+                location__forecast_run_id__in=run_ids, point_type=point_type
+            )
+            .values("location_id")
+            .annotate(t=Sum("emissions"))
+            .values_list("location_id", "t")
+        )
+    return {loc_id: float(total or 0.0) for loc_id, total in rows}
+
+
+def location_monthly_means(run_ids, point_type):
+    """
+    `{location_id: mean emissions per point}` for one point_type — each
+    location averaged over its own (monthly) points, not the run's horizon.
+    """
+    if rollups_cover(run_ids):
+        rows = LocationPointTotal.objects.filter(
+            forecast_run_id__in=run_ids, point_type=point_type
+        ).values_list("location_id", "total", "point_count")
+    else:
+        rows = (
+            EmissionPoint.objects.filter(
+                location__forecast_run_id__in=run_ids, point_type=point_type
+            )
+            .values("location_id")
+            .annotate(t=Sum("emissions"), n=Count("id"))
+            .values_list("location_id", "t", "n")
+        )
+    return {loc_id: float(total or 0.0) / n for loc_id, total, n in rows if n}
+
+
+def latest_points(run_ids, point_type, as_of=None):
+    """
+    `[(source, forecast_run_id, emissions)]` — one row per location, for its
+    most recent point of `point_type` (on or before `as_of`, if given).
+
+    A single query either way: the precomputed `location_latest_points`
+    when it covers the runs and there's no `as_of`, otherwise `DISTINCT ON
+    (location_id)` over `emission_points` on Postgres, or a `ROW_NUMBER()`
+    window for backends without `DISTINCT ON`.
+    """
+    fields = ("location__source", "location__forecast_run_id", "emissions")
+    if as_of is None and rollups_cover(run_ids):
+        return list(
+            LocationLatestPoint.objects.filter(
+                forecast_run_id__in=run_ids, point_type=point_type
+            ).values_list("location__source", "forecast_run_id", "emissions")
+        )
+
+    qs = EmissionPoint.objects.filter(
+        location__forecast_run_id__in=run_ids, point_type=point_type
+    )
+    if as_of is not None:
+        qs = qs.filter(date__lte=as_of)
+
+    if connection.features.can_distinct_on_fields:
+        qs = qs.order_by("location_id", "-date", "-id").distinct("location_id")
+    else:
+        qs = qs.annotate(
+            recency=Window(
+                RowNumber(),
+                partition_by=F("location_id"),
+                order_by=(F("date").desc(), F("id").desc()),
+            )
+        ).filter(recency=1)
+    return list(qs.values_list(*fields))
@@ -7,18 +7,23 @@ canonical buckets the frontend understands.
 
 `get_active_runs()` is the single source of truth for "which forecast runs
 should we show?" — it caches because the answer changes only when somebody
-reloads data via `manage.py load_forecast_json`.
+reloads data via `manage.py load_forecast_json`, which also moves the
+dataset generation the cache key is namespaced by.
 """
 
 import math
 
+from django.conf import settings
 from django.core.cache import cache
 
 from api.models import ForecastRun
 
-# Forecasts are stable until a new data load — an hour of cache is fine and
-# cuts a lot of repeat DB hits on the dashboard.
-CACHE_TTL = 3600
+from .generation import dataset_key
+
+# Cached payloads are keyed by dataset generation (see `generation`), so a
+# data load invalidates them immediately; the TTL only bounds how long
+# entries from old generations linger in the backend.
+CACHE_TTL = getattr(settings, "API_CACHE_TTL", 7 * 24 * 3600)
 
 
 SECTOR_MAP = {
@@ -37,13 +42,19 @@ SECTOR_MAP = {
 }
 
 
-def get_active_runs():
-    """Return all currently-active forecast runs (one per sector, cached)."""
-    runs = cache.get("active_forecast_runs")
+def get_active_runs(refresh=False):
+    """
+    Return all currently-active forecast runs (one per sector, cached).
+
+    `refresh=True` bypasses the cached list and re-reads the DB (used by
+    `manage.py warm_caches` right after a data load).
+    """
+    cache_key = dataset_key("active_forecast_runs")
+    runs = None if refresh else cache.get(cache_key)
     if runs is None:
         runs = list(ForecastRun.objects.filter(is_active=True))
         if runs:
-            cache.set("active_forecast_runs", runs, CACHE_TTL)
+            cache.set(cache_key, runs, CACHE_TTL)
     return runs
 
 
@@ -0,0 +1,168 @@
+"""
+Viewport (`bbox=`) filtering for map payloads via a uniform-grid index.
+
+`/api/areas/` and `/api/point-sources/` build one cached list per dataset
+version; a map zoomed into a few UCs only needs the entries on screen.
+`viewport_filter` answers that from a `GridIndex` over the payload's
+coordinates: entries are bucketed into square cells sized so there's about
+one entry per cell, and a query visits only the cells the bbox overlaps (or
+only the occupied cells, if that's fewer), so its cost tracks what's on
+screen rather than the total location count.
+
+Indexes are built lazily per process and keyed by the payload's cache key,
+which already carries the dataset version, so a reload rebuilds them.
+
+Optional `zoom` thins the result for zoomed-out views: at most one entry
+per `THIN_PIXELS`-square screen cell, keeping the earliest in payload order
+(point sources are ordered largest emitter first).
+"""
+
+import math
+import threading
+from collections import OrderedDict
+
+# Screen cell, in 256px-tile pixels, that `zoom` thinning keeps one entry per.
+THIN_PIXELS = 8
+
+# Per-process indexes kept at once (a few payloads × the current version).
+MAX_INDEXES = 32
+
+
+class InvalidViewport(ValueError):
+    pass
+
+
+def parse_bbox(raw):
+    """`minLon,minLat,maxLon,maxLat` → tuple of floats. Raises InvalidViewport."""
+    try:
+        min_lon, min_lat, max_lon, max_lat = (float(v) for v in raw.split(","))
+    except ValueError as e:
+        raise InvalidViewport("bbox must be minLon,minLat,maxLon,maxLat") from e
+    if not all(math.isfinite(v) for v in (min_lon, min_lat, max_lon, max_lat)):
+        raise InvalidViewport("bbox values must be finite numbers")
+    return (
+        min(min_lon, max_lon),
+        min(min_lat, max_lat),
+        max(min_lon, max_lon),
+        max(min_lat, max_lat),
+    )
+
+
+def parse_zoom(raw):
+    """Web-map zoom level 0–24 as an int. Raises InvalidViewport."""
+    try:
+        zoom = int(raw)
+    except (TypeError, ValueError) as e:
+        raise InvalidViewport("zoom must be an integer") from e
+    if not 0 <= zoom <= 24:
+        raise InvalidViewport("zoom must be between 0 and 24")
+    return zoom
+
+
+def viewport_params(params):
+    """`(bbox, zoom)` from request query params; `(None, None)` without `bbox`."""
+    raw_bbox = params.get("bbox")
+    if not raw_bbox:
+        return None, None
+    raw_zoom = params.get("zoom")
+    return parse_bbox(raw_bbox), (parse_zoom(raw_zoom) if raw_zoom else None)
+
+
+class GridIndex:
+    """Uniform grid over `(lon, lat)` points; queries return item positions."""
+
+    def __init__(self, coords):
+        points = [
+            (i, lon, lat)
+            for i, (lon, lat) in enumerate(coords)
+            if lon is not None and lat is not None
+            and math.isfinite(lon) and math.isfinite(lat)
+        ]
+        self._lon = {i: lon for i, lon, _ in points}
+        self._lat = {i: lat for i, _, lat in points}
+        self._cells = {}
+        if not points:
+            self._cell = 1.0
+            return
+
+        lons = [lon for _, lon, _ in points]
+        lats = [lat for _, _, lat in points]
+        extent = max(max(lons) - min(lons), max(lats) - min(lats))
+        per_side = max(1, math.ceil(math.sqrt(len(points))))
+        self._cell = max(extent / per_side, 1e-6)
+        for i, lon, lat in points:
+            self._cells.setdefault(self._key(lon, lat), []).append(i)
+
+    def _key(self, lon, lat):
+        return math.floor(lon / self._cell), math.floor(lat / self._cell)
+
+    def query(self, min_lon, min_lat, max_lon, max_lat):
+        """Positions of the points inside the bbox, in ascending order."""
+        x0, y0 = self._key(min_lon, min_lat)
+        x1, y1 = self._key(max_lon, max_lat)
+        if (x1 - x0 + 1) * (y1 - y0 + 1) <= len(self._cells):
+            cells = (
+                self._cells.get((x, y), ())
+                for x in range(x0, x1 + 1)
+                for y in range(y0, y1 + 1)
+            )
+        else:
+            cells = (
+                members
+                for (x, y), members in self._cells.items()
+                if x0 <= x <= x1 and y0 <= y <= y1
+            )
+        hits = [
+            i
+            for members in cells
+            for i in members
+            if min_lon <= self._lon[i] <= max_lon and min_lat <= self._lat[i] <= max_lat
+        ]
+        hits.sort()
+        return hits
+
+    def thin(self, positions, zoom):
+        """Keep the first of `positions` in each `THIN_PIXELS` screen cell at `zoom`."""
+        size = 360.0 / (256 * 2**zoom) * THIN_PIXELS
+        seen = set()
+        kept = []
+        for i in positions:
+            key = (math.floor(self._lon[i] / size), math.floor(self._lat[i] / size))
+            if key not in seen:
+                seen.add(key)
+                kept.append(i)
+        return kept
+
+
+_lock = threading.Lock()
+_indexes = OrderedDict()
+
+
+def _index_for(cache_key, payload, coord):
+    """`(index, payload)` for `cache_key`, building it from `payload` on a miss."""
+    with _lock:
+        entry = _indexes.get(cache_key)
+        if entry is not None:
+            _indexes.move_to_end(cache_key)
+            return entry
+    # Keep the payload the index was built from: positions refer to it, and
+    # a rebuilt copy of the same version isn't guaranteed the same order.
+    entry = (GridIndex(coord(item) for item in payload), payload)
+    with _lock:
+        _indexes[cache_key] = entry
+        while len(_indexes) > MAX_INDEXES:
+            _indexes.popitem(last=False)
+    return entry
+
+
+def viewport_filter(cache_key, payload, coord, bbox, zoom=None):
+    """
+    The entries of `payload` whose `coord(entry)` → `(lon, lat)` lies in
+    `bbox`, in payload order, optionally thinned for `zoom`. `cache_key`
+    identifies the payload (and its dataset version) for index reuse.
+    """
+    index, indexed = _index_for(cache_key, payload, coord)
+    positions = index.query(*bbox)
+    if zoom is not None:
+        positions = index.thin(positions, zoom)
+    return [indexed[i] for i in positions]
@@ -0,0 +1,299 @@
+"""
+Two-tier cache backend: a bounded per-process LRU in front of a shared cache.
+
+With Redis as the only tier, every `/api/uc-summary/` hit unpickles a
+151-entry list and every `get_active_runs()` call unpickles `ForecastRun`
+instances — a network round-trip plus deserialisation per read, for values
+that only change when data is reloaded. `TieredCache` keeps the already
+deserialised objects of recently read keys in process memory and falls
+through to the shared backend (the source of truth across processes and
+nodes) on a local miss.
+
+Configured as the default cache with the shared backend under its own
+alias:
+
+    CACHES = {
+        "default": {
+            "BACKEND": "api.services.tiered_cache.TieredCache",
+            "OPTIONS": {"SHARED_ALIAS": "shared"},
+        },
+        "shared": {"BACKEND": "django_redis.cache.RedisCache", ...},
+    }
+
+Consistency:
+
+- **Writes go through.** `set` / `delete` / `incr` hit the shared cache
+  first. When that replaces or removes an existing value, the key's name is
+  published to a shared invalidation log (a sequence counter plus one
+  short-lived entry per sequence number). Every process reads the counter
+  at most every `INVALIDATION_CHECK_INTERVAL` seconds and evicts just the
+  keys logged since its last check, so an overwrite anywhere is visible
+  everywhere within that interval. Filling a key that didn't exist yet
+  (every cache-miss build) publishes nothing — no process can hold a copy.
+  `clear()`, a log entry that has already expired, or a counter that went
+  backwards (shared cache flushed) drops the whole local tier.
+- **Volatile keys bypass the local tier.** `add` (used for single-flight
+  locks) is always shared-only, as is any key ending in one of
+  `LOCAL_EXCLUDE_SUFFIXES` — a lock must never be answered from a stale
+  local copy, and writing one shouldn't touch the invalidation log.
+- **Bounded.** At most `LOCAL_MAX_ENTRIES` entries and `LOCAL_MAX_BYTES`
+  (pickled size, measured once when an entry is filled); least recently
+  used entries are evicted first. Entries larger than a quarter of the
+  byte budget aren't kept locally. Local copies also expire after
+  `LOCAL_TTL` seconds, or sooner if their shared timeout is shorter (read
+  from the shared backend's `ttl()` when it has one, as django-redis does;
+  otherwise capped at its default timeout).
+
+Local hits return the cached object itself, not a copy; callers must
+treat cached payloads as read-only (the API views only serialise them).
+"""
+
+import pickle
+import random
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+SEQ_KEY = "tiered_cache:seq"
+LOG_KEY = "tiered_cache:inv:{}"
+
+# How long invalidation log entries live. A process that hasn't checked the
+# log for longer than this finds entries missing and drops its whole tier.
+LOG_TTL = 300
+
+# A process further behind than this drops its tier instead of replaying.
+MAX_LOG_REPLAY = 1000
+
+# Logged in place of a key name by `clear()`.
+_CLEAR_ALL = "*"
+
+_MISSING = object()
+
+
+class _LocalEntry:
+    __slots__ = ("value", "expires_at", "size")
+
+    def __init__(self, value, expires_at, size):
+        self.value = value
+        self.expires_at = expires_at
+        self.size = size
+
+
+class TieredCache(BaseCache):
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get("OPTIONS", {})
+        self._shared_alias = options.get("SHARED_ALIAS", "shared")
+        self._max_entries = int(options.get("LOCAL_MAX_ENTRIES", 512))
+        self._max_bytes = int(options.get("LOCAL_MAX_BYTES", 128 * 1024 * 1024))
+        self._local_ttl = float(options.get("LOCAL_TTL", 300))
+        self._check_interval = float(options.get("INVALIDATION_CHECK_INTERVAL", 1.0))
+        self._exclude = tuple(options.get("LOCAL_EXCLUDE_SUFFIXES", (":lock",)))
+
+        self._entries: OrderedDict[str, _LocalEntry] = OrderedDict()
+        self._bytes = 0
+        # Last invalidation sequence number applied, and how many times the
+        # local tier has been invalidated (fills started before a change of
+        # `_generation` are discarded rather than stored).
+        self._seq = None
+        self._generation = 0
+        self._checked_at = 0.0
+        self._own_seqs = set()
+        self._lock = threading.Lock()
+
+    @property
+    def shared(self):
+        return caches[self._shared_alias]
+
+    # ------------------------------------------------------------------
+    # Local tier
+    # ------------------------------------------------------------------
+
+    def _local_key(self, key, version):
+        return self.make_and_validate_key(key, version=version)
+
+    def _is_local(self, key):
+        return not key.endswith(self._exclude)
+
+    def _clear_local(self):
+        self._entries.clear()
+        self._bytes = 0
+        self._generation += 1
+
+    def _sync(self):
+        """Apply invalidations logged by any process since the last check."""
+        now = time.monotonic()
+        if self._seq is not None and now - self._checked_at < self._check_interval:
+            return
+        seq = self.shared.get(SEQ_KEY, 0)
+        with self._lock:
+            last = self._seq
+        if last is None or seq < last or seq - last > MAX_LOG_REPLAY:
+            logged = None
+        elif seq == last:
+            logged = []
+        else:
+            numbers = range(last + 1, seq + 1)
+            entries = self.shared.get_many([LOG_KEY.format(n) for n in numbers])
+            logged = []
+            for n in numbers:
+                lkey = entries.get(LOG_KEY.format(n))
+                if lkey is None or lkey == _CLEAR_ALL:
+                    logged = None
+                    break
+                logged.append((n, lkey))
+
+        with self._lock:
+            if self._seq != last:
+                return  # another thread got here first
+            if logged is None:
+                self._clear_local()
+            else:
+                changed = False
+                for n, lkey in logged:
+                    if n not in self._own_seqs:
+                        self._evict(lkey)
+                        changed = True
+                # A fill of one of these keys may be in flight with a value
+                # read before the change; make `_local_put` drop it.
+                if changed:
+                    self._generation += 1
+            self._own_seqs = {n for n in self._own_seqs if n > seq}
+            self._seq = seq
+            self._checked_at = now
+
+    def _publish(self, lkey):
+        """Log `lkey` (or `_CLEAR_ALL`) as changed for every other process."""
+        try:
+            seq = self.shared.incr(SEQ_KEY)
+        except ValueError:
+            # First write ever, or the shared cache was flushed. Start from a
+            # random base so a reset counter can't look like progress to a
+            # process still holding an old sequence number.
+            self.shared.add(SEQ_KEY, random.randrange(1 << 30), None)
+            seq = self.shared.incr(SEQ_KEY)
+        self.shared.set(LOG_KEY.format(seq), lkey, LOG_TTL)
+        with self._lock:
+            self._own_seqs.add(seq)
+            if lkey == _CLEAR_ALL:
+                self._clear_local()
+            else:
+                self._evict(lkey)
+                self._generation += 1
+
+    def _shared_ttl(self, key, version):
+        """Seconds the shared copy of `key` has left; None if unknown or unlimited."""
+        ttl = getattr(self.shared, "ttl", None)
+        if ttl is None:
+            return self.shared.default_timeout
+        remaining = ttl(key, version=version)
+        return remaining if remaining is None else max(remaining, 0)
+
+    def _local_get(self, lkey):
+        self._sync()
+        with self._lock:
+            entry = self._entries.get(lkey)
+            if entry is None:
+                return _MISSING
+            if entry.expires_at <= time.monotonic():
+                self._evict(lkey)
+                return _MISSING
+            self._entries.move_to_end(lkey)
+            return entry.value
+
+    def _local_put(self, lkey, value, timeout, generation):
+        try:
+            size = len(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+        except (pickle.PicklingError, TypeError, AttributeError):
+            return
+        if size > self._max_bytes // 4:
+            return
+        ttl = self._local_ttl if timeout is None else min(self._local_ttl, timeout)
+        if ttl <= 0:
+            return
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._evict(lkey)
+            self._entries[lkey] = _LocalEntry(value, time.monotonic() + ttl, size)
+            self._bytes += size
+            while self._entries and (
+                len(self._entries) > self._max_entries or self._bytes > self._max_bytes
+            ):
+                self._evict(next(iter(self._entries)))
+
+    def _evict(self, lkey):
+        entry = self._entries.pop(lkey, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    def local_stats(self):
+        """`{"entries", "bytes", "seq"}` of this process's local tier."""
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._bytes, "seq": self._seq}
+
+    # ------------------------------------------------------------------
+    # Cache API
+    # ------------------------------------------------------------------
+
+    def get(self, key, default=None, version=None):
+        if not self._is_local(key):
+            return self.shared.get(key, default, version=version)
+        lkey = self._local_key(key, version)
+        value = self._local_get(lkey)
+        if value is not _MISSING:
+            return value
+        generation = self._generation
+        value = self.shared.get(key, _MISSING, version=version)
+        if value is _MISSING:
+            return default
+        self._local_put(lkey, value, self._shared_ttl(key, version), generation)
+        return value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        if not self._is_local(key):
+            self.shared.set(key, value, timeout, version=version)
+            return
+        lkey = self._local_key(key, version)
+        # `add` succeeds only for a key nobody has yet, which is the common
+        # case (filling a miss) and needs no invalidation.
+        if not self.shared.add(key, value, timeout, version=version):
+            self.shared.set(key, value, timeout, version=version)
+            self._publish(lkey)
+        if timeout is DEFAULT_TIMEOUT:
+            timeout = self.shared.default_timeout
+        self._local_put(lkey, value, timeout, self._generation)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        # Atomic only in the shared tier; never answered locally.
+        return self.shared.add(key, value, timeout, version=version)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.shared.touch(key, timeout, version=version)
+
+    def delete(self, key, version=None):
+        deleted = self.shared.delete(key, version=version)
+        if deleted and self._is_local(key):
+            self._publish(self._local_key(key, version))
+        return deleted
+
+    def has_key(self, key, version=None):
+        if self._is_local(key) and self._local_get(self._local_key(key, version)) is not _MISSING:
+            return True
+        return self.shared.has_key(key, version=version)
+
+    def incr(self, key, delta=1, version=None):
+        value = self.shared.incr(key, delta, version=version)
+        if self._is_local(key):
+            self._publish(self._local_key(key, version))
+        return value
+
+    def clear(self):
+        self.shared.clear()
+        self._publish(_CLEAR_ALL)
+
+    def close(self, **kwargs):
+        self.shared.close(**kwargs)
@@ -0,0 +1,63 @@
+"""
+Union Council boundary polygons from `data/lahore_ucs.geojson`.
+
+The geojson identifies UCs by integer `uc_id`; every API payload uses the
+`PB-LAH-UC###` code instead, so polygons are re-keyed here once per data
+version and shared by everything that needs UC geometry (vector tiles,
+simplified boundaries, point-in-polygon lookups).
+"""
+
+from .data_files import derived_data, load_data_file
+from .polygon_index import PolygonIndex
+
+GEOJSON_FILE = "lahore_ucs.geojson"
+
+
+def uc_code_for(uc_id):
+    """geojson `uc_id` → the `PB-LAH-UC###` code the API uses."""
+    return f"PB-LAH-UC{int(uc_id):03d}"
+
+
+def uc_polygons():
+    """
+    `[(uc_code, uc_name, polygons)]` in file order, where `polygons` is a
+    list of polygons, each a list of rings (exterior first), each a list of
+    `(lon, lat)` tuples. Polygon and MultiPolygon features are both
+    flattened into that shape.
+    """
+    return derived_data("uc_polygons", _build_uc_polygons)
+
+
+def uc_polygon_index():
+    """`PolygonIndex` over the UC polygons, keyed by uc_code (lon, lat order)."""
+    return derived_data(
+        "uc_polygon_index",
+        lambda: PolygonIndex((code, polygons) for code, _, polygons in uc_polygons()),
+    )
+
+
+def locate_ucs(lons, lats, nearest=False):
+    """uc_code containing each `(lon, lat)`, or None; see `PolygonIndex.locate`."""
+    return uc_polygon_index().locate(lons, lats, nearest=nearest)
+
+
+def _build_uc_polygons():
+    geo = load_data_file(GEOJSON_FILE, ("features.*.properties", "features.*.geometry"))
+    result = []
+    for feature in geo.get("features", []):
+        props = feature.get("properties") or {}
+        geometry = feature.get("geometry") or {}
+        if props.get("uc_id") is None:
+            continue
+        if geometry.get("type") == "Polygon":
+            raw_polygons = [geometry["coordinates"]]
+        elif geometry.get("type") == "MultiPolygon":
+            raw_polygons = geometry["coordinates"]
+        else:
+            continue
+        polygons = [
+            [[(float(lon), float(lat)) for lon, lat, *_ in ring] for ring in polygon]
+            for polygon in raw_polygons
+        ]
+        result.append((uc_code_for(props["uc_id"]), props.get("uc_name", ""), polygons))
+    return result
@@ -0,0 +1,190 @@
+"""
+UC summary payloads — one entry per Union Council, joining all sector data.
+
+The heaviest payload by far: four JSON files (transport, buildings, waste,
+industry) joined into 151 UC entries. The files are parsed and laid out as
+an `EmissionsCube` once per worker; each `view_mode`/`month` combination
+is then a vectorised slice of that cube plus the response cache.
+
+`/api/uc-summary/` shapes these payloads (projection, columnar) and
+`/api/tiles/` colours its polygons by them; both go through
+`normalize_summary_params` and `get_summary`, so they share one cache
+entry per param combination.
+"""
+
+import numpy as np
+
+from .caching import get_or_build
+from .data_files import build_energy_by_uc
+from .emissions_cube import SECTORS, get_cube
+from .generation import dataset_key
+
+_WINDOW_SEP = " to "
+
+
+def _parse_window(label):
+    """`"YYYY-MM to YYYY-MM"` → `(start, end)`; either side may be empty."""
+    start, _, end = label.partition(_WINDOW_SEP)
+    return start.strip(), end.strip()
+
+
+def _valid_month(raw):
+    """`raw` if it looks like `YYYY-MM`, else ""."""
+    raw = (raw or "").strip()
+    if len(raw) == 7 and raw[4] == "-" and raw[:4].isdigit() and raw[5:].isdigit():
+        return raw
+    return ""
+
+
+def build_summary(data_type, view_mode, target_month):
+    """Pure function: build the full 151-UC summary list. Cacheable."""
+    cube = get_cube(data_type)
+    # Energy facilities are point sources (also served as map markers by
+    # /api/point-sources/); each one counts towards the UC its coordinates
+    # fall in, as a flat monthly mean. Plants outside every UC add nothing.
+    energy_monthly = _energy_monthly(cube, data_type)
+
+    month_label = ""
+    if view_mode == "monthly" and target_month:
+        month_label = target_month
+
+    if view_mode == "monthly":
+        energy_share = energy_monthly
+    elif view_mode == "window":
+        start, stop = cube.month_range(*_parse_window(target_month))
+        if stop > start:
+            # The months actually summed, after clipping to the data.
+            month_label = f"{cube.months[start]}{_WINDOW_SEP}{cube.months[stop - 1]}"
+        energy_share = energy_monthly * (stop - start)
+    else:
+        energy_share = energy_monthly * 12
+
+    # One (n_uc,) vector per sector — annual totals for the yearly view,
+    # a single month column for the monthly view, the window's months
+    # summed for a window. Absent sectors are 0.0.
+    annual = {sector: cube.annual(sector) for sector in SECTORS}
+    if view_mode == "yearly":
+        display = annual
+    elif view_mode == "window":
+        display = {sector: cube.window(sector, start, stop) for sector in SECTORS}
+    else:
+        display = {sector: cube.month(sector, target_month) for sector in SECTORS}
+    present = {sector: cube.has_sector(sector) for sector in SECTORS}
+
+    total_display = sum(display.values()) + energy_share
+    total_annual = sum(annual.values()) + energy_monthly * 12
+
+    results = []
+    for i, uc_code in enumerate(cube.uc_codes):
+        meta = cube.uc_meta[uc_code]
+        sectors = {}
+        for sector in SECTORS:
+            if not present[sector][i]:
+                sectors[sector] = None
+                continue
+            sectors[sector] = {
+                **cube.records[sector][uc_code],
+                "monthly_t": cube.monthly_t(sector, uc_code),
+                "display_t": round(float(display[sector][i]), 2),
+            }
+        sectors["energy"] = round(float(energy_share[i]), 2)
+
+        results.append({
+            "uc_code": uc_code,
+            "uc_name": meta["uc_name"],
+            "area_km2": meta["area_km2"],
+            "centroid": meta["centroid"],
+            "data_type": data_type,
+            "view_mode": view_mode,
+            "month_label": month_label,
+            "sectors": sectors,
+            "display_t": round(float(total_display[i]), 2),
+            "total_annual_t": round(float(total_annual[i]), 2),
+            "available_months": cube.months,
+        })
+
+    return results
+
+
+def _energy_monthly(cube, data_type):
+    """(n_uc,) mean monthly energy tonnes per UC, aligned with `cube.uc_codes`."""
+    by_uc = build_energy_by_uc(data_type)
+    return np.array([by_uc.get(code, 0.0) for code in cube.uc_codes], dtype=float)
+
+
+def build_month_matrix(data_type):
+    """
+    The whole UC × month × sector matrix in one compact payload, for the
+    month slider (`view_mode=all_months`).
+
+    `sectors[sector][i][j]` is UC `uc_codes[i]`'s `display_t` for
+    `months[j]` — the same number `view_mode=monthly&month=months[j]`
+    returns — or a null row when the UC has no data for that sector.
+    `display_t[i][j]` is the cross-sector total. Energy is a flat monthly
+    mean per UC (see `build_summary`), so `energy[i]` is one number.
+    """
+    cube = get_cube(data_type)
+    energy_monthly = _energy_monthly(cube, data_type)
+    total = np.zeros((len(cube.uc_codes), len(cube.months))) + energy_monthly[:, None]
+    sectors = {}
+    for sector in SECTORS:
+        monthly = np.nan_to_num(cube.series(sector))
+        total += monthly
+        rows = np.round(monthly, 2).tolist()
+        present = cube.has_sector(sector)
+        sectors[sector] = [row if present[i] else None for i, row in enumerate(rows)]
+
+    return {
+        "data_type": data_type,
+        "view_mode": "all_months",
+        "months": cube.months,
+        "uc_codes": cube.uc_codes,
+        "uc_names": [cube.uc_meta[code]["uc_name"] for code in cube.uc_codes],
+        "sectors": sectors,
+        "energy": np.round(energy_monthly, 2).tolist(),
+        "display_t": np.round(total, 2).tolist(),
+    }
+
+
+def normalize_summary_params(params):
+    """`(data_type, view_mode, target_month)` from the uc-summary query params."""
+    data_type = params.get("data_type", "forecast")
+    if data_type not in ("historical", "forecast"):
+        data_type = "forecast"
+    view_mode = params.get("view_mode", "yearly")
+    if view_mode not in ("monthly", "yearly", "all_months", "window"):
+        view_mode = "yearly"
+    target_month = params.get("month", "")
+    if view_mode == "window":
+        # Inclusive `YYYY-MM` bounds, carried as the month label (and cache
+        # key part) "start to end". A missing bound means the axis edge.
+        start = _valid_month(params.get("start"))
+        end = _valid_month(params.get("end"))
+        if start and end and start > end:
+            start, end = end, start
+        target_month = f"{start}{_WINDOW_SEP}{end}"
+    elif view_mode != "monthly":
+        # Only the monthly view reads `month`; don't split the cache on it.
+        target_month = ""
+    return data_type, view_mode, target_month
+
+
+def summary_cache_key(data_type, view_mode, target_month):
+    # Window labels contain spaces, which some cache backends reject in keys.
+    target = target_month.replace(_WINDOW_SEP, "..")
+    return dataset_key("uc_summary", data_type, view_mode, target)
+
+
+def get_summary(data_type, view_mode, target_month):
+    """
+    The full 151-entry list (or the month matrix for `all_months`), cached
+    per params and dataset version; built on a miss.
+    """
+    if view_mode == "all_months":
+        return get_or_build(
+            summary_cache_key(data_type, view_mode, ""), lambda: build_month_matrix(data_type)
+        )
+    return get_or_build(
+        summary_cache_key(data_type, view_mode, target_month),
+        lambda: build_summary(data_type, view_mode, target_month),
+    )
@@ -0,0 +1,259 @@
+"""
+UC boundaries as a quantised, simplified TopoJSON topology.
+
+The raw geojson repeats every shared UC edge in both neighbours and carries
+~9,300 full-precision vertices whatever the zoom. Here the polygons are
+turned into a topology once per data version:
+
+1. coordinates are snapped to a `QUANTIZATION`-step integer grid (the same
+   scale on both axes, so grid distances are isotropic),
+2. rings are cut into arcs at junctions — vertices where the set of
+   neighbouring UCs changes — and identical arcs are stored once, so a
+   border between two UCs is a single arc both reference,
+3. every arc vertex gets a Douglas–Peucker weight: the tolerance above
+   which it would be dropped.
+
+`topology(zoom)` then only has to keep the vertices whose weight beats the
+zoom's one-pixel tolerance and delta-encode the arcs. Because each shared
+arc is simplified once, neighbouring UCs can't drift apart at any zoom;
+junctions are never removed.
+"""
+
+import math
+from itertools import pairwise
+
+from .data_files import derived_data
+from .uc_geometry import uc_polygons
+
+# Grid steps across the larger side of the UC extent.
+QUANTIZATION = 100_000
+
+# Below MIN_ZOOM the whole division is a few hundred pixels wide; anything
+# coarser than MIN_ZOOM's geometry would only drop more UCs to slivers.
+# Past MAX_ZOOM one pixel is under a few grid steps, so serve full detail.
+MIN_ZOOM = 8
+MAX_ZOOM = 16
+
+# Simplification tolerance, in screen pixels (256px tiles).
+TOLERANCE_PIXELS = 1.0
+
+OBJECT_NAME = "ucs"
+
+
+def effective_zoom(zoom):
+    """The zoom a request is served at: clamped to MIN_ZOOM, None = full detail."""
+    if zoom is None or zoom > MAX_ZOOM:
+        return None
+    return max(zoom, MIN_ZOOM)
+
+
+# ----------------------------------------------------------------------------
+# Topology (once per data version)
+# ----------------------------------------------------------------------------
+
+def _base_topology():
+    return derived_data("uc_topology", _build_base_topology)
+
+
+def _build_base_topology():
+    features = uc_polygons()
+    lons = [lon for _, _, polys in features for poly in polys for ring in poly for lon, _ in ring]
+    lats = [lat for _, _, polys in features for poly in polys for ring in poly for _, lat in ring]
+    if not lons:
+        return {"transform": None, "mid_lat": 0.0, "arcs": [], "weights": [], "geometries": []}
+
+    x0, y0 = min(lons), min(lats)
+    scale = max(max(lons) - x0, max(lats) - y0) / (QUANTIZATION - 1) or 1.0
+
+    def quantize(ring):
+        points = []
+        for lon, lat in ring:
+            point = (round((lon - x0) / scale), round((lat - y0) / scale))
+            if not points or points[-1] != point:
+                points.append(point)
+        if len(points) > 1 and points[0] == points[-1]:
+            points.pop()
+        return points
+
+    shapes = []
+    for uc_code, uc_name, polygons in features:
+        rings = [[quantize(ring) for ring in poly] for poly in polygons]
+        rings = [[ring for ring in poly if len(ring) >= 3] for poly in rings]
+        shapes.append((uc_code, uc_name, [poly for poly in rings if poly]))
+
+    junctions = _junctions(ring for _, _, polys in shapes for poly in polys for ring in poly)
+
+    arcs, arc_index = [], {}
+    geometries = []
+    for uc_code, uc_name, polygons in shapes:
+        geometry_arcs = [
+            [
+                [_arc_ref(arc, arcs, arc_index) for arc in _cut_ring(ring, junctions)]
+                for ring in poly
+            ]
+            for poly in polygons
+        ]
+        geometries.append((uc_code, uc_name, geometry_arcs))
+
+    return {
+        "transform": {"scale": [scale, scale], "translate": [x0, y0]},
+        "mid_lat": (min(lats) + max(lats)) / 2,
+        "arcs": arcs,
+        "weights": [_dp_weights(arc) for arc in arcs],
+        "geometries": geometries,
+    }
+
+
+def _junctions(rings):
+    """Vertices whose neighbour pair differs between the rings that visit them."""
+    seen = {}
+    junctions = set()
+    for ring in rings:
+        n = len(ring)
+        for i, point in enumerate(ring):
+            pair = frozenset((ring[i - 1], ring[(i + 1) % n]))
+            first = seen.setdefault(point, pair)
+            if first != pair:
+                junctions.add(point)
+    return junctions
+
+
+def _cut_ring(ring, junctions):
+    """Split a ring into arcs between junctions; one closed arc if it has none."""
+    starts = [i for i, point in enumerate(ring) if point in junctions]
+    if not starts:
+        # Canonical rotation so an identical ring elsewhere dedupes.
+        start = ring.index(min(ring))
+        rotated = ring[start:] + ring[:start]
+        return [tuple(rotated + rotated[:1])]
+    rotated = ring[starts[0]:] + ring[:starts[0]]
+    offsets = [i - starts[0] for i in starts] + [len(ring)]
+    closed = rotated + rotated[:1]
+    return [tuple(closed[a:b + 1]) for a, b in pairwise(offsets)]
+
+
+def _arc_ref(arc, arcs, arc_index):
+    """Index of `arc` in `arcs` (appending it if new); `~i` if stored reversed."""
+    ref = arc_index.get(arc)
+    if ref is not None:
+        return ref
+    # Closed arcs start at their minimum vertex either way round, so a plain
+    # reversal finds them too.
+    ref = arc_index.get(arc[::-1])
+    if ref is not None:
+        return ~ref
+    arcs.append(arc)
+    arc_index[arc] = len(arcs) - 1
+    return len(arcs) - 1
+
+
+def _segment_distance(p, a, b):
+    (px, py), (ax, ay), (bx, by) = p, a, b
+    dx, dy = bx - ax, by - ay
+    if dx == 0 and dy == 0:
+        return math.hypot(px - ax, py - ay)
+    t = max(0.0, min(1.0, ((px - ax) * dx + (py - ay) * dy) / (dx * dx + dy * dy)))
+    return math.hypot(px - ax - t * dx, py - ay - t * dy)
+
+
+def _dp_weights(arc):
+    """
+    Douglas–Peucker weight per vertex: the vertex survives any tolerance
+    below its weight. Weights never exceed their parent split's, so a
+    vertex is only kept if the one that introduced its span is.
+    """
+    n = len(arc)
+    weights = [0.0] * n
+    weights[0] = weights[-1] = math.inf
+    stack = [(0, n - 1, math.inf)]
+    while stack:
+        first, last, cap = stack.pop()
+        if last - first < 2:
+            continue
+        best, best_i = -1.0, first + 1
+        for i in range(first + 1, last):
+            d = _segment_distance(arc[i], arc[first], arc[last])
+            if d > best:
+                best, best_i = d, i
+        weight = min(best, cap)
+        weights[best_i] = weight
+        stack.append((first, best_i, weight))
+        stack.append((best_i, last, weight))
+    return weights
+
+
+# ----------------------------------------------------------------------------
+# Per-zoom output
+# ----------------------------------------------------------------------------
+
+def _tolerance(zoom, scale, lat):
+    """One-pixel tolerance at `zoom`, in grid steps (Mercator y-pixel at `lat`)."""
+    pixel_degrees = 360.0 / (256 * 2**zoom) * math.cos(math.radians(lat))
+    return TOLERANCE_PIXELS * pixel_degrees / scale
+
+
+def _simplify(arc, weights, tolerance, min_points):
+    if tolerance <= 0:
+        return list(arc)
+    keep = {i for i, w in enumerate(weights) if w >= tolerance}
+    if len(keep) < min_points:
+        ranked = sorted(range(len(arc)), key=lambda i: -weights[i])
+        keep.update(ranked[:min_points])
+    return [arc[i] for i in sorted(keep)]
+
+
+def _delta_encode(points):
+    encoded = []
+    px = py = 0
+    for x, y in points:
+        encoded.append([x - px, y - py])
+        px, py = x, y
+    return encoded
+
+
+def topology(zoom=None):
+    """
+    TopoJSON `Topology` of the UC boundaries simplified for `zoom` (full
+    detail for None). One `ucs` GeometryCollection; each geometry carries
+    `uc_code` / `uc_name` properties.
+    """
+    base = _base_topology()
+    transform = base["transform"]
+    arcs, weights = base["arcs"], base["weights"]
+
+    tolerance = 0.0
+    if zoom is not None and transform is not None:
+        tolerance = _tolerance(zoom, transform["scale"][0], base["mid_lat"])
+
+    # A ring made of one or two arcs must keep enough vertices per arc to
+    # stay a ring rather than collapse to a line.
+    min_points = [2] * len(arcs)
+    for _, _, polygons in base["geometries"]:
+        for poly in polygons:
+            for ring in poly:
+                need = 4 if len(ring) == 1 else 3 if len(ring) == 2 else 2
+                for ref in ring:
+                    i = ~ref if ref < 0 else ref
+                    min_points[i] = max(min_points[i], need)
+
+    geometries = []
+    for uc_code, uc_name, polygons in base["geometries"]:
+        if len(polygons) == 1:
+            geometry = {"type": "Polygon", "arcs": polygons[0]}
+        else:
+            geometry = {"type": "MultiPolygon", "arcs": polygons}
+        geometry["properties"] = {"uc_code": uc_code, "uc_name": uc_name}
+        geometries.append(geometry)
+
+    return {
+        "type": "Topology",
+        "zoom": zoom,
+        "transform": transform,
+        "objects": {
+            OBJECT_NAME: {"type": "GeometryCollection", "geometries": geometries},
+        },
+        "arcs": [
+            _delta_encode(_simplify(arc, w, tolerance, need))
+            for arc, w, need in zip(arcs, weights, min_points, strict=True)
+        ],
+    }
@@ -0,0 +1,259 @@
+"""
+Mapbox Vector Tile (MVT 2.1) encoding of the UC polygons.
+
+Everything is plain Python: polygons are projected to Web Mercator once per
+data version (`_mercator_features`); a tile then scales the features whose
+bounding box touches it into tile space, clips each ring to the tile plus a
+small buffer (Sutherland–Hodgman), snaps to the integer grid and writes
+the protobuf by hand. The tile format is small enough that a dependency
+isn't worth it:
+
+    Tile    { repeated Layer layers = 3; }
+    Layer   { version = 15; name = 1; features = 2; keys = 3; values = 4; extent = 5; }
+    Feature { id = 1; tags = 2 (packed); type = 3; geometry = 4 (packed); }
+    Value   { string_value = 1; double_value = 3; }
+"""
+
+import math
+import struct
+
+from .data_files import derived_data
+from .uc_geometry import uc_polygons
+
+LAYER_NAME = "ucs"
+EXTENT = 4096
+BUFFER = 64  # tile units of overlap so strokes don't seam at tile edges
+MAX_ZOOM = 22
+
+_POLYGON = 3
+_MOVE_TO, _LINE_TO, _CLOSE_PATH = 1, 2, 7
+
+
+# ----------------------------------------------------------------------------
+# Projection
+# ----------------------------------------------------------------------------
+
+def _mercator(lon, lat):
+    """lon/lat → Web Mercator in [0, 1] × [0, 1], y growing southwards."""
+    lat = max(min(lat, 85.05112878), -85.05112878)
+    x = (lon + 180.0) / 360.0
+    s = math.sin(math.radians(lat))
+    y = 0.5 - math.log((1 + s) / (1 - s)) / (4 * math.pi)
+    return x, y
+
+
+def _mercator_features():
+    """`[(uc_code, uc_name, polygons, bbox)]` in unit Mercator space."""
+    return derived_data("uc_polygons_mercator", _build_mercator_features)
+
+
+def _build_mercator_features():
+    features = []
+    for uc_code, uc_name, polygons in uc_polygons():
+        projected = [
+            [[_mercator(lon, lat) for lon, lat in ring] for ring in polygon]
+            for polygon in polygons
+        ]
+        xs = [x for polygon in projected for ring in polygon for x, _ in ring]
+        ys = [y for polygon in projected for ring in polygon for _, y in ring]
+        if not xs:
+            continue
+        features.append((uc_code, uc_name, projected, (min(xs), min(ys), max(xs), max(ys))))
+    return features
+
+
+# ----------------------------------------------------------------------------
+# Clipping
+# ----------------------------------------------------------------------------
+
+def _clip_ring(ring, lo, hi):
+    """Clip a closed ring to the square [lo, hi]², Sutherland–Hodgman style."""
+    edges = (
+        (lambda p: p[0] >= lo, lambda a, b: _cross_x(a, b, lo)),
+        (lambda p: p[0] <= hi, lambda a, b: _cross_x(a, b, hi)),
+        (lambda p: p[1] >= lo, lambda a, b: _cross_y(a, b, lo)),
+        (lambda p: p[1] <= hi, lambda a, b: _cross_y(a, b, hi)),
+    )
+    points = ring
+    for inside, intersect in edges:
+        if not points:
+            break
+        clipped = []
+        prev = points[-1]
+        for cur in points:
+            if inside(cur):
+                if not inside(prev):
+                    clipped.append(intersect(prev, cur))
+                clipped.append(cur)
+            elif inside(prev):
+                clipped.append(intersect(prev, cur))
+            prev = cur
+        points = clipped
+    return points
+
+
+def _cross_x(a, b, x):
+    t = (x - a[0]) / (b[0] - a[0])
+    return x, a[1] + t * (b[1] - a[1])
+
+
+def _cross_y(a, b, y):
+    t = (y - a[1]) / (b[1] - a[1])
+    return a[0] + t * (b[0] - a[0]), y
+
+
+def _signed_area(ring):
+    """Surveyor's formula in tile coordinates (positive = clockwise on screen)."""
+    area = 0
+    for (x0, y0), (x1, y1) in zip(ring, ring[1:] + ring[:1], strict=True):
+        area += x0 * y1 - x1 * y0
+    return area
+
+
+def _tile_rings(polygons, z, x, y):
+    """Clip, snap and orient a feature's rings for tile z/x/y; [] if nothing's left."""
+    scale = EXTENT * (1 << z)
+    ox, oy = x * EXTENT, y * EXTENT
+    rings = []
+    for polygon in polygons:
+        for ring_index, ring in enumerate(polygon):
+            local = [(px * scale - ox, py * scale - oy) for px, py in ring]
+            if len(local) > 1 and local[0] == local[-1]:
+                local.pop()
+            clipped = _clip_ring(local, -BUFFER, EXTENT + BUFFER)
+
+            snapped = []
+            for px, py in clipped:
+                point = (round(px), round(py))
+                if not snapped or snapped[-1] != point:
+                    snapped.append(point)
+            if len(snapped) > 1 and snapped[0] == snapped[-1]:
+                snapped.pop()
+            if len(snapped) < 3:
+                continue
+            area = _signed_area(snapped)
+            if area == 0:
+                continue
+            # MVT: exterior rings positive, holes negative.
+            exterior = ring_index == 0
+            if (area > 0) != exterior:
+                snapped.reverse()
+            rings.append(snapped)
+    return rings
+
+
+# ----------------------------------------------------------------------------
+# Protobuf
+# ----------------------------------------------------------------------------
+
+def _varint(n):
+    out = bytearray()
+    while True:
+        byte = n & 0x7F
+        n >>= 7
+        if n:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def _zigzag(n):
+    return (n << 1) ^ (n >> 63)
+
+
+def _field(number, wire_type):
+    return _varint((number << 3) | wire_type)
+
+
+def _bytes_field(number, payload):
+    return _field(number, 2) + _varint(len(payload)) + payload
+
+
+def _packed(number, ints):
+    return _bytes_field(number, b"".join(_varint(i) for i in ints))
+
+
+def _geometry(rings):
+    commands = []
+    cx = cy = 0
+    for ring in rings:
+        x0, y0 = ring[0]
+        commands += [(1 << 3) | _MOVE_TO, _zigzag(x0 - cx), _zigzag(y0 - cy)]
+        cx, cy = x0, y0
+        commands.append(((len(ring) - 1) << 3) | _LINE_TO)
+        for px, py in ring[1:]:
+            commands += [_zigzag(px - cx), _zigzag(py - cy)]
+            cx, cy = px, py
+        commands.append((1 << 3) | _CLOSE_PATH)
+    return commands
+
+
+def _value(v):
+    if isinstance(v, str):
+        return _bytes_field(1, v.encode("utf-8"))
+    return _field(3, 1) + struct.pack("<d", float(v))
+
+
+def encode_layer(name, features, extent=EXTENT):
+    """`features` is `[(id, rings, {key: str | number})]` → one Layer message."""
+    keys, values = {}, {}
+    body = bytearray()
+    for feature_id, rings, properties in features:
+        tags = []
+        for key, val in properties.items():
+            if val is None:
+                continue
+            tags.append(keys.setdefault(key, len(keys)))
+            tags.append(values.setdefault((type(val) is str, val), len(values)))
+        message = (
+            _field(1, 0) + _varint(feature_id)
+            + _packed(2, tags)
+            + _field(3, 0) + _varint(_POLYGON)
+            + _packed(4, _geometry(rings))
+        )
+        body += _bytes_field(2, message)
+
+    layer = bytearray(_field(15, 0) + _varint(2) + _bytes_field(1, name.encode("utf-8")))
+    layer += body
+    for key in keys:
+        layer += _bytes_field(3, key.encode("utf-8"))
+    for _, val in values:
+        layer += _bytes_field(4, _value(val))
+    layer += _field(5, 0) + _varint(extent)
+    return bytes(layer)
+
+
+# ----------------------------------------------------------------------------
+# Tiles
+# ----------------------------------------------------------------------------
+
+def valid_tile(z, x, y):
+    return 0 <= z <= MAX_ZOOM and 0 <= x < (1 << z) and 0 <= y < (1 << z)
+
+
+def render_uc_tile(z, x, y, properties):
+    """
+    MVT bytes for tile z/x/y with one `ucs` layer. `properties` maps
+    uc_code → feature properties; UCs without an entry still get their
+    code and name. Returns b"" if no UC touches the tile.
+    """
+    size = 1.0 / (1 << z)
+    pad = size * BUFFER / EXTENT
+    x0, y0 = x * size - pad, y * size - pad
+    x1, y1 = (x + 1) * size + pad, (y + 1) * size + pad
+
+    features = []
+    for feature_id, (uc_code, uc_name, polygons, bbox) in enumerate(_mercator_features(), 1):
+        if bbox[2] < x0 or bbox[0] > x1 or bbox[3] < y0 or bbox[1] > y1:
+            continue
+        rings = _tile_rings(polygons, z, x, y)
+        if not rings:
+            continue
+        props = {"uc_code": uc_code, "uc_name": uc_name}
+        props.update(properties.get(uc_code, {}))
+        features.append((feature_id, rings, props))
+
+    if not features:
+        return b""
+    return _bytes_field(3, encode_layer(LAYER_NAME, features))
@@ -0,0 +1,79 @@
+"""
+Shared fixtures. The forecast tables are unmanaged (they live in Supabase),
+so the test database gets them created from the models once per session.
+"""
+
+import datetime
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+
+from api import models
+from api.services import area_index
+
+UNMANAGED_MODELS = (
+    models.ForecastRun,
+    models.Location,
+    models.EmissionPoint,
+    models.LocationSummary,
+    models.LocationAreaSlug,
+    models.EmissionMonthlyRollup,
+    models.LocationPointTotal,
+    models.LocationLatestPoint,
+    models.RollupRun,
+)
+
+
+@pytest.fixture(scope="session")
+def django_db_setup(django_db_setup, django_db_blocker):
+    with django_db_blocker.unblock(), connection.schema_editor() as editor:
+        for model in UNMANAGED_MODELS:
+            editor.create_model(model)
+
+
+@pytest.fixture(autouse=True)
+def _fresh_caches(monkeypatch):
+    cache.clear()
+    monkeypatch.setattr(area_index, "_index", (None, {}))
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def make_run(db):
+    """`make_run(sector, {source: [(date, emissions, point_type), ...]})` → ForecastRun."""
+
+    def make(sector, points_by_source):
+        day = datetime.date(2024, 1, 1)
+        run = models.ForecastRun.objects.create(
+            pipeline="test",
+            generated_at=datetime.datetime(2024, 1, 1, tzinfo=datetime.UTC),
+            data_source="test",
+            sector=sector,
+            region="test",
+            historical_start=day,
+            historical_end=day,
+            forecast_horizon_months=12,
+            forecast_start=day,
+            forecast_end=day,
+            model_architecture="test",
+            is_active=True,
+        )
+        for source, points in points_by_source.items():
+            location = models.Location.objects.create(
+                forecast_run=run, source=source, type="test", latitude=0, longitude=0
+            )
+            models.EmissionPoint.objects.bulk_create(
+                models.EmissionPoint(
+                    location=location,
+                    date=date,
+                    month_label=date.strftime("%b %Y"),
+                    emissions=emissions,
+                    point_type=point_type,
+                )
+                for date, emissions, point_type in points
+            )
+        return run
+
+    return make
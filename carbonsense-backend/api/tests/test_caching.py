@@ -0,0 +1,149 @@
+"""get_or_build: hits, stale-while-revalidate, single-flight and cache_if."""
+
+import threading
+import time
+
+import pytest
+from django.core.cache import cache
+from django.test import override_settings
+
+from api.services import caching
+from api.services.caching import get_or_build, store
+
+
+@pytest.fixture(autouse=True)
+def locmem():
+    with override_settings(
+        CACHES={
+            "default": {
+                "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                "LOCATION": "caching-tests",
+            }
+        }
+    ):
+        cache.clear()
+        yield
+        cache.clear()
+
+
+class Builder:
+    def __init__(self, payload="fresh"):
+        self.payload = payload
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.payload
+
+
+def _join_refresh(key):
+    for thread in threading.enumerate():
+        if thread.name == f"refresh:{key}":
+            thread.join(5)
+
+
+def test_hit_serves_the_cached_payload_without_building():
+    store("k", "cached")
+    build = Builder()
+
+    assert get_or_build("k", build) == "cached"
+    assert build.calls == 0
+
+
+def test_miss_builds_once_and_stores():
+    build = Builder()
+
+    assert get_or_build("k", build) == "fresh"
+    assert get_or_build("k", build) == "fresh"
+    assert build.calls == 1
+    assert cache.get("k:lock") is None
+
+
+def test_soft_expired_entry_is_served_stale_and_refreshed():
+    store("k", "stale", soft_ttl=-1)
+    build = Builder()
+
+    assert get_or_build("k", build) == "stale"
+    _join_refresh("k")
+
+    assert build.calls == 1
+    assert get_or_build("k", build) == "fresh"
+    assert cache.get("k:lock") is None
+
+
+def test_only_one_stale_refresh_runs_at_a_time():
+    store("k", "stale", soft_ttl=-1)
+    cache.add("k:lock", 1)
+    build = Builder()
+
+    assert get_or_build("k", build) == "stale"
+    assert not any(t.name == "refresh:k" for t in threading.enumerate())
+    assert build.calls == 0
+
+
+def test_waiter_takes_the_lock_holders_result(monkeypatch):
+    monkeypatch.setattr(caching, "_WAIT_STEP", 0.01)
+    cache.add("k:lock", 1)
+    timer = threading.Timer(0.1, lambda: store("k", "theirs"))
+    timer.start()
+    build = Builder("mine")
+
+    try:
+        assert get_or_build("k", build) == "theirs"
+    finally:
+        timer.join()
+    assert build.calls == 0
+
+
+def test_waiter_builds_when_the_holder_releases_without_storing(monkeypatch):
+    monkeypatch.setattr(caching, "_WAIT_STEP", 0.01)
+    cache.add("k:lock", 1)
+    timer = threading.Timer(0.05, lambda: cache.delete("k:lock"))
+    timer.start()
+    build = Builder()
+
+    try:
+        assert get_or_build("k", build) == "fresh"
+    finally:
+        timer.join()
+    assert build.calls == 1
+
+
+def test_waiter_builds_after_an_abandoned_lock_times_out(monkeypatch):
+    monkeypatch.setattr(caching, "_WAIT_STEP", 0.01)
+    cache.add("k:lock", 1)
+    build = Builder()
+
+    assert get_or_build("k", build, lock_timeout=0.05) == "fresh"
+    assert build.calls == 1
+
+
+def test_cache_if_vetoes_storing_empty_results():
+    build = Builder([])
+
+    assert get_or_build("k", build, cache_if=bool) == []
+    assert get_or_build("k", build, cache_if=bool) == []
+    assert build.calls == 2
+    assert cache.get("k") is None
+
+    build.payload = [1]
+    get_or_build("k", build, cache_if=bool)
+    assert get_or_build("k", build, cache_if=bool) == [1]
+    assert build.calls == 3
+
+
+def test_failed_build_releases_the_lock():
+    def build():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        get_or_build("k", build)
+    assert cache.get("k:lock") is None
+
+
+def test_legacy_bare_values_are_rebuilt():
+    cache.set("k", ["not", "an", "envelope"])
+    build = Builder()
+
+    assert get_or_build("k", build) == "fresh"
+    assert time.time() < cache.get("k")[1]
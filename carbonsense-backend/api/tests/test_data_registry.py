@@ -0,0 +1,163 @@
+"""DataFileRegistry: change detection, background reload, version and derived values."""
+
+import json
+import os
+import time
+
+import pytest
+
+from api.services import data_registry
+from api.services.data_registry import DataFileRegistry
+
+
+def _write(path, doc, mtime_ns):
+    path.write_text(json.dumps(doc))
+    # Pin the mtime so same-size rewrites within one clock tick still differ.
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def _settle(registry, name, timeout=5.0):
+    """Wait for a background reload of `name` to finish."""
+    deadline = time.monotonic() + timeout
+    while registry._files[name].reloading:
+        assert time.monotonic() < deadline, "reload did not finish"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    _write(tmp_path / "a.json", {"value": 1, "rest": [1, 2]}, 1_000_000_000)
+    _write(tmp_path / "b.geojson", {"type": "FeatureCollection"}, 1_000_000_000)
+    (tmp_path / "notes.txt").write_text("not data")
+    return tmp_path
+
+
+@pytest.fixture
+def registry(data_dir):
+    # check_interval=0: every access re-stats, so tests needn't sleep.
+    return DataFileRegistry(str(data_dir), check_interval=0)
+
+
+def _reload_finished(registry, name):
+    """Trigger the stat check and wait for the reload it may start."""
+    registry.get(name)
+    _settle(registry, name)
+
+
+def test_rewrite_reloads_in_background_and_moves_version(registry, data_dir):
+    builds = []
+
+    def build():
+        builds.append(1)
+        return registry.get("a.json")["value"] * 10
+
+    assert registry.derived("x", build) == 10
+    version = registry.version()
+
+    _write(data_dir / "a.json", {"value": 2, "rest": [1, 2]}, 2_000_000_000)
+    # The access that notices the change is still served the current copy.
+    assert registry.get("a.json")["value"] == 1
+    _settle(registry, "a.json")
+
+    assert registry.get("a.json")["value"] == 2
+    assert registry.version() != version
+    assert registry.derived("x", build) == 20
+    assert len(builds) == 2
+
+
+def test_unchanged_file_does_not_rebuild(registry, monkeypatch):
+    builds = []
+    registry.derived("x", lambda: builds.append(1))
+    version = registry.version()
+
+    # Stamp unchanged: no reload is even attempted.
+    monkeypatch.setattr(data_registry.threading, "Thread", _NoThread)
+    for _ in range(3):
+        registry.get("a.json")
+        registry.derived("x", lambda: builds.append(1))
+
+    assert registry.version() == version
+    assert builds == [1]
+
+
+def test_touch_without_byte_change_keeps_version_and_refreshes_stamp(registry, data_dir):
+    data = registry.get("a.json")
+    version = registry.version()
+
+    os.utime(data_dir / "a.json", ns=(3_000_000_000, 3_000_000_000))
+    _reload_finished(registry, "a.json")
+
+    entry = registry._files["a.json"]
+    assert entry.stamp[1] == 3_000_000_000
+    assert registry.get("a.json") is data
+    assert registry.version() == version
+
+
+def test_projections_are_views_of_one_digest(registry, data_dir):
+    full = registry.get("a.json")
+    projected = registry.get("a.json", ("value",))
+
+    assert full == {"value": 1, "rest": [1, 2]}
+    assert projected == {"value": 1}
+    assert registry.get("a.json", ("value",)) is projected
+
+    _write(data_dir / "a.json", {"value": 5, "rest": []}, 4_000_000_000)
+    _reload_finished(registry, "a.json")
+
+    # Every view is re-read from the new bytes together.
+    entry = registry._files["a.json"]
+    assert entry.views == {None: {"value": 5, "rest": []}, ("value",): {"value": 5}}
+
+
+def test_bad_json_keeps_serving_the_last_good_copy(registry, data_dir):
+    registry.get("a.json")
+    (data_dir / "a.json").write_text('{"value": ')
+    os.utime(data_dir / "a.json", ns=(5_000_000_000, 5_000_000_000))
+
+    _reload_finished(registry, "a.json")
+
+    assert registry.get("a.json")["value"] == 1
+
+
+def test_version_covers_unloaded_files_and_digests_each_stamp_once(
+    registry, data_dir, monkeypatch
+):
+    digested = []
+    digest_file = data_registry._digest_file
+    monkeypatch.setattr(
+        data_registry, "_digest_file", lambda path: digested.append(path) or digest_file(path)
+    )
+
+    version = registry.version()
+    assert registry.version() == version
+    # Both data files hashed once; notes.txt isn't a data file.
+    assert sorted(os.path.basename(p) for p in digested) == ["a.json", "b.geojson"]
+
+    _write(data_dir / "b.geojson", {"type": "Feature"}, 6_000_000_000)
+    assert registry.version() != version
+    assert len(digested) == 3
+
+
+def test_version_is_the_same_for_loaded_and_unloaded_files(data_dir):
+    cold = DataFileRegistry(str(data_dir), check_interval=0)
+    warm = DataFileRegistry(str(data_dir), check_interval=0)
+    warm.get("a.json", ("value",))
+
+    assert cold.version() == warm.version()
+
+
+def test_version_is_rate_limited_by_check_interval(data_dir):
+    registry = DataFileRegistry(str(data_dir), check_interval=3600)
+    version = registry.version()
+
+    _write(data_dir / "b.geojson", {"type": "Feature"}, 7_000_000_000)
+
+    assert registry.version() == version
+
+
+class _NoThread:
+    def __init__(self, **kwargs):
+        pass
+
+    def start(self):
+        raise AssertionError("reload started")
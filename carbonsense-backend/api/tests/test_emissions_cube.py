@@ -0,0 +1,79 @@
+"""The cube-backed uc-summary matches the per-sector builder dicts it replaced."""
+
+import pytest
+
+from api.services.data_files import (
+    SECTOR_DATES,
+    build_buildings_by_uc,
+    build_industry_by_uc,
+    build_transport_by_uc,
+    build_waste_by_uc,
+    find_month_index,
+)
+from api.services.emissions_cube import ANNUAL_KEYS, DATA_TYPES, SECTORS, get_cube
+from api.services.runs import safe_float
+from api.services.uc_summary import build_summary
+
+_BUILDERS = {
+    "transport": build_transport_by_uc,
+    "buildings": build_buildings_by_uc,
+    "waste": build_waste_by_uc,
+    "industry": build_industry_by_uc,
+}
+
+
+def _builder_output(sector, data_type):
+    """`(dates, {uc_code: record})` from the old builders; empty if the file is missing."""
+    try:
+        return SECTOR_DATES[sector](data_type), _BUILDERS[sector](data_type)
+    except FileNotFoundError:
+        return [], {}
+
+
+def _dict_display(record, sector, view_mode, month_index):
+    """How the pre-cube summary derived one sector's display value."""
+    if not record:
+        return 0.0
+    if view_mode == "yearly":
+        return safe_float(record.get(ANNUAL_KEYS[sector]))
+    monthly = record.get("monthly_t", [])
+    return safe_float(monthly[month_index]) if 0 <= month_index < len(monthly) else 0.0
+
+
+def _cases():
+    for data_type in DATA_TYPES:
+        yield data_type, "yearly", ""
+        months = get_cube(data_type).months
+        for month in (months[0], months[len(months) // 2], months[-1], "1999-01"):
+            yield data_type, "monthly", month
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("data_type, view_mode, month", list(_cases()))
+def test_summary_matches_the_builder_dicts(data_type, view_mode, month):
+    loaded = {sector: _builder_output(sector, data_type) for sector in SECTORS}
+    by_uc = {sector: records for sector, (_, records) in loaded.items()}
+    month_index = {sector: find_month_index(dates, month) for sector, (dates, _) in loaded.items()}
+
+    entries = build_summary(data_type, view_mode, month)
+
+    assert entries
+    for entry in entries:
+        code = entry["uc_code"]
+        total_display = total_annual = 0.0
+        for sector in SECTORS:
+            record = by_uc[sector].get(code)
+            display = _dict_display(record, sector, view_mode, month_index[sector])
+            total_display += display
+            total_annual += safe_float(record.get(ANNUAL_KEYS[sector])) if record else 0.0
+            if record is None:
+                assert entry["sectors"][sector] is None, (code, sector)
+                continue
+            cube_sector = entry["sectors"][sector]
+            assert cube_sector["display_t"] == pytest.approx(round(display, 2), abs=0.01)
+            assert cube_sector[ANNUAL_KEYS[sector]] == record[ANNUAL_KEYS[sector]]
+
+        # No energy runs in the test database, so energy adds nothing.
+        assert entry["sectors"]["energy"] == 0
+        assert entry["display_t"] == pytest.approx(total_display, abs=0.02)
+        assert entry["total_annual_t"] == pytest.approx(total_annual, abs=0.02)
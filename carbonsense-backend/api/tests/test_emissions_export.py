@@ -0,0 +1,75 @@
+"""/api/emissions/export/: filters are validated before anything is streamed."""
+
+import datetime
+import json
+
+import pytest
+
+EXPORT_URL = "/api/emissions/export/"
+
+
+@pytest.fixture
+def points(make_run):
+    make_run(
+        "transport",
+        {
+            "Main Road": [
+                (datetime.date(2024, 1, 1), 10.0, "historical"),
+                (datetime.date(2024, 2, 1), 20.0, "historical"),
+                (datetime.date(2024, 3, 1), 30.0, "forecast"),
+            ],
+        },
+    )
+
+
+def _ndjson(response):
+    return [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+
+
+@pytest.mark.parametrize("param", ["start_date", "end_date"])
+def test_invalid_date_is_a_400_not_a_stream(client, points, param):
+    response = client.get(EXPORT_URL, {param: "2024-13-01"})
+
+    assert response.status_code == 400
+    assert not response.streaming
+    assert "Content-Disposition" not in response
+    assert param in response.json()["detail"]
+
+
+def test_list_endpoint_rejects_the_same_dates(client, points):
+    response = client.get("/api/emissions/", {"start_date": "yesterday"})
+
+    assert response.status_code == 400
+    assert "start_date" in response.json()["detail"]
+
+
+def test_ndjson_export_applies_filters(client, points):
+    response = client.get(
+        EXPORT_URL, {"start_date": "2024-02-01", "data_type": "historical"}
+    )
+
+    assert response.status_code == 200
+    assert response["Content-Type"].startswith("application/x-ndjson")
+    assert response["Content-Disposition"] == 'attachment; filename="emissions.ndjson"'
+    rows = _ndjson(response)
+    assert [(r["date"], r["transport"], r["total"], r["type"]) for r in rows] == [
+        ("2024-02-01", 20.0, 20.0, "historical")
+    ]
+    assert rows[0]["area_id"] == "main_road_transport"
+
+
+def test_csv_export(client, points):
+    response = client.get(EXPORT_URL, {"format": "csv", "area_id": "main_road_transport"})
+
+    assert response.status_code == 200
+    assert response["Content-Type"].startswith("text/csv")
+    lines = b"".join(response.streaming_content).decode().splitlines()
+    assert lines[0].split(",")[:4] == ["id", "area_id", "area_name", "date"]
+    assert [line.split(",")[3] for line in lines[1:]] == ["2024-01-01", "2024-02-01", "2024-03-01"]
+
+
+def test_unknown_area_exports_nothing(client, points):
+    response = client.get(EXPORT_URL, {"area_id": "nowhere_energy"})
+
+    assert response.status_code == 200
+    assert _ndjson(response) == []
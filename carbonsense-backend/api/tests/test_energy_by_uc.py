@@ -0,0 +1,35 @@
+"""Energy facilities are attributed to UCs at their own mean monthly output."""
+
+import datetime
+
+import pytest
+
+from api.models import Location
+from api.services.data_files import build_energy_by_uc
+from api.services.uc_geometry import locate_ucs, uc_polygons
+
+
+def _point_inside_some_uc():
+    for code, _, polygons in uc_polygons():
+        ring = polygons[0][0]
+        lon = sum(x for x, _ in ring) / len(ring)
+        lat = sum(y for _, y in ring) / len(ring)
+        if locate_ucs([lon], [lat]) == [code]:
+            return code, lon, lat
+    pytest.skip("no UC contains its own vertex mean")
+
+
+def test_each_facility_is_averaged_over_its_own_months(make_run):
+    code, lon, lat = _point_inside_some_uc()
+    months = [datetime.date(2024, m, 1) for m in range(1, 5)]
+    make_run(
+        "energy",
+        {
+            # 2 months: mean 15. Dividing by the run's 4 dates would give 7.5.
+            "Young Plant": [(months[0], 10.0, "historical"), (months[1], 20.0, "historical")],
+            "Old Plant": [(d, 4.0, "historical") for d in months],
+        },
+    )
+    Location.objects.update(longitude=lon, latitude=lat)
+
+    assert build_energy_by_uc("historical") == {code: pytest.approx(19.0)}
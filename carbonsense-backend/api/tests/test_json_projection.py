@@ -0,0 +1,123 @@
+"""Streaming projection (ijson) against `json.load` + `project`."""
+
+import io
+import json
+import os
+
+import pytest
+
+from api.services import json_projection
+from api.services.data_files import DATA_DIR, UC_FIELDS, load_uc_file
+from api.services.json_projection import compile_projection, project, read_projected
+from recommendations.agent import _UC_DATA_FIELDS
+
+DOC = {
+    "metadata": {"sector": "transport", "run_audit": {"steps": [1, 2, 3]}},
+    "rag_chunks": [{"text": "skipped"}] * 3,
+    "uc_emissions": [
+        {
+            "uc_code": "UC-1",
+            "forecast": {"annual_t": 1.5, "monthly_t": [1, 2, None]},
+            "series": [
+                {"date": "2024-01", "total_t": 3.0, "extra": {"deep": [1, {"x": 2}]}},
+                {"date": "2024-02"},  # no total_t
+                {"total_t": -0.0, "extra": None},
+            ],
+            "point_sources": [{"name": "skipped", "t": 9}],
+        },
+        # No forecast / series at all, and a null where an object is expected.
+        {"uc_code": "UC-2", "series": None},
+        {"uc_code": None, "forecast": {}, "series": []},
+    ],
+    "empty": {},
+    "scalar_list": ["a", 1, True, None, 2.25],
+}
+
+PATHS = (
+    "metadata.sector",
+    "metadata.missing",
+    "uc_emissions.*.uc_code",
+    "uc_emissions.*.forecast.annual_t",
+    "uc_emissions.*.series.*.date",
+    "uc_emissions.*.series.*.total_t",
+    "uc_emissions.*.series.*.extra",
+    "empty.anything",
+    "scalar_list.*",
+    "not_in_file.*.x",
+)
+
+
+def _both(doc, paths):
+    raw = json.dumps(doc).encode()
+    expected = project(json.loads(raw), compile_projection(paths))
+    return read_projected(io.BytesIO(raw), paths), expected
+
+
+def test_stream_matches_load_and_project():
+    streamed, expected = _both(DOC, PATHS)
+
+    assert streamed == expected
+    assert "rag_chunks" not in streamed
+    assert streamed["uc_emissions"][0] == {
+        "uc_code": "UC-1",
+        "forecast": {"annual_t": 1.5},
+        "series": [
+            {"date": "2024-01", "total_t": 3.0, "extra": {"deep": [1, {"x": 2}]}},
+            {"date": "2024-02"},
+            {"total_t": -0.0, "extra": None},
+        ],
+    }
+    assert streamed["uc_emissions"][1] == {"uc_code": "UC-2", "series": None}
+
+
+@pytest.mark.parametrize(
+    "paths",
+    [
+        # A captured parent swallows its children, in either order.
+        ("uc_emissions.*.forecast", "uc_emissions.*.forecast.annual_t"),
+        ("uc_emissions.*.forecast.annual_t", "uc_emissions.*.forecast"),
+        ("uc_emissions",),
+        # Wildcard on an object and a key on an array select nothing.
+        ("metadata.*", "scalar_list.x"),
+        (),
+    ],
+)
+def test_stream_matches_load_and_project_on_edge_paths(paths):
+    streamed, expected = _both(DOC, paths)
+    assert streamed == expected
+
+
+def test_fallback_without_ijson_gives_the_same_result(monkeypatch):
+    streamed, expected = _both(DOC, PATHS)
+    monkeypatch.setattr(json_projection, "ijson", None)
+    fallback, _ = _both(DOC, PATHS)
+    assert streamed == fallback == expected
+
+
+def test_invalid_json_raises_value_error():
+    with pytest.raises(ValueError):
+        read_projected(io.BytesIO(b'{"uc_emissions": [{"uc_code": '), PATHS)
+
+
+@pytest.mark.parametrize(
+    ("filename", "paths"),
+    [*UC_FIELDS.items(), *_UC_DATA_FIELDS.items()],
+)
+def test_data_file_projections_match_json_load(filename, paths):
+    path = os.path.join(DATA_DIR, filename)
+    if not os.path.exists(path):
+        pytest.skip(f"{filename} not in data/")
+    with open(path, "rb") as f:
+        expected = project(json.load(f), compile_projection(paths))
+    with open(path, "rb") as f:
+        assert read_projected(f, paths) == expected
+
+
+@pytest.mark.parametrize("filename", list(UC_FIELDS))
+def test_load_uc_file_serves_the_projection(filename):
+    path = os.path.join(DATA_DIR, filename)
+    if not os.path.exists(path):
+        pytest.skip(f"{filename} not in data/")
+    with open(path, "rb") as f:
+        expected = project(json.load(f), compile_projection(UC_FIELDS[filename]))
+    assert load_uc_file(filename) == expected
@@ -0,0 +1,87 @@
+"""/api/leaderboard/: ranks with ties, sector partitions, ordering and paging."""
+
+import pytest
+
+from api.models import Location, LocationSummary
+
+URL = "/api/leaderboard/"
+
+
+def _summary(location, average, change=0.0):
+    LocationSummary.objects.create(
+        location=location,
+        last_historical_date="2024-01",
+        last_historical_emissions=0,
+        forecast_12m_last=0,
+        forecast_12m_average=average,
+        forecast_12m_total=average * 12,
+        change_pct=change,
+        change_tonnes=0,
+        trend="increasing" if change > 0 else "stable",
+        total_historical_tonnes=0,
+    )
+
+
+@pytest.fixture
+def ranked(make_run):
+    make_run("transport", {"Road A": [], "Road B": [], "Road C": []})
+    make_run("industry", {"Mill A": [], "Mill B": []})
+    averages = {"Road A": 50, "Road B": 30, "Road C": 10, "Mill A": 30, "Mill B": 20}
+    for location in Location.objects.all():
+        _summary(location, averages[location.source], change=-averages[location.source])
+
+
+def _ranks(body):
+    return [(row["area_name"], row["rank"]) for row in body]
+
+
+def test_ties_share_a_rank_and_skip_the_next(client, ranked):
+    body = client.get(URL).json()
+
+    assert _ranks(body) == [
+        ("Road A", 1),
+        ("Mill A", 2),
+        ("Road B", 2),
+        ("Mill B", 4),
+        ("Road C", 5),
+    ]
+    assert body[0]["area_id"] == "road_a_transport"
+    assert body[0]["value"] == 50
+
+
+def test_sector_ranks_are_within_the_sector(client, ranked):
+    body = client.get(URL, {"sector": "industry"}).json()
+
+    assert _ranks(body) == [("Mill A", 1), ("Mill B", 2)]
+
+
+def test_other_metric_and_ascending_order(client, ranked):
+    # change_pct is -average, so the smallest average ranks first.
+    body = client.get(URL, {"metric": "change_pct", "order": "asc"}).json()
+
+    assert _ranks(body)[0] == ("Road A", 5)
+    assert _ranks(body)[-1] == ("Road C", 1)
+
+
+def test_paging_slices_with_a_total(client, ranked):
+    response = client.get(URL, {"limit": 2, "offset": 1})
+
+    assert response["X-Total-Count"] == "5"
+    assert _ranks(response.json()) == [("Mill A", 2), ("Road B", 2)]
+
+
+def test_malformed_paging_params_fall_back(client, ranked):
+    response = client.get(URL, {"limit": "lots", "offset": "-3"})
+
+    assert response.status_code == 200
+    assert len(response.json()) == 5
+
+
+@pytest.mark.parametrize(
+    "params", [{"sector": "mining"}, {"metric": "vibes"}, {"order": "sideways"}]
+)
+def test_invalid_choices_are_a_400(client, ranked, params):
+    response = client.get(URL, params)
+
+    assert response.status_code == 400
+    assert "detail" in response.json()
@@ -0,0 +1,310 @@
+"""
+Partitioning of `emission_points` and run replacement by the loader,
+against a real Postgres: set TEST_POSTGRES_URL to a database the tests may
+create (and drop) throwaway schemas in. Skipped otherwise.
+"""
+
+import json
+import os
+import uuid
+
+import psycopg2
+import pytest
+from django.core.management import call_command
+
+from api.management.commands import load_forecast_json
+from api.services.partitions import (
+    convert_to_partitioned,
+    create_run_partition,
+    drop_run_partitions,
+    is_partitioned,
+    run_partition_name,
+)
+
+PG_URL = os.environ.get("TEST_POSTGRES_URL")
+
+pytestmark = [
+    pytest.mark.postgres,
+    pytest.mark.skipif(not PG_URL, reason="TEST_POSTGRES_URL not set"),
+]
+
+# The columns of the Supabase-managed tables that the loader and the
+# partitioning code touch.
+SCHEMA_SQL = """
+    CREATE TABLE forecast_runs (
+        id serial PRIMARY KEY,
+        pipeline text, generated_at timestamptz, data_source text,
+        sector varchar(100), region text,
+        historical_start date, historical_end date, forecast_horizon_months integer,
+        forecast_start date, forecast_end date, model_architecture varchar(100),
+        lstm_input_features jsonb, json_weather_fields jsonb, weather_source text,
+        confidence_intervals text, design_notes jsonb, is_active boolean
+    );
+    CREATE TABLE aggregate_forecast_points (
+        id serial PRIMARY KEY,
+        forecast_run_id integer REFERENCES forecast_runs(id) ON DELETE CASCADE,
+        date date, value double precision, lower_bound double precision,
+        upper_bound double precision, temperature double precision,
+        cdd double precision, humidity double precision
+    );
+    CREATE TABLE locations (
+        id serial PRIMARY KEY,
+        forecast_run_id integer REFERENCES forecast_runs(id) ON DELETE CASCADE,
+        source text, type text, latitude double precision, longitude double precision,
+        uc_code text
+    );
+    CREATE TABLE location_summaries (
+        location_id integer PRIMARY KEY REFERENCES locations(id) ON DELETE CASCADE,
+        last_historical_date text, last_historical_emissions double precision,
+        forecast_12m_last double precision, forecast_12m_average double precision,
+        forecast_12m_total double precision, change_pct double precision,
+        change_tonnes double precision, trend text,
+        total_historical_tonnes double precision, sub_sector_data jsonb
+    );
+    CREATE TABLE emission_points (
+        id serial PRIMARY KEY,
+        location_id integer REFERENCES locations(id) ON DELETE CASCADE,
+        date date, month_label text, emissions double precision, point_type varchar(20),
+        temperature double precision, cdd double precision, humidity double precision,
+        lower_ci double precision, upper_ci double precision, confidence varchar(20),
+        actual double precision, predicted double precision, residual double precision
+    );
+"""
+
+
+@pytest.fixture
+def schema():
+    """A throwaway schema with the forecast tables; dropped afterwards."""
+    name = f"test_partitions_{uuid.uuid4().hex[:12]}"
+    conn = psycopg2.connect(PG_URL)
+    with conn, conn.cursor() as cur:
+        cur.execute(f"CREATE SCHEMA {name}")
+        cur.execute(f"SET search_path TO {name}")
+        cur.execute(SCHEMA_SQL)
+    try:
+        yield name
+    finally:
+        with conn, conn.cursor() as cur:
+            cur.execute(f"DROP SCHEMA {name} CASCADE")
+        conn.close()
+
+
+@pytest.fixture
+def cur(schema):
+    conn = psycopg2.connect(PG_URL, options=f"-c search_path={schema}")
+    cursor = conn.cursor()
+    yield cursor
+    conn.rollback()
+    conn.close()
+
+
+def _seed_run(cur, sector, points_per_type=2):
+    cur.execute(
+        "INSERT INTO forecast_runs (sector, region, is_active) VALUES (%s, 'Lahore', TRUE) "
+        "RETURNING id",
+        (sector,),
+    )
+    run_id = cur.fetchone()[0]
+    cur.execute(
+        "INSERT INTO locations (forecast_run_id, source, type, latitude, longitude) "
+        "VALUES (%s, 'Site', 't', 0, 0) RETURNING id",
+        (run_id,),
+    )
+    location_id = cur.fetchone()[0]
+    for point_type in ("historical", "forecast", "test_prediction"):
+        for month in range(1, points_per_type + 1):
+            cur.execute(
+                "INSERT INTO emission_points (location_id, date, month_label, emissions, point_type) "
+                "VALUES (%s, %s, '', 1.0, %s)",
+                (location_id, f"2024-{month:02d}-01", point_type),
+            )
+    return run_id
+
+
+def _count(cur, table):
+    cur.execute(f"SELECT count(*) FROM {table}")
+    return cur.fetchone()[0]
+
+
+def _exists(cur, table):
+    cur.execute("SELECT to_regclass(%s)", (table,))
+    return cur.fetchone()[0] is not None
+
+
+# ----------------------------------------------------------------------------
+# api.services.partitions
+# ----------------------------------------------------------------------------
+
+
+def test_convert_routes_rows_to_per_run_point_type_leaves(cur):
+    runs = [_seed_run(cur, "energy"), _seed_run(cur, "waste")]
+    cur.execute("SELECT max(id) FROM emission_points")
+    max_id = cur.fetchone()[0]
+    assert not is_partitioned(cur)
+
+    copied = convert_to_partitioned(cur)
+
+    assert copied == 12
+    assert is_partitioned(cur)
+    assert _count(cur, "emission_points_unpartitioned") == 12
+    for run_id in runs:
+        name = run_partition_name(run_id)
+        assert _count(cur, f"{name}_historical") == 2
+        assert _count(cur, f"{name}_forecast") == 2
+        assert _count(cur, f"{name}_other") == 2  # test_prediction → DEFAULT leaf
+    # New rows continue the old id sequence.
+    cur.execute("SELECT id FROM locations LIMIT 1")
+    cur.execute(
+        "INSERT INTO emission_points (location_id, date, month_label, emissions, point_type, "
+        "forecast_run_id) VALUES (%s, '2025-01-01', '', 1, 'forecast', %s) RETURNING id",
+        (cur.fetchone()[0], runs[0]),
+    )
+    assert cur.fetchone()[0] > max_id
+
+
+def test_drop_run_partitions_drops_only_the_given_runs(cur):
+    keep, retire = _seed_run(cur, "energy"), _seed_run(cur, "waste")
+    convert_to_partitioned(cur, keep_old=False)
+
+    assert drop_run_partitions(cur, [retire, 999_999]) == 1
+
+    assert not _exists(cur, run_partition_name(retire))
+    assert not _exists(cur, f"{run_partition_name(retire)}_forecast")
+    assert _count(cur, "emission_points") == 6
+    cur.execute("SELECT DISTINCT forecast_run_id FROM emission_points")
+    assert cur.fetchall() == [(keep,)]
+
+
+def test_create_run_partition_is_idempotent(cur):
+    _seed_run(cur, "energy")
+    convert_to_partitioned(cur, keep_old=False)
+    cur.execute("INSERT INTO forecast_runs (sector, region) VALUES ('x', 'y') RETURNING id")
+    run_id = cur.fetchone()[0]
+
+    create_run_partition(cur, run_id)
+    create_run_partition(cur, run_id)
+
+    assert _exists(cur, f"{run_partition_name(run_id)}_historical")
+
+
+def test_partition_command_converts_once(cur, load):
+    _seed_run(cur, "energy")
+    cur.connection.commit()
+
+    call_command("partition_emission_points", "--drop-old", stdout=open(os.devnull, "w"))
+    call_command("partition_emission_points", stdout=open(os.devnull, "w"))
+
+    assert is_partitioned(cur)
+    assert not _exists(cur, "emission_points_unpartitioned")
+    assert _count(cur, "emission_points") == 6
+
+
+# ----------------------------------------------------------------------------
+# load_forecast_json: the replacement run is inserted before the old one goes
+# ----------------------------------------------------------------------------
+
+
+def _forecast_json(tmp_path, value):
+    months = ["2024-01-01", "2024-02-01"]
+    data = {
+        "metadata": {
+            "sector": "energy",
+            "region": "Lahore",
+            "generated_at": "2024-03-01T00:00:00Z",
+            "historical_period": "2023-01 to 2023-12",
+            "forecast_horizon_months": 12,
+            "model_architecture": "test",
+        },
+        "aggregate_forecast": {
+            "dates": months, "values": [value, value], "lower": [0, 0], "upper": [0, 0],
+            "weather": [{}, {}],
+        },
+        "locations": [
+            {
+                "source": f"Plant {i}",
+                "type": "power_plant",
+                "coordinates": {"lat": 31.5, "lng": 74.3},
+                "chart_data": {
+                    "historical": [{"date": d, "month": "", "emissions": value} for d in months],
+                    "forecast": [{"date": d, "month": "", "emissions": value} for d in months],
+                },
+                "summary": {"forecast_12m_average": value, "trend": "stable"},
+            }
+            for i in range(2)
+        ],
+    }
+    path = tmp_path / f"energy_{value}.json"
+    path.write_text(json.dumps(data))
+    return str(path)
+
+
+@pytest.fixture
+def load(schema, monkeypatch):
+    """
+    Point the management commands' psycopg2 connections at the throwaway
+    schema; `load(path)` runs the loader.
+    """
+    connect = psycopg2.connect
+
+    def connect_to_schema(dsn, **kwargs):
+        kwargs.pop("sslmode", None)
+        return connect(PG_URL, options=f"-c search_path={schema}", **kwargs)
+
+    monkeypatch.setattr(psycopg2, "connect", connect_to_schema)
+    monkeypatch.setenv("SUPABASE_DB_URL", "postgresql://loader-under-test")
+
+    def run(path):
+        call_command("load_forecast_json", path, stdout=open(os.devnull, "w"))
+
+    return run
+
+
+def _runs(cur):
+    cur.execute("SELECT id FROM forecast_runs ORDER BY id")
+    return [row[0] for row in cur.fetchall()]
+
+
+@pytest.mark.parametrize("partitioned", [False, True])
+def test_loader_replaces_the_previous_run(cur, load, tmp_path, partitioned):
+    if partitioned:
+        convert_to_partitioned(cur, keep_old=False)
+        cur.connection.commit()
+
+    load(_forecast_json(tmp_path, 1.0))
+    (old,) = _runs(cur)
+    load(_forecast_json(tmp_path, 2.0))
+    (new,) = _runs(cur)
+
+    assert new != old
+    cur.execute("SELECT DISTINCT emissions FROM emission_points")
+    assert cur.fetchall() == [(2.0,)]
+    assert _count(cur, "locations") == 2
+    assert _count(cur, "location_area_slugs") == 2
+    cur.execute("SELECT DISTINCT forecast_run_id FROM location_point_totals")
+    assert cur.fetchall() == [(new,)]
+    if partitioned:
+        assert not _exists(cur, run_partition_name(old))
+        assert _exists(cur, f"{run_partition_name(new)}_forecast")
+
+
+def test_loader_retires_first_when_a_unique_index_spans_runs(cur, load, tmp_path):
+    # A constraint like this would make insert-then-delete fail.
+    cur.execute("CREATE UNIQUE INDEX locations_source_key ON locations (source)")
+    cur.execute("CREATE UNIQUE INDEX forecast_runs_slot_key ON forecast_runs (sector, region)")
+    cur.connection.commit()
+
+    load(_forecast_json(tmp_path, 1.0))
+    load(_forecast_json(tmp_path, 2.0))
+
+    assert len(_runs(cur)) == 1
+    cur.execute("SELECT DISTINCT emissions FROM emission_points")
+    assert cur.fetchall() == [(2.0,)]
+
+
+def test_run_scoped_unique_indexes_dont_block(cur):
+    cur.execute("CREATE UNIQUE INDEX locations_run_source ON locations (forecast_run_id, source)")
+
+    assert load_forecast_json._cross_run_unique_indexes(cur) == []
+
+    cur.execute("CREATE UNIQUE INDEX forecast_runs_slot ON forecast_runs (sector, region)")
+    assert load_forecast_json._cross_run_unique_indexes(cur) == ["forecast_runs_slot"]
@@ -0,0 +1,57 @@
+"""PolygonIndex: even–odd containment with holes, multi-part features, nearest fallback."""
+
+from api.services.polygon_index import PolygonIndex
+
+SQUARE = [(0, 0), (10, 0), (10, 10), (0, 10)]
+HOLE = [(3, 3), (7, 3), (7, 7), (3, 7)]
+
+
+def _index():
+    return PolygonIndex(
+        [
+            ("donut", [[SQUARE, HOLE]]),
+            # Sits inside the donut's hole; the hole must not claim its points.
+            ("island", [[[(4, 4), (6, 4), (6, 6), (4, 6)]]]),
+            # Two parts far apart, one feature.
+            ("pair", [[[(20, 0), (22, 0), (22, 2), (20, 2)]], [[(30, 0), (32, 0), (32, 2)]]]),
+        ]
+    )
+
+
+def test_points_in_the_ring_but_not_the_hole():
+    index = _index()
+
+    assert index.locate([1, 9, 5], [1, 9, 1]) == ["donut", "donut", "donut"]
+
+
+def test_hole_is_outside_the_polygon():
+    index = _index()
+
+    # (3.5, 3.5) is in the hole but off the island.
+    assert index.locate([3.5, 5], [3.5, 5]) == [None, "island"]
+
+
+def test_multi_part_feature():
+    index = _index()
+
+    assert index.locate([21, 31.5, 25], [1, 0.4, 1]) == ["pair", "pair", None]
+
+
+def test_nearest_falls_back_to_the_closest_centroid():
+    index = _index()
+
+    # Multi-part features use their first part's centroid: (21, 1) for "pair".
+    assert index.locate([-1, 26, 40], [5, 1, 1], nearest=True) == ["donut", "pair", "pair"]
+
+
+def test_points_inside_never_use_nearest():
+    index = _index()
+
+    assert index.locate([5, 1], [5, 1], nearest=True) == ["island", "donut"]
+
+
+def test_degenerate_rings_and_empty_index():
+    assert PolygonIndex([("line", [[[(0, 0), (1, 1)]]])]).locate([0.5], [0.5], nearest=True) == [
+        None
+    ]
+    assert PolygonIndex([]).locate([], []) == []
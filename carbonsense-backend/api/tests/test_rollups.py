@@ -0,0 +1,150 @@
+"""Rollup-backed readers against the raw emission_points aggregates."""
+
+import datetime
+from collections import defaultdict
+
+import pytest
+from django.db import connection
+from django.db.models import Sum
+from django.utils import timezone
+
+from api import models
+from api.services.rollups import (
+    latest_points,
+    location_monthly_means,
+    location_totals,
+    monthly_totals,
+    refresh_run_rollups,
+    rollups_cover,
+)
+
+JAN, FEB, MAR = (datetime.date(2024, month, 1) for month in (1, 2, 3))
+
+
+def _write_rollups(run):
+    """What `refresh_run_rollups` stores for `run`, computed point by point."""
+    monthly = defaultdict(list)
+    per_location = defaultdict(list)
+    for point in models.EmissionPoint.objects.filter(location__forecast_run=run):
+        monthly[point.point_type, point.date].append(point.emissions)
+        per_location[point.location_id, point.point_type].append(point)
+
+    models.EmissionMonthlyRollup.objects.bulk_create(
+        models.EmissionMonthlyRollup(
+            forecast_run=run, point_type=point_type, date=date,
+            total=sum(values), point_count=len(values),
+        )
+        for (point_type, date), values in monthly.items()
+    )
+    for (location_id, point_type), points in per_location.items():
+        dates = [p.date for p in points]
+        latest = max(points, key=lambda p: (p.date, p.id))
+        models.LocationPointTotal.objects.create(
+            location_id=location_id, forecast_run=run, point_type=point_type,
+            total=sum(p.emissions for p in points), point_count=len(points),
+            first_date=min(dates), last_date=max(dates),
+        )
+        models.LocationLatestPoint.objects.create(
+            location_id=location_id, forecast_run=run, point_type=point_type,
+            date=latest.date, emissions=latest.emissions,
+        )
+    models.RollupRun.objects.create(forecast_run=run, refreshed_at=timezone.now())
+
+
+@pytest.fixture
+def runs(make_run):
+    energy = make_run("energy", {
+        "Plant A": [
+            (JAN, 10.0, "historical"), (FEB, 20.0, "historical"),
+            (FEB, 5.0, "forecast"), (MAR, 7.0, "forecast"),
+        ],
+        "Plant B": [(JAN, 1.5, "historical"), (MAR, 2.5, "forecast")],
+        # Only test predictions: absent from every historical/forecast reader.
+        "Plant C": [(JAN, 99.0, "test_prediction")],
+    })
+    waste = make_run("waste", {
+        "Dump": [(JAN, 3.0, "historical"), (FEB, 4.0, "historical"), (FEB, 6.0, "forecast")],
+    })
+    return [energy.id, waste.id]
+
+
+def _monthly(run_ids):
+    qs, value_field, run_field = monthly_totals(run_ids)
+    rows = qs.values(run_field, "point_type", "date").annotate(t=Sum(value_field))
+    return {(r[run_field], r["point_type"], r["date"]): r["t"] for r in rows}
+
+
+def _readers(run_ids):
+    return {
+        "monthly_totals": _monthly(run_ids),
+        "location_totals": {
+            point_type: location_totals(run_ids, point_type)
+            for point_type in ("historical", "forecast")
+        },
+        "location_monthly_means": {
+            point_type: location_monthly_means(run_ids, point_type)
+            for point_type in ("historical", "forecast")
+        },
+        "latest_points": sorted(latest_points(run_ids, "forecast")),
+    }
+
+
+def test_rollups_match_the_emission_point_aggregates(runs):
+    assert not rollups_cover(runs)
+    direct = _readers(runs)
+
+    for run in models.ForecastRun.objects.filter(id__in=runs):
+        _write_rollups(run)
+    assert rollups_cover(runs)
+
+    assert _readers(runs) == direct
+    # Spot-check the direct figures themselves.
+    plant_a = models.Location.objects.get(source="Plant A").id
+    assert direct["location_totals"]["historical"][plant_a] == 30.0
+    assert direct["location_monthly_means"]["forecast"][plant_a] == 6.0
+    assert (runs[0], "historical", JAN) in direct["monthly_totals"]
+    assert direct["monthly_totals"][runs[0], "historical", JAN] == 11.5
+
+
+def test_partial_coverage_falls_back_to_emission_points(runs):
+    direct = _readers(runs)
+    energy = models.ForecastRun.objects.get(id=runs[0])
+    _write_rollups(energy)
+    # Corrupt the covered run's rollups: a fallback must not read them.
+    models.LocationPointTotal.objects.update(total=-1.0)
+    models.EmissionMonthlyRollup.objects.update(total=-1.0)
+
+    assert rollups_cover([runs[0]])
+    assert not rollups_cover(runs)
+    assert _readers(runs) == direct
+
+
+@pytest.mark.skipif(connection.vendor != "postgresql", reason="rollup SQL is Postgres-only")
+def test_refresh_run_rollups_sql_writes_the_same_rollups(runs):
+    tables = {
+        models.EmissionMonthlyRollup: ("forecast_run_id", "point_type", "date", "total",
+                                       "point_count"),
+        models.LocationPointTotal: ("location_id", "point_type", "total", "point_count",
+                                    "first_date", "last_date"),
+        models.LocationLatestPoint: ("location_id", "point_type", "date", "emissions"),
+        models.RollupRun: ("forecast_run_id",),
+    }
+
+    def snapshot():
+        return {
+            model.__name__: sorted(model.objects.values_list(*fields))
+            for model, fields in tables.items()
+        }
+
+    for run in models.ForecastRun.objects.filter(id__in=runs):
+        _write_rollups(run)
+    expected = snapshot()
+    with connection.cursor() as cur:
+        for run_id in runs:
+            refresh_run_rollups(cur, run_id)
+
+    assert snapshot() == expected
+
+
+def test_no_runs_are_never_covered(db):
+    assert not rollups_cover([])
@@ -0,0 +1,111 @@
+"""TieredCache: per-key invalidation across processes and local TTL capping."""
+
+import time
+
+import pytest
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import override_settings
+
+from api.services.tiered_cache import TieredCache
+
+
+class TTLLocMemCache(LocMemCache):
+    """LocMemCache with django-redis's `ttl()`, to exercise the TTL cap."""
+
+    def ttl(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        expires = self._expire_info.get(key, -1)
+        if expires == -1:
+            return 0
+        if expires is None:
+            return None
+        return max(0, int(expires - time.time()))
+
+
+def _tier(**options):
+    return TieredCache(
+        None, {"OPTIONS": {"SHARED_ALIAS": "shared", "INVALIDATION_CHECK_INTERVAL": 0, **options}}
+    )
+
+
+@pytest.fixture
+def shared():
+    with override_settings(
+        CACHES={
+            "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+            "shared": {
+                "BACKEND": "api.tests.test_tiered_cache.TTLLocMemCache",
+                "LOCATION": "tiered-cache-tests",
+                "TIMEOUT": 300,
+            },
+        }
+    ):
+        from django.core.cache import caches
+
+        caches["shared"].clear()
+        yield caches["shared"]
+
+
+def test_fill_of_new_key_keeps_other_processes_local_entries(shared):
+    w1, w2 = _tier(), _tier()
+    w1.set("uc_summary:forecast", [1, 2, 3])
+    assert w2.get("uc_summary:forecast") == [1, 2, 3]
+    assert w2.local_stats()["entries"] == 1
+
+    w1.set("emissions:limit=10&offset=990", ["page"])
+
+    assert w2.local_stats()["entries"] == 1
+    assert w2.get("uc_summary:forecast") == [1, 2, 3]
+
+
+def test_overwrite_and_delete_evict_only_that_key(shared):
+    w1, w2 = _tier(), _tier()
+    w1.set("a", 1)
+    w1.set("b", 1)
+    assert (w2.get("a"), w2.get("b")) == (1, 1)
+
+    w1.set("a", 2)
+    assert w2.get("a") == 2
+    assert w2.get("b") == 1
+
+    w1.delete("b")
+    assert w2.get("b") is None
+    assert w2.get("a") == 2
+
+
+def test_writer_keeps_its_own_fresh_copy(shared):
+    w1 = _tier()
+    w1.set("a", 1)
+    w1.set("a", 2)
+    assert w1.get("a") == 2
+    assert w1.local_stats()["entries"] == 1
+
+
+def test_clear_drops_every_local_tier(shared):
+    w1, w2 = _tier(), _tier()
+    w1.set("a", 1)
+    assert w2.get("a") == 1
+    w1.clear()
+    assert w2.get("a") is None
+    assert w2.local_stats()["entries"] == 0
+
+
+def test_local_copy_never_outlives_shared_timeout(shared):
+    w1, w2 = _tier(LOCAL_TTL=300), _tier(LOCAL_TTL=300)
+    w1.set("dataset_generation", 7, timeout=60)
+    w2.get("dataset_generation")
+    entry = w2._entries[w2._local_key("dataset_generation", None)]
+    assert entry.expires_at - time.monotonic() <= 60
+
+    shared.set("expired", 1, timeout=1)
+    shared._expire_info[shared.make_and_validate_key("expired")] = time.time() + 0.5
+    assert w2.get("expired") == 1
+    assert w2.local_stats()["entries"] == 1  # only dataset_generation; ttl rounds to 0
+
+
+def test_locks_bypass_local_tier_and_log(shared):
+    w1 = _tier()
+    w1.set("build:lock", 1)
+    w1.delete("build:lock")
+    assert w1.local_stats()["entries"] == 0
+    assert shared.get("tiered_cache:seq") is None
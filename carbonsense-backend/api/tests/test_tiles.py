@@ -0,0 +1,61 @@
+"""/api/tiles/{z}/{x}/{y}.mvt: empty tiles and the per-process tile cache."""
+
+import pytest
+
+from api.services.vector_tiles import _mercator
+from api.views import tiles
+
+LAHORE = (74.3436, 31.5497)
+
+
+def _tile_at(lon, lat, z):
+    mx, my = _mercator(lon, lat)
+    return z, int(mx * (1 << z)), int(my * (1 << z))
+
+
+@pytest.fixture
+def tile_cache(monkeypatch):
+    monkeypatch.setattr(tiles, "_tiles", tiles.OrderedDict())
+    monkeypatch.setattr(tiles, "_tile_bytes", 0)
+    return tiles
+
+
+@pytest.mark.django_db
+def test_tile_over_lahore_is_an_mvt(client, tile_cache):
+    z, x, y = _tile_at(*LAHORE, 12)
+    response = client.get(f"/api/tiles/{z}/{x}/{y}.mvt")
+
+    assert response.status_code == 200
+    assert response["Content-Type"] == "application/vnd.mapbox-vector-tile"
+    assert response.content
+
+
+@pytest.mark.django_db
+def test_tile_no_uc_touches_is_a_204(client, tile_cache):
+    response = client.get("/api/tiles/10/0/0.mvt")
+
+    assert response.status_code == 204
+    assert response.content == b""
+
+
+def test_out_of_range_tile_is_a_404(client):
+    assert client.get("/api/tiles/3/8/0.mvt").status_code == 404
+
+
+@pytest.mark.django_db
+def test_tile_cache_is_bounded_by_bytes(tile_cache, monkeypatch):
+    z, x, y = _tile_at(*LAHORE, 12)
+    neighbours = [(z, x + dx, y + dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1)]
+    sizes = [len(tile_cache._get_tile("forecast", "yearly", "", *t)) for t in neighbours]
+    assert sum(sizes) == tile_cache._tile_bytes
+
+    budget = sum(sizes) // 2
+    monkeypatch.setattr(tile_cache, "MAX_TILE_BYTES", budget)
+    tile_cache._tiles.clear()
+    tile_cache._tile_bytes = 0
+    for t in neighbours:
+        tile_cache._get_tile("forecast", "yearly", "", *t)
+
+    assert tile_cache._tile_bytes <= budget
+    assert tile_cache._tile_bytes == sum(len(tile) for tile in tile_cache._tiles.values())
+    assert len(tile_cache._tiles) < len(neighbours)
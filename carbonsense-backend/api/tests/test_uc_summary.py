@@ -0,0 +1,37 @@
+"""/api/uc-summary/ shapes and the cube views behind them."""
+
+import numpy as np
+import pytest
+
+from api.services.emissions_cube import SECTORS, get_cube
+
+URL = "/api/uc-summary/"
+
+
+@pytest.mark.django_db
+def test_columnar_window_keeps_the_clipped_month_label(client):
+    months = get_cube("forecast").months
+    params = {"view_mode": "window", "start": "1900-01", "end": months[2]}
+
+    rows = client.get(URL, params).json()
+    columnar = client.get(URL, {**params, "format": "columnar"}).json()
+
+    assert rows[0]["month_label"] == f"{months[0]} to {months[2]}"
+    assert columnar["month_label"] == rows[0]["month_label"]
+    assert columnar["columns"]["display_t"] == [row["display_t"] for row in rows]
+
+
+@pytest.mark.django_db
+def test_columnar_monthly_month_label(client):
+    month = get_cube("forecast").months[0]
+    body = client.get(URL, {"view_mode": "monthly", "month": month, "format": "columnar"}).json()
+
+    assert body["month_label"] == month
+
+
+def test_window_sums_match_the_monthly_columns():
+    cube = get_cube("historical")
+    start, stop = cube.month_range(cube.months[1], cube.months[-2])
+    for sector in SECTORS:
+        expected = sum(cube.month(sector, month) for month in cube.months[start:stop])
+        np.testing.assert_allclose(cube.window(sector, start, stop), expected)
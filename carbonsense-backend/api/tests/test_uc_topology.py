@@ -0,0 +1,98 @@
+"""UC topology: shared borders become one arc, rings close, zoom simplifies."""
+
+import math
+from itertools import accumulate
+
+import pytest
+
+from api.services import uc_topology
+
+# Two 1°x1° UCs side by side, both wound counter-clockwise, so each walks
+# the shared border in the other's opposite direction. The border at lon 31 zigzags by far
+# less than a zoom-8 pixel, so simplification has something to drop.
+_BORDER = [(31 + (0.0002 if i % 2 else 0.0), 31 + i / 50) for i in range(51)]
+_WEST = [(30, 31), *_BORDER, (30, 32), (30, 31)]
+_EAST = [_BORDER[0], (32, 31), (32, 32), *_BORDER[::-1]]
+
+
+@pytest.fixture
+def two_ucs(monkeypatch):
+    monkeypatch.setattr(
+        uc_topology, "uc_polygons",
+        lambda: [("UC-W", "West", [[_WEST]]), ("UC-E", "East", [[_EAST]])],
+    )
+    monkeypatch.setattr(uc_topology, "_base_topology", uc_topology._build_base_topology)
+
+
+def _decode_arcs(topology):
+    """Delta-decoded arcs, in grid steps."""
+    return [
+        list(zip(accumulate(dx for dx, _ in arc), accumulate(dy for _, dy in arc), strict=True))
+        for arc in topology["arcs"]
+    ]
+
+
+def _rings(topology):
+    """`{uc_code: [ring points]}`, stitched from the arcs the geometry references."""
+    arcs = _decode_arcs(topology)
+    rings = {}
+    for geometry in topology["objects"]["ucs"]["geometries"]:
+        (ring,) = geometry["arcs"]
+        points = []
+        for ref in ring:
+            arc = arcs[~ref][::-1] if ref < 0 else arcs[ref]
+            if points:
+                assert points[-1] == arc[0]
+                arc = arc[1:]
+            points.extend(arc)
+        rings[geometry["properties"]["uc_code"]] = points
+    return rings
+
+
+def test_shared_border_is_one_arc_referenced_both_ways(two_ucs):
+    topology = uc_topology.topology()
+    west, east = (g["arcs"][0] for g in topology["objects"]["ucs"]["geometries"])
+
+    shared = {ref if ref >= 0 else ~ref for ref in west} & {ref if ref >= 0 else ~ref for ref in east}
+    assert len(shared) == 1
+    (i,) = shared
+    assert sorted([ref for ref in west + east if ref in (i, ~i)]) == [~i, i]
+    # West, east and the border: no arc is stored twice.
+    assert len(topology["arcs"]) == 3
+
+
+@pytest.mark.parametrize("zoom", [None, 8, 12])
+def test_decoded_rings_close(two_ucs, zoom):
+    for points in _rings(uc_topology.topology(zoom)).values():
+        assert len(points) >= 4
+        assert points[0] == points[-1]
+
+
+def test_low_zoom_drops_border_wiggles_but_keeps_junctions(two_ucs):
+    full = uc_topology.topology(None)
+    coarse = uc_topology.topology(8)
+
+    def vertices(topology):
+        return sum(len(arc) for arc in topology["arcs"])
+
+    assert vertices(coarse) < vertices(full)
+    # The border keeps its junction end points plus the one vertex a ring of
+    # two arcs needs per arc to stay a ring.
+    assert [len(arc) for arc in coarse["arcs"]] == [3, 4, 4]
+    full_rings, coarse_rings = _rings(full), _rings(coarse)
+    for code in ("UC-W", "UC-E"):
+        assert set(coarse_rings[code]) <= set(full_rings[code])
+    # The two UCs still meet along the same simplified border.
+    assert len(set(coarse_rings["UC-W"]) & set(coarse_rings["UC-E"])) == 3
+
+
+def test_quantized_coordinates_map_back_to_degrees(two_ucs):
+    topology = uc_topology.topology()
+    (sx, sy), (tx, ty) = topology["transform"]["scale"], topology["transform"]["translate"]
+    corners = {(x * sx + tx, y * sy + ty) for x, y in _rings(topology)["UC-E"]}
+
+    for lon, lat in [(32, 32), (32, 31)]:
+        assert any(
+            math.isclose(lon, x, abs_tol=sx) and math.isclose(lat, y, abs_tol=sy)
+            for x, y in corners
+        )
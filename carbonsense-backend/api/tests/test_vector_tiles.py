@@ -0,0 +1,199 @@
+"""MVT encoding: geometry commands, ring winding after clipping, wire layout."""
+
+import struct
+from collections import defaultdict
+
+from api.services.uc_geometry import uc_polygons
+from api.services.vector_tiles import (
+    EXTENT,
+    _geometry,
+    _mercator,
+    _signed_area,
+    _tile_rings,
+    _zigzag,
+    encode_layer,
+    render_uc_tile,
+)
+
+# ----------------------------------------------------------------------------
+# A minimal protobuf wire-format reader
+# ----------------------------------------------------------------------------
+
+
+def _read_varint(buf, i):
+    n = shift = 0
+    while True:
+        byte = buf[i]
+        i += 1
+        n |= (byte & 0x7F) << shift
+        shift += 7
+        if not byte & 0x80:
+            return n, i
+
+
+def _fields(buf):
+    """`[(field_number, value)]`; length-delimited values as bytes, doubles as floats."""
+    out, i = [], 0
+    while i < len(buf):
+        key, i = _read_varint(buf, i)
+        number, wire_type = key >> 3, key & 7
+        if wire_type == 0:
+            value, i = _read_varint(buf, i)
+        elif wire_type == 1:
+            (value,) = struct.unpack("<d", buf[i : i + 8])
+            i += 8
+        elif wire_type == 2:
+            length, i = _read_varint(buf, i)
+            value, i = bytes(buf[i : i + length]), i + length
+        else:
+            raise AssertionError(f"unexpected wire type {wire_type}")
+        out.append((number, value))
+    return out
+
+
+def _packed(buf):
+    values, i = [], 0
+    while i < len(buf):
+        value, i = _read_varint(buf, i)
+        values.append(value)
+    return values
+
+
+def _unzigzag(n):
+    return (n >> 1) ^ -(n & 1)
+
+
+def _decode_rings(commands):
+    """Rings of absolute points from an MVT command stream."""
+    rings, ring, x, y, i = [], None, 0, 0, 0
+    while i < len(commands):
+        command, count = commands[i] & 7, commands[i] >> 3
+        i += 1
+        if command == 7:
+            rings.append(ring)
+            continue
+        for _ in range(count):
+            x += _unzigzag(commands[i])
+            y += _unzigzag(commands[i + 1])
+            i += 2
+            if command == 1:
+                ring = [(x, y)]
+            else:
+                ring.append((x, y))
+    return rings
+
+
+# ----------------------------------------------------------------------------
+# Geometry commands
+# ----------------------------------------------------------------------------
+
+
+def test_zigzag():
+    assert [_zigzag(n) for n in (0, -1, 1, -2, 2, -2048)] == [0, 1, 2, 3, 4, 4095]
+
+
+def test_geometry_commands_and_deltas():
+    square = [(2, 2), (10, 2), (10, 10), (2, 10)]
+    triangle = [(4, 4), (4, 6), (6, 4)]
+
+    commands = _geometry([square, triangle])
+
+    assert commands == [
+        (1 << 3) | 1, 4, 4,               # MoveTo(+2, +2)
+        (3 << 3) | 2, 16, 0, 0, 16, 15, 0,  # LineTo ×3: (+8, 0) (0, +8) (-8, 0)
+        (1 << 3) | 7,                     # ClosePath
+        (1 << 3) | 1, 4, 11,              # MoveTo relative to the last point: (+2, -6)
+        (2 << 3) | 2, 0, 4, 4, 3,         # LineTo ×2: (0, +2) (+2, -2)
+        (1 << 3) | 7,
+    ]
+    assert _decode_rings(commands) == [square, triangle]
+
+
+# ----------------------------------------------------------------------------
+# Clipping and winding
+# ----------------------------------------------------------------------------
+
+
+def _unit(points):
+    """Tile-0 units → unit Mercator, so z=0 tile coordinates equal `points`."""
+    return [(px / EXTENT, py / EXTENT) for px, py in points]
+
+
+def test_clipped_exterior_is_positive_and_hole_negative():
+    # Exterior reaching far outside the tile, wound negatively on purpose;
+    # hole wound positively. Both must come out in MVT orientation.
+    exterior = _unit([(-5000, -5000), (-5000, 9000), (9000, 9000), (9000, -5000)])
+    hole = _unit([(1000, 1000), (3000, 1000), (3000, 3000), (1000, 3000)])
+    assert _signed_area([(round(x * EXTENT), round(y * EXTENT)) for x, y in exterior]) < 0
+
+    rings = _tile_rings([[exterior, hole]], 0, 0, 0)
+
+    assert len(rings) == 2
+    outer, inner = rings
+    assert _signed_area(outer) > 0
+    assert _signed_area(inner) < 0
+    # Clipped to the tile plus its buffer.
+    xs = [px for px, _ in outer]
+    assert min(xs) == -64 and max(xs) == EXTENT + 64
+
+
+def test_ring_entirely_outside_the_tile_is_dropped():
+    far = _unit([(9000, 9000), (9500, 9000), (9500, 9500)])
+
+    assert _tile_rings([[far]], 0, 0, 0) == []
+
+
+# ----------------------------------------------------------------------------
+# Wire layout
+# ----------------------------------------------------------------------------
+
+
+def test_layer_field_numbers():
+    ring = [(0, 0), (0, 100), (100, 100), (100, 0)]
+    layer = defaultdict(list)
+    for number, value in _fields(
+        encode_layer("ucs", [(7, [ring], {"uc_code": "X", "display_t": 1.5})])
+    ):
+        layer[number].append(value)
+
+    assert layer[15] == [2]  # version
+    assert layer[1] == [b"ucs"]  # name
+    assert layer[3] == [b"uc_code", b"display_t"]  # keys
+    assert [_fields(v) for v in layer[4]] == [[(1, b"X")], [(3, 1.5)]]  # string, double
+    assert layer[5] == [EXTENT]  # extent
+
+    (feature,) = [dict(_fields(f)) for f in layer[2]]
+    assert feature[1] == 7  # id
+    assert _packed(feature[2]) == [0, 0, 1, 1]  # tags: key/value index pairs
+    assert feature[3] == 3  # POLYGON
+    assert _decode_rings(_packed(feature[4])) == [ring]
+
+
+def test_rendered_tile_decodes():
+    code, _, polygons = uc_polygons()[0]
+    lon, lat = polygons[0][0][0]
+    z = 12
+    mx, my = _mercator(lon, lat)
+    x, y = int(mx * (1 << z)), int(my * (1 << z))
+
+    tile = _fields(render_uc_tile(z, x, y, {code: {"display_t": 12.5}}))
+
+    assert [number for number, _ in tile] == [3]  # Tile.layers
+    layer = _fields(tile[0][1])
+    keys = [v.decode() for n, v in layer if n == 3]
+    values = [_fields(v)[0][1] for n, v in layer if n == 4]
+    features = [dict(_fields(v)) for n, v in layer if n == 2]
+    assert features
+
+    found = {}
+    for feature in features:
+        tags = _packed(feature[2])
+        props = {keys[k]: values[v] for k, v in zip(tags[::2], tags[1::2], strict=True)}
+        found[props["uc_code"].decode()] = props
+        for ring in _decode_rings(_packed(feature[4])):
+            assert all(-64 <= px <= EXTENT + 64 and -64 <= py <= EXTENT + 64 for px, py in ring)
+    assert found[code]["display_t"] == 12.5
+
+
+def test_tile_no_uc_touches_is_empty():
+    assert render_uc_tile(10, 0, 0, {}) == b""
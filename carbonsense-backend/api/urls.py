@@ -12,7 +12,10 @@ from .views import (
     stats_view,
     latest_emissions_by_area,
     emissions_timeline,
+    emissions_export,
     point_sources_view,
+    uc_boundaries_view,
+    uc_tile,
 )
 
 # Create a router for ViewSets
@@ -36,10 +39,19 @@ urlpatterns = [
     path('emissions/latest-by-area/', latest_emissions_by_area, name='latest-by-area'),
     path('emissions/timeline/', emissions_timeline, name='emissions-timeline'),
 
+    # Full row export streamed as NDJSON or CSV (?format=ndjson|csv), same filters as /emissions/.
+    path('emissions/export/', emissions_export, name='emissions-export'),
+
     # Per-sector facility-level point sources (energy plants, industrial sites).
     # ?sector=energy|industry|... — sectors with only UC-level data return [].
     path('point-sources/', point_sources_view, name='point-sources'),
 
+    # UC choropleth as Mapbox vector tiles; same params as /uc-summary/.
+    path('tiles/<int:z>/<int:x>/<int:y>.mvt', uc_tile, name='uc-tile'),
+
+    # UC outlines as zoom-simplified TopoJSON (?zoom=8..16; omit for full detail).
+    path('uc-boundaries/', uc_boundaries_view, name='uc-boundaries'),
+
     # Include router URLs
     path('', include(router.urls)),
 ]
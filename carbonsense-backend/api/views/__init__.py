@@ -9,9 +9,12 @@ from .areas import AreaInfoViewSet
 from .auth import current_user_view, login_view, logout_view, signup_view
 from .emissions import EmissionDataViewSet
 from .emissions_aggregates import emissions_timeline, latest_emissions_by_area
+from .emissions_export import emissions_export
 from .leaderboard import LeaderboardViewSet
 from .point_sources import point_sources_view
 from .stats import stats_view
+from .tiles import uc_tile
+from .uc_boundaries import uc_boundaries_view
 from .uc_summary import UCSummaryViewSet
 
 __all__ = [
@@ -20,6 +23,7 @@ __all__ = [
     "LeaderboardViewSet",
     "UCSummaryViewSet",
     "current_user_view",
+    "emissions_export",
     "emissions_timeline",
     "latest_emissions_by_area",
     "login_view",
@@ -27,4 +31,6 @@ __all__ = [
     "point_sources_view",
     "signup_view",
     "stats_view",
+    "uc_boundaries_view",
+    "uc_tile",
 ]
@@ -1,12 +1,15 @@
 """Area (location) endpoints — one entry per forecast location across all sectors."""
 
-from django.core.cache import cache
 from rest_framework import viewsets
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 
 from api.models import Location, LocationSummary, make_area_id
-from api.services.runs import CACHE_TTL, get_active_runs, safe_float, sector_field
+from api.services.area_index import location_ids_for_area
+from api.services.caching import get_or_build
+from api.services.generation import dataset_key
+from api.services.runs import get_active_runs, safe_float, sector_field
+from api.services.spatial_index import InvalidViewport, viewport_filter, viewport_params
 
 
 def _build_area_payload(loc, sector, summary):
@@ -26,72 +29,81 @@ def _build_area_payload(loc, sector, summary):
     }
 
 
-class AreaInfoViewSet(viewsets.ViewSet):
-    permission_classes = [AllowAny]
+def _area_lon_lat(area):
+    lat, lng = area["coordinates"]
+    return lng, lat
 
-    def list(self, request):
-        cached = cache.get("areas_list")
-        if cached is not None:
-            return Response(cached)
 
-        runs = get_active_runs()
-        if not runs:
-            return Response([])
+def _build_area_list():
+    runs = get_active_runs()
+    if not runs:
+        return []
 
-        run_ids = [r.id for r in runs]
-        run_sector = {r.id: sector_field(r) for r in runs}
+    run_ids = [r.id for r in runs]
+    run_sector = {r.id: sector_field(r) for r in runs}
 
-        # One query for all locations, one for all summaries — no per-run loop.
-        locs = list(Location.objects.filter(forecast_run_id__in=run_ids))
-        summary_map = {
-            s.location_id: s
-            for s in LocationSummary.objects.filter(
-                location_id__in=[loc.id for loc in locs]
-            )
-        }
+    # One query for all locations, one for all summaries — no per-run loop.
+    locs = list(Location.objects.filter(forecast_run_id__in=run_ids))
+    summary_map = {
+        s.location_id: s
+        for s in LocationSummary.objects.filter(
+            location_id__in=[loc.id for loc in locs]
+        )
+    }
+
+    return [
+        _build_area_payload(
+            loc,
+            run_sector.get(loc.forecast_run_id, "energy"),
+            summary_map.get(loc.id),
+        )
+        for loc in locs
+    ]
 
-        results = [
-            _build_area_payload(
-                loc,
-                run_sector.get(loc.forecast_run_id, "energy"),
-                summary_map.get(loc.id),
-            )
-            for loc in locs
-        ]
 
-        cache.set("areas_list", results, CACHE_TTL)
-        return Response(results)
+def warm_payloads():
+    """(label, cache_key, build) for `manage.py warm_caches`."""
+    yield "areas", dataset_key("areas_list"), _build_area_list
+
+
+class AreaInfoViewSet(viewsets.ViewSet):
+    permission_classes = [AllowAny]
+
+    def list(self, request):
+        """
+        Every area, or with `?bbox=minLon,minLat,maxLon,maxLat` (and
+        optional `&zoom=`) only those whose coordinates are in view.
+        """
+        try:
+            bbox, zoom = viewport_params(request.query_params)
+        except InvalidViewport as e:
+            return Response({"detail": str(e)}, status=400)
+
+        cache_key = dataset_key("areas_list")
+        areas = get_or_build(cache_key, _build_area_list, cache_if=bool)
+        if bbox is not None:
+            areas = viewport_filter(cache_key, areas, _area_lon_lat, bbox, zoom)
+        return Response(areas)
 
     def retrieve(self, request, pk=None):
         runs = get_active_runs()
         if not runs:
             return Response({"detail": "Not found."}, status=404)
 
-        run_ids = [r.id for r in runs]
-        run_sector = {r.id: sector_field(r) for r in runs}
+        # Slug → location ids from the per-version index; no table scan.
+        loc_ids = location_ids_for_area(pk)
+        loc = None
+        if loc_ids:
+            loc = (
+                Location.objects.filter(id__in=loc_ids)
+                .only("id", "source", "latitude", "longitude", "uc_code", "forecast_run_id")
+                .order_by("id")
+                .first()
+            )
+        if loc is None:
+            return Response({"detail": "Not found."}, status=404)
 
-        # Direct filter using `make_area_id`'s sector suffix to avoid
-        # scanning every location.
-        # `pk` is `<source_lower_with_underscores>_<sector>` — split off the
-        # sector suffix and search by source.
-        for sector in {"energy", "transport", "industry", "waste", "buildings"}:
-            suffix = f"_{sector}"
-            if pk.endswith(suffix):
-                source_slug = pk[: -len(suffix)]
-                # Match a location whose `make_area_id` matches `pk`. We
-                # filter by run_id (active runs) and sector — since
-                # different runs may share a `source`, we still verify
-                # the slug matches in Python.
-                candidates = Location.objects.filter(
-                    forecast_run_id__in=run_ids,
-                ).only("id", "source", "latitude", "longitude", "uc_code", "forecast_run_id")
-                for loc in candidates:
-                    loc_sector = run_sector.get(loc.forecast_run_id, "energy")
-                    if loc_sector == sector and make_area_id(loc.source, sector) == pk:
-                        summary = LocationSummary.objects.filter(
-                            location=loc
-                        ).first()
-                        return Response(_build_area_payload(loc, sector, summary))
-                break
-
-        return Response({"detail": "Not found."}, status=404)
+        run_sector = {r.id: sector_field(r) for r in runs}
+        sector = run_sector.get(loc.forecast_run_id, "energy")
+        summary = LocationSummary.objects.filter(location=loc).first()
+        return Response(_build_area_payload(loc, sector, summary))
@@ -1,12 +1,24 @@
 """Emission point endpoints — historical + forecast time series."""
 
-from django.core.cache import cache
+import base64
+import binascii
+import datetime
+import json
+import logging
+
+from django.db import DatabaseError, connection
+from django.db.models import Q
 from rest_framework import viewsets
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
-from api.models import EmissionPoint, Location, make_area_id
-from api.services.runs import CACHE_TTL, get_active_runs, sector_field
+from api.models import EmissionPoint, make_area_id
+from api.services.caching import get_or_build
+from api.services.emission_filters import InvalidFilter, filtered_points, parse_emission_filters
+from api.services.generation import dataset_key
+from api.services.params import parse_int, parse_paging
+from api.services.runs import get_active_runs, sector_field
 
 
 # Pagination is opt-in: callers that pass `?limit=N` get a page (with an
@@ -17,6 +29,22 @@ from api.services.runs import CACHE_TTL, get_active_runs, sector_field
 PAGINATED_DEFAULT_LIMIT = 500
 PAGINATED_MAX_LIMIT = 5000
 
+# Keyset pagination: `?cursor=` (empty for the first page) switches to pages
+# ordered by (date, id) descending, fetched with a `WHERE (date, id) < last`
+# seek instead of an OFFSET, so page 1000 costs the same as page 1. The
+# response becomes `{results, next, prev}` with opaque cursor URLs; pass
+# `?include_total=1` for an `estimated_total` of the full size — the
+# planner's estimate on Postgres, an exact `count()` on other databases.
+# Cursor pages are served straight from the query, never cached: each
+# token is one-off, so caching them only fills the cache.
+CURSOR_PARAM = "cursor"
+
+logger = logging.getLogger(__name__)
+
+
+class InvalidCursor(ValueError):
+    pass
+
 
 def _empty_emission_row():
     return {
@@ -44,110 +72,172 @@ def _serialize(ep, run_sector):
     }
 
 
-def _parse_int(raw, default, lo=None, hi=None):
+def _encode_cursor(ep, reverse):
+    """Opaque token for the (date, id) position of `ep`."""
+    raw = json.dumps({"d": ep.date.isoformat(), "i": ep.id, "r": int(reverse)})
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(token):
+    """`(date, id, reverse)` from a cursor token; `None` for the first page."""
+    if not token:
+        return None
     try:
-        n = int(raw)
-    except (TypeError, ValueError):
-        return default
-    if lo is not None:
-        n = max(lo, n)
-    if hi is not None:
-        n = min(hi, n)
-    return n
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        data = json.loads(raw)
+        return datetime.date.fromisoformat(data["d"]), int(data["i"]), bool(data["r"])
+    except (binascii.Error, ValueError, TypeError, KeyError) as e:
+        raise InvalidCursor(token) from e
 
 
-def _resolve_area_id_to_location_ids(area_id, runs):
+def _estimate_count(queryset):
     """
-    Translate an `area_id` slug to the matching DB location ids.
-
-    Cached because the slug→id mapping changes only when forecasts reload.
+    Planner row estimate for `queryset` on Postgres; an exact `count()` on
+    other databases, or if the estimate can't be read.
     """
-    cache_key = f"area_loc_ids:{area_id}"
-    cached = cache.get(cache_key)
-    if cached is not None:
-        return cached
+    if connection.vendor != "postgresql":
+        return queryset.count()
+    sql, params = queryset.order_by().values("id").query.sql_with_params()
+    try:
+        with connection.cursor() as cur:
+            cur.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cur.fetchone()[0]
+    except DatabaseError as e:
+        logger.warning("Row estimate failed (%s); counting instead", e)
+        return queryset.count()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def _build_emission_page(params, filters):
+    """`(rows, total)` for the list query params, or None with no active runs."""
+    runs = get_active_runs()
+    if not runs:
+        return None
 
-    run_ids = [r.id for r in runs]
     run_sector = {r.id: sector_field(r) for r in runs}
+    queryset = filtered_points(filters, runs).order_by("-date")
 
-    matching = []
-    locs = Location.objects.filter(forecast_run_id__in=run_ids).only(
-        "id", "source", "forecast_run_id"
-    )
-    for loc in locs:
-        sector = run_sector.get(loc.forecast_run_id, "energy")
-        if make_area_id(loc.source, sector) == area_id:
-            matching.append(loc.id)
+    # Opt-in pagination: only slice when `?limit=` is explicitly provided.
+    if params.get("limit") is not None:
+        limit, offset = parse_paging(params, PAGINATED_DEFAULT_LIMIT, PAGINATED_MAX_LIMIT)
+        total = queryset.count()
+        page = queryset[offset : offset + limit]
+    else:
+        page = list(queryset)
+        total = len(page)
 
-    cache.set(cache_key, matching, CACHE_TTL)
-    return matching
+    return [_serialize(ep, run_sector) for ep in page], total
 
 
-class EmissionDataViewSet(viewsets.ViewSet):
-    permission_classes = [AllowAny]
+def _build_cursor_page(params, filters):
+    """
+    `(rows, next_token, prev_token, estimated_total)` for one keyset page,
+    or None with no active runs. Raises InvalidCursor for a bad token.
+    """
+    runs = get_active_runs()
+    if not runs:
+        return None
 
-    def list(self, request):
-        cache_key = f"emissions:{request.query_params.urlencode()}"
-        cached = cache.get(cache_key)
-        if cached is not None:
-            results, total = cached
-            response = Response(results)
-            response["X-Total-Count"] = str(total)
-            return response
+    run_sector = {r.id: sector_field(r) for r in runs}
+    limit = parse_int(
+        params.get("limit"), default=PAGINATED_DEFAULT_LIMIT, lo=1, hi=PAGINATED_MAX_LIMIT
+    )
+    position = _decode_cursor(params.get(CURSOR_PARAM))
+    queryset = filtered_points(filters, runs)
+    estimated_total = _estimate_count(queryset) if params.get("include_total") else None
+
+    reverse = False
+    if position is None:
+        queryset = queryset.order_by("-date", "-id")
+    else:
+        date, pk, reverse = position
+        if reverse:
+            # Walking back towards newer rows: seek ascending, flip afterwards.
+            queryset = queryset.filter(
+                Q(date__gt=date) | Q(date=date, id__gt=pk)
+            ).order_by("date", "id")
+        else:
+            queryset = queryset.filter(
+                Q(date__lt=date) | Q(date=date, id__lt=pk)
+            ).order_by("-date", "-id")
+
+    page = list(queryset[: limit + 1])
+    has_more = len(page) > limit
+    page = page[:limit]
+    if reverse:
+        page.reverse()
+
+    # Walking backwards, the page we came from is still ahead; walking
+    # forwards from any cursor, the page we came from is still behind.
+    if reverse:
+        has_next, has_prev = True, has_more
+    else:
+        has_next, has_prev = has_more, position is not None
+
+    next_token = prev_token = None
+    if page:
+        if has_next:
+            next_token = _encode_cursor(page[-1], reverse=False)
+        if has_prev:
+            prev_token = _encode_cursor(page[0], reverse=True)
+
+    return (
+        [_serialize(ep, run_sector) for ep in page],
+        next_token,
+        prev_token,
+        estimated_total,
+    )
 
-        runs = get_active_runs()
-        if not runs:
-            return Response([])
 
-        run_ids = [r.id for r in runs]
-        run_sector = {r.id: sector_field(r) for r in runs}
+def _cursor_url(request, token):
+    if token is None:
+        return None
+    return replace_query_param(request.build_absolute_uri(), CURSOR_PARAM, token)
 
-        queryset = EmissionPoint.objects.filter(
-            location__forecast_run_id__in=run_ids,
-        ).select_related("location", "location__forecast_run")
-
-        area_id = request.query_params.get("area_id")
-        if area_id:
-            loc_ids = _resolve_area_id_to_location_ids(area_id, runs)
-            queryset = queryset.filter(location_id__in=loc_ids)
-
-        data_type = request.query_params.get("data_type")
-        if data_type:
-            queryset = queryset.filter(point_type=data_type)
-
-        start_date = request.query_params.get("start_date")
-        if start_date:
-            queryset = queryset.filter(date__gte=start_date)
-
-        end_date = request.query_params.get("end_date")
-        if end_date:
-            queryset = queryset.filter(date__lte=end_date)
-
-        queryset = queryset.order_by("-date")
-
-        # Opt-in pagination: only slice when `?limit=` is explicitly provided.
-        limit_raw = request.query_params.get("limit")
-        if limit_raw is not None:
-            limit = _parse_int(
-                limit_raw,
-                default=PAGINATED_DEFAULT_LIMIT,
-                lo=1,
-                hi=PAGINATED_MAX_LIMIT,
-            )
-            offset = _parse_int(request.query_params.get("offset"), default=0, lo=0)
-            total = queryset.count()
-            page = queryset[offset : offset + limit]
-        else:
-            page = list(queryset)
-            total = len(page)
 
-        results = [_serialize(ep, run_sector) for ep in page]
+class EmissionDataViewSet(viewsets.ViewSet):
+    permission_classes = [AllowAny]
 
-        cache.set(cache_key, (results, total), CACHE_TTL)
+    def list(self, request):
+        params = request.query_params
+        try:
+            filters = parse_emission_filters(params)
+        except InvalidFilter as e:
+            return Response({"detail": str(e)}, status=400)
+        if CURSOR_PARAM in params:
+            return self._list_by_cursor(request, filters)
+        cached = get_or_build(
+            dataset_key("emissions", params.urlencode()),
+            lambda: _build_emission_page(params, filters),
+            cache_if=lambda page: page is not None,
+        )
+        if cached is None:
+            return Response([])
+        results, total = cached
         response = Response(results)
         response["X-Total-Count"] = str(total)
         return response
 
+    def _list_by_cursor(self, request, filters):
+        params = request.query_params
+        try:
+            page = _build_cursor_page(params, filters)
+        except InvalidCursor:
+            return Response({"detail": "Invalid cursor."}, status=400)
+        if page is None:
+            return Response({"results": [], "next": None, "prev": None})
+        results, next_token, prev_token, estimated_total = page
+        body = {
+            "results": results,
+            "next": _cursor_url(request, next_token),
+            "prev": _cursor_url(request, prev_token),
+        }
+        if estimated_total is not None:
+            body["estimated_total"] = estimated_total
+        return Response(body)
+
     def retrieve(self, request, pk=None):
         runs = get_active_runs()
         if not runs:
@@ -6,14 +6,19 @@ compute "the latest value per area" or "the monthly total across all areas".
 Both jobs are cheap aggregate queries on the DB and return tiny payloads.
 """
 
-from django.core.cache import cache
-from django.db.models import Max, Sum
+import datetime
+
+from django.db.models import Sum
+from django.db.models.functions import TruncMonth, TruncQuarter, TruncYear
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 
-from api.models import EmissionPoint, Location, make_area_id
-from api.services.runs import CACHE_TTL, get_active_runs, sector_field
+from api.models import EmissionPoint, make_area_id
+from api.services.caching import get_or_build
+from api.services.generation import dataset_key
+from api.services.rollups import latest_points, monthly_totals
+from api.services.runs import get_active_runs, sector_field
 
 
 def _validate_data_type(raw):
@@ -22,116 +27,213 @@ def _validate_data_type(raw):
     return raw
 
 
-@api_view(["GET"])
-@permission_classes([AllowAny])
-def latest_emissions_by_area(request):
-    """
-    Returns `{area_id: latest_emission_value}` — one entry per area.
+def _parse_as_of(raw):
+    """`YYYY-MM-DD` or `YYYY-MM` (→ first of the month) as a date; None if invalid."""
+    if len(raw) == 7:
+        raw = f"{raw}-01"
+    try:
+        return datetime.date.fromisoformat(raw)
+    except ValueError:
+        return None
 
-    Replaces the frontend's old pattern of fetching every emission point and
-    grouping in JavaScript. We do the grouping in Postgres with a single
-    query (latest date per location) and serialize ~750 entries instead of
-    ~54,000.
 
-    Query params:
-        data_type: 'historical' | 'forecast'  (default 'historical')
-    """
-    data_type = _validate_data_type(request.query_params.get("data_type"))
-    cache_key = f"latest_by_area:{data_type}"
-    cached = cache.get(cache_key)
-    if cached is not None:
-        return Response(cached)
+def _latest_cache_key(data_type, as_of=None):
+    if as_of is None:
+        return dataset_key("latest_by_area", data_type)
+    return dataset_key("latest_by_area", data_type, as_of.isoformat())
+
+
+# `bucket=` → truncation applied to each point's date before summing.
+_BUCKETS = {"month": TruncMonth, "quarter": TruncQuarter, "year": TruncYear}
+_GROUP_BYS = ("sector", "location")
+
+_SECTORS = ("transport", "industry", "energy", "waste", "buildings")
+
+
+def _timeline_cache_key(data_type, bucket="month", group_by=None):
+    if bucket == "month" and group_by is None:
+        return dataset_key("emissions_timeline", data_type)
+    return dataset_key("emissions_timeline", data_type, bucket, group_by or "total")
 
+
+def _build_latest_by_area(data_type, as_of=None):
+    """`{area_id: emissions}` at each location's most recent date (≤ `as_of`)."""
     runs = get_active_runs()
     if not runs:
-        return Response({})
+        return {}
 
     run_ids = [r.id for r in runs]
     run_sector = {r.id: sector_field(r) for r in runs}
 
-    # Latest emission date per location, then look up that row's value.
-    # Two queries (one to find max-date-per-location, one to fetch the rows)
-    # is far cheaper than streaming every point.
-    latest_dates = (
-        EmissionPoint.objects.filter(
-            location__forecast_run_id__in=run_ids,
-            point_type=data_type,
+    # One query, one row per location, already joined to its source name.
+    result = {}
+    for source, run_id, emissions in latest_points(run_ids, data_type, as_of):
+        sector = run_sector.get(run_id, "energy")
+        result[make_area_id(source, sector)] = emissions
+    return result
+
+
+def _build_timeline(data_type, bucket="month", group_by=None):
+    """
+    Date-bucketed totals across every active location, one grouped query:
+
+    - no `group_by`:        `[{date, total}]`
+    - `group_by=sector`:    `[{date, transport, industry, energy, waste, buildings, total}]`
+    - `group_by=location`:  `[{date, area_id, area_name, total}]`
+
+    `date` is the first day of each `bucket` (month / quarter / year).
+    """
+    runs = get_active_runs()
+    if not runs:
+        return []
+
+    run_ids = [r.id for r in runs]
+    period = _BUCKETS[bucket]("date")
+
+    if group_by == "location":
+        # Per-location series only exist in the raw points.
+        run_sector = {r.id: sector_field(r) for r in runs}
+        rows = (
+            EmissionPoint.objects.filter(
+                location__forecast_run_id__in=run_ids, point_type=data_type
+            )
+            .annotate(period=period)
+            .values("period", "location__source", "location__forecast_run_id")
+            .annotate(total=Sum("emissions"))
+            .order_by("period", "location__source")
         )
-        .values("location_id")
-        .annotate(latest=Max("date"))
-    )
-    latest_map = {row["location_id"]: row["latest"] for row in latest_dates}
-    if not latest_map:
-        return Response({})
-
-    # Fetch the (location_id, date) pairs in one query.
-    points = (
-        EmissionPoint.objects.filter(
-            location_id__in=list(latest_map.keys()),
-            point_type=data_type,
+        totals = {}
+        for row in rows:
+            source = row["location__source"]
+            sector = run_sector.get(row["location__forecast_run_id"], "energy")
+            key = (row["period"], make_area_id(source, sector))
+            if key not in totals:
+                totals[key] = [source, 0.0]
+            totals[key][1] += float(row["total"] or 0.0)
+        return [
+            {"date": day.isoformat(), "area_id": area_id, "area_name": name, "total": total}
+            for (day, area_id), (name, total) in sorted(totals.items())
+        ]
+
+    points_qs, value_field, run_field = monthly_totals(run_ids)
+    points_qs = points_qs.filter(point_type=data_type).annotate(period=period)
+
+    if group_by == "sector":
+        run_sector = {r.id: sector_field(r) for r in runs}
+        rows = (
+            points_qs.values("period", run_field)
+            .annotate(total=Sum(value_field))
+            .order_by("period")
         )
-        .select_related("location")
-    )
+        buckets = {}
+        for row in rows:
+            entry = buckets.get(row["period"])
+            if entry is None:
+                entry = buckets[row["period"]] = dict.fromkeys(_SECTORS, 0.0)
+            sector = run_sector.get(row[run_field], "energy")
+            entry[sector] += float(row["total"] or 0.0)
+        return [
+            {"date": day.isoformat(), **by_sector, "total": sum(by_sector.values())}
+            for day, by_sector in sorted(buckets.items())
+        ]
 
-    locs_meta = {
-        loc.id: (loc.source, loc.forecast_run_id)
-        for loc in Location.objects.filter(id__in=list(latest_map.keys())).only(
-            "id", "source", "forecast_run_id"
-        )
-    }
+    rows = (
+        points_qs.values("period")
+        .annotate(total=Sum(value_field))
+        .order_by("period")
+    )
+    return [
+        {"date": row["period"].isoformat(), "total": float(row["total"] or 0.0)}
+        for row in rows
+    ]
 
-    result = {}
-    for ep in points:
-        if ep.date != latest_map.get(ep.location_id):
-            continue
-        meta = locs_meta.get(ep.location_id)
-        if not meta:
-            continue
-        source, run_id = meta
-        sector = run_sector.get(run_id, "energy")
-        area_id = make_area_id(source, sector)
-        result[area_id] = ep.emissions
 
-    cache.set(cache_key, result, CACHE_TTL)
-    return Response(result)
+def warm_payloads():
+    """(label, cache_key, build) for `manage.py warm_caches`."""
+    for data_type in ("historical", "forecast"):
+        yield (
+            f"latest_by_area {data_type}",
+            _latest_cache_key(data_type),
+            lambda d=data_type: _build_latest_by_area(d),
+        )
+        yield (
+            f"emissions_timeline {data_type}",
+            _timeline_cache_key(data_type),
+            lambda d=data_type: _build_timeline(d),
+        )
+        for bucket in _BUCKETS:
+            yield (
+                f"emissions_timeline {data_type} {bucket} by sector",
+                _timeline_cache_key(data_type, bucket, "sector"),
+                lambda d=data_type, b=bucket: _build_timeline(d, b, "sector"),
+            )
 
 
 @api_view(["GET"])
 @permission_classes([AllowAny])
-def emissions_timeline(request):
+def latest_emissions_by_area(request):
     """
-    Returns a date-bucketed total across every area for the given data_type.
+    Returns `{area_id: latest_emission_value}` — one entry per area.
 
-    Format: list of `{date, total}` objects, ordered oldest → newest.
+    Replaces the frontend's old pattern of fetching every emission point and
+    grouping in JavaScript. We do the grouping in Postgres with a single
+    query (latest point per location) and serialize ~750 entries instead of
+    ~54,000.
 
     Query params:
         data_type: 'historical' | 'forecast'  (default 'historical')
+        as_of:     'YYYY-MM-DD' | 'YYYY-MM' — latest point on or before this
+                   date instead of the latest overall
     """
     data_type = _validate_data_type(request.query_params.get("data_type"))
-    cache_key = f"emissions_timeline:{data_type}"
-    cached = cache.get(cache_key)
-    if cached is not None:
-        return Response(cached)
+    as_of = None
+    raw_as_of = request.query_params.get("as_of")
+    if raw_as_of:
+        as_of = _parse_as_of(raw_as_of)
+        if as_of is None:
+            return Response(
+                {"detail": "as_of must be YYYY-MM-DD or YYYY-MM."}, status=400
+            )
+    return Response(
+        get_or_build(
+            _latest_cache_key(data_type, as_of),
+            lambda: _build_latest_by_area(data_type, as_of),
+            cache_if=bool,
+        )
+    )
 
-    runs = get_active_runs()
-    if not runs:
-        return Response([])
 
-    run_ids = [r.id for r in runs]
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def emissions_timeline(request):
+    """
+    Returns a date-bucketed total across every area for the given data_type.
 
-    rows = (
-        EmissionPoint.objects.filter(
-            location__forecast_run_id__in=run_ids,
-            point_type=data_type,
+    Format: list of `{date, total}` objects, ordered oldest → newest; with
+    `group_by`, each entry also carries the per-sector split or identifies
+    its area (see `_build_timeline`).
+
+    Query params:
+        data_type: 'historical' | 'forecast'  (default 'historical')
+        bucket:    'month' | 'quarter' | 'year'  (default 'month')
+        group_by:  'sector' | 'location'  (default: one total per bucket)
+    """
+    params = request.query_params
+    data_type = _validate_data_type(params.get("data_type"))
+    bucket = params.get("bucket") or "month"
+    group_by = params.get("group_by") or None
+    if bucket not in _BUCKETS:
+        return Response(
+            {"detail": f"bucket must be one of: {', '.join(_BUCKETS)}."}, status=400
+        )
+    if group_by is not None and group_by not in _GROUP_BYS:
+        return Response(
+            {"detail": f"group_by must be one of: {', '.join(_GROUP_BYS)}."}, status=400
+        )
+    return Response(
+        get_or_build(
+            _timeline_cache_key(data_type, bucket, group_by),
+            lambda: _build_timeline(data_type, bucket, group_by),
+            cache_if=bool,
         )
-        .values("date")
-        .annotate(total=Sum("emissions"))
-        .order_by("date")
     )
-    result = [
-        {"date": row["date"].isoformat(), "total": float(row["total"] or 0.0)}
-        for row in rows
-    ]
-
-    cache.set(cache_key, result, CACHE_TTL)
-    return Response(result)
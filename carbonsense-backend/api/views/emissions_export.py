@@ -0,0 +1,150 @@
+"""
+Streaming export of emission points — `/api/emissions/export/`.
+
+`/api/emissions/` without `limit` materialises every row (with its
+`select_related` location and run) and the serialised list before the
+first byte goes out, then caches the lot. This endpoint takes the same
+filters (`area_id`, `data_type`, `start_date`, `end_date`) but reads flat
+`values_list()` tuples off a server-side cursor in chunks and writes each
+chunk out as it arrives, so a full export runs in constant memory.
+
+    ?format=ndjson   one JSON object per line, same shape as /api/emissions/ (default)
+    ?format=csv      header row + one row per point
+
+Rows are ordered by (date, id) so an interrupted export can be resumed
+with `start_date`. Every filter is validated before the response starts,
+so a bad value is a 400 rather than a truncated file. An unknown `format`
+is DRF's usual 404. Nothing here is cached.
+"""
+
+import csv
+import io
+import json
+
+from django.http import StreamingHttpResponse
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes, renderer_classes
+from rest_framework.permissions import AllowAny
+from rest_framework.renderers import BaseRenderer
+from rest_framework.response import Response
+
+from api.models import make_area_id
+from api.services.emission_filters import InvalidFilter, filtered_points, parse_emission_filters
+from api.services.runs import get_active_runs, sector_field
+
+EXPORT_CHUNK_SIZE = 2000
+
+_SECTORS = ("transport", "industry", "energy", "waste", "buildings")
+_COLUMNS = ("id", "area_id", "area_name", "date", *_SECTORS, "total", "type")
+
+
+class _ExportRenderer(BaseRenderer):
+    """
+    Picks the export format through DRF's `?format=` / Accept negotiation.
+    The rows themselves are streamed by the view; only error bodies (plain
+    dicts) are rendered here, as JSON.
+    """
+
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return json.dumps(data).encode() if data is not None else b""
+
+
+class NDJSONRenderer(_ExportRenderer):
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+
+
+class CSVRenderer(_ExportRenderer):
+    media_type = "text/csv"
+    format = "csv"
+
+
+def _export_rows(filters):
+    """One tuple per point, in `_COLUMNS` order. The query is built eagerly."""
+    runs = get_active_runs()
+    if not runs:
+        return iter(())
+
+    run_sector = {r.id: sector_field(r) for r in runs}
+    rows = (
+        filtered_points(filters, runs)
+        .order_by("date", "id")
+        .values_list(
+            "id",
+            "location__source",
+            "location__forecast_run_id",
+            "date",
+            "emissions",
+            "point_type",
+        )
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+    return _format_rows(rows, run_sector)
+
+
+def _format_rows(rows, run_sector):
+    area_ids = {}
+    for pk, source, run_id, date, emissions, point_type in rows:
+        sector = run_sector.get(run_id, "energy")
+        area_id = area_ids.get((source, sector))
+        if area_id is None:
+            area_id = area_ids[(source, sector)] = make_area_id(source, sector)
+        val = emissions or 0
+        by_sector = tuple(val if s == sector else 0 for s in _SECTORS)
+        yield (pk, area_id, source, date.isoformat(), *by_sector, val, point_type)
+
+
+def _batched(rows, size=EXPORT_CHUNK_SIZE):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _stream_ndjson(rows):
+    for batch in _batched(rows):
+        yield "".join(
+            json.dumps(dict(zip(_COLUMNS, row, strict=True)), separators=(",", ":")) + "\n"
+            for row in batch
+        )
+
+
+def _stream_csv(rows):
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(_COLUMNS)
+    yield buf.getvalue()
+    for batch in _batched(rows):
+        buf.seek(0)
+        buf.truncate()
+        writer.writerows(batch)
+        yield buf.getvalue()
+
+
+@api_view(["GET"])
+@permission_classes([AllowAny])
+@renderer_classes([NDJSONRenderer, CSVRenderer])
+def emissions_export(request):
+    try:
+        filters = parse_emission_filters(request.query_params)
+    except InvalidFilter as e:
+        return Response(
+            {"detail": str(e)},
+            status=status.HTTP_400_BAD_REQUEST,
+            content_type="application/json",
+        )
+
+    renderer = request.accepted_renderer
+    rows = _export_rows(filters)
+    stream = _stream_csv(rows) if renderer.format == "csv" else _stream_ndjson(rows)
+    response = StreamingHttpResponse(
+        stream, content_type=f"{renderer.media_type}; charset={renderer.charset}"
+    )
+    response["Content-Disposition"] = f'attachment; filename="emissions.{renderer.format}"'
+    return response
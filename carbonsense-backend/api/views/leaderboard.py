@@ -1,53 +1,155 @@
-"""Leaderboard — every (sector, location) summary ranked by 12-month forecast."""
+"""
+Leaderboard — (sector, location) summaries ranked by a forecast metric.
 
-from django.core.cache import cache
-from rest_framework import viewsets
+    ?sector=transport|industry|energy|waste|buildings   rank within one sector
+    ?metric=forecast_avg|forecast_total|change_pct|historical_total
+    ?order=desc|asc         asc lists the bottom of the ranking first
+    ?limit=N&offset=M       one slice, with `X-Total-Count`
+
+Ranks come from the database: one query per metric annotates every
+summary with `RANK()` over all active runs and within its sector, and the
+ranked lists (overall and per sector) are cached per dataset version.
+A request then only slices the list it asked for. Rank 1 is always the
+largest value of the metric, whatever the `order`; ties share a rank.
+
+Without any parameters the response is the full overall ranking by
+12-month forecast average, as before.
+"""
+
+from django.db.models import Case, CharField, F, Value, When, Window
+from django.db.models.functions import Rank
+from rest_framework import status, viewsets
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 
 from api.models import LocationSummary, make_area_id
-from api.services.runs import CACHE_TTL, get_active_runs, sector_field
+from api.services.caching import get_or_build
+from api.services.generation import dataset_key
+from api.services.params import parse_paging
+from api.services.runs import get_active_runs, sector_field
 
 
 _TREND_MAP = {"increasing": "up", "declining": "down", "stable": "stable"}
 
+# `?metric=` → LocationSummary field ranked on.
+METRICS = {
+    "forecast_avg": "forecast_12m_average",
+    "forecast_total": "forecast_12m_total",
+    "change_pct": "change_pct",
+    "historical_total": "total_historical_tonnes",
+}
+DEFAULT_METRIC = "forecast_avg"
 
-class LeaderboardViewSet(viewsets.ViewSet):
-    permission_classes = [AllowAny]
+SECTORS = ("transport", "industry", "energy", "waste", "buildings")
 
-    def list(self, request):
-        cached = cache.get("leaderboard_list")
-        if cached is not None:
-            return Response(cached)
+# Same opt-in `?limit=` contract as /api/emissions/.
+PAGINATED_DEFAULT_LIMIT = 50
+PAGINATED_MAX_LIMIT = 1000
+
+
+def _build_rankings(metric):
+    """
+    `{"all": [...], sector: [...]}` for one metric, each list ordered by
+    its own rank. Empty dict with no active runs.
+    """
+    runs = get_active_runs()
+    if not runs:
+        return {}
+
+    run_sector = {r.id: sector_field(r) for r in runs}
+    field = METRICS[metric]
+    sector_expr = Case(
+        *(When(location__forecast_run_id=run_id, then=Value(sector))
+          for run_id, sector in run_sector.items()),
+        default=Value("energy"),
+        output_field=CharField(),
+    )
+    # Single query: both ranks are window functions over the active runs.
+    rows = (
+        LocationSummary.objects.filter(location__forecast_run_id__in=list(run_sector))
+        .annotate(
+            sector=sector_expr,
+            overall_rank=Window(Rank(), order_by=F(field).desc()),
+            sector_rank=Window(Rank(), partition_by=[sector_expr], order_by=F(field).desc()),
+        )
+        .order_by("overall_rank", "location__source")
+        .values_list(
+            "location__source",
+            "sector",
+            "overall_rank",
+            "sector_rank",
+            field,
+            "forecast_12m_average",
+            "trend",
+            "change_pct",
+        )
+    )
 
-        runs = get_active_runs()
-        if not runs:
-            return Response([])
+    rankings = {"all": []}
+    for source, sector, overall_rank, sector_rank, value, average, trend, change in rows:
+        entry = {
+            "area_id": make_area_id(source, sector),
+            "area_name": source,
+            "sector": sector,
+            "value": value,
+            "emissions": average,
+            "trend": _TREND_MAP.get(trend, "stable"),
+            "trend_percentage": abs(change),
+        }
+        rankings["all"].append({"rank": overall_rank, **entry})
+        rankings.setdefault(sector, []).append({"rank": sector_rank, **entry})
+    # Rows arrive in overall order, which is also each sector's own order.
+    return rankings
 
-        run_ids = [r.id for r in runs]
-        run_sector = {r.id: sector_field(r) for r in runs}
 
-        # Single join: pull every summary across every active run in one query.
-        summaries = (
-            LocationSummary.objects.filter(location__forecast_run_id__in=run_ids)
-            .select_related("location")
+def _cache_key(metric):
+    return dataset_key("leaderboard", metric)
+
+
+def _get_rankings(metric):
+    return get_or_build(_cache_key(metric), lambda: _build_rankings(metric), cache_if=bool)
+
+
+def warm_payloads():
+    """(label, cache_key, build) for `manage.py warm_caches`: one per metric."""
+    for metric in METRICS:
+        yield (
+            f"leaderboard {metric}",
+            _cache_key(metric),
+            lambda m=metric: _build_rankings(m),
         )
 
-        entries = [
-            {
-                "area_id": make_area_id(
-                    s.location.source,
-                    run_sector.get(s.location.forecast_run_id, "energy"),
-                ),
-                "area_name": s.location.source,
-                "emissions": s.forecast_12m_average,
-                "trend": _TREND_MAP.get(s.trend, "stable"),
-                "trend_percentage": abs(s.change_pct),
-            }
-            for s in summaries
-        ]
-        entries.sort(key=lambda x: x["emissions"], reverse=True)
-        results = [{"rank": i + 1, **e} for i, e in enumerate(entries)]
-
-        cache.set("leaderboard_list", results, CACHE_TTL)
-        return Response(results)
+
+class LeaderboardViewSet(viewsets.ViewSet):
+    permission_classes = [AllowAny]
+
+    def list(self, request):
+        params = request.query_params
+        sector = params.get("sector") or "all"
+        metric = params.get("metric") or DEFAULT_METRIC
+        order = params.get("order") or "desc"
+        if sector != "all" and sector not in SECTORS:
+            return Response(
+                {"detail": f"sector must be one of: all, {', '.join(SECTORS)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if metric not in METRICS:
+            return Response(
+                {"detail": f"metric must be one of: {', '.join(METRICS)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if order not in ("desc", "asc"):
+            return Response(
+                {"detail": "order must be desc or asc"}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        ranked = _get_rankings(metric).get(sector, [])
+        if order == "asc":
+            ranked = ranked[::-1]
+
+        if params.get("limit") is None:
+            return Response(ranked)
+        limit, offset = parse_paging(params, PAGINATED_DEFAULT_LIMIT, PAGINATED_MAX_LIMIT)
+        response = Response(ranked[offset : offset + limit])
+        response["X-Total-Count"] = str(len(ranked))
+        return response
@@ -10,14 +10,16 @@ This endpoint returns only true point sources for a given sector,
 explicitly excluding `union_council` and area-aggregate rows.
 """
 
-from django.core.cache import cache
-from django.db.models import Sum
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 
-from api.models import EmissionPoint, Location, LocationSummary
-from api.services.runs import CACHE_TTL, SECTOR_MAP, get_active_runs, sector_field
+from api.models import Location, LocationSummary
+from api.services.caching import get_or_build
+from api.services.generation import dataset_key
+from api.services.rollups import location_totals
+from api.services.runs import SECTOR_MAP, get_active_runs, sector_field
+from api.services.spatial_index import InvalidViewport, viewport_filter, viewport_params
 
 
 # Row types that are *not* point sources and must be excluded.
@@ -37,52 +39,27 @@ _NON_POINT_TYPES = {
 }
 
 
-@api_view(["GET"])
-@permission_classes([AllowAny])
-def point_sources_view(request):
-    """
-    Returns `[{source, type, lat, lng, emissions, summary, sector}]` for
-    a given sector's facility-level locations.
+# Sectors the map can ask for; each gets its own cached list per data_type.
+POINT_SOURCE_SECTORS = ("energy", "industry", "transport", "waste", "buildings")
 
-    Query params:
-        sector:    'energy' | 'industry' | 'transport' | 'waste' | 'buildings'
-                   (default 'energy'). Aliases like 'power' or 'industrial'
-                   map onto the canonical bucket.
-        data_type: 'historical' | 'forecast' (default 'historical')
-    """
-    raw_sector = request.query_params.get("sector", "energy").lower()
-    sector = SECTOR_MAP.get(raw_sector, raw_sector)
 
-    data_type = request.query_params.get("data_type", "historical")
-    if data_type not in ("historical", "forecast"):
-        data_type = "historical"
+def _cache_key(sector, data_type):
+    return dataset_key("point_sources", sector, data_type)
 
-    cache_key = f"point_sources:{sector}:{data_type}"
-    cached = cache.get(cache_key)
-    if cached is not None:
-        return Response(cached)
 
+def _build_point_sources(sector, data_type):
+    """Facility-level locations for one sector, largest emitter first."""
     run_ids = [r.id for r in get_active_runs() if sector_field(r) == sector]
     if not run_ids:
-        return Response([])
+        return []
 
-    # Pull historical *and* forecast totals from EmissionPoint up front. Some
-    # loaders (notably waste) don't populate LocationSummary.forecast_12m_total
-    # or .total_historical_tonnes, so the panel would render empty rows
+    # Pull historical *and* forecast totals per location up front (from the
+    # `location_point_totals` rollup when current). Some loaders (notably
+    # waste) don't populate LocationSummary.forecast_12m_total or
+    # .total_historical_tonnes, so the panel would render empty rows
     # without these — we override the (possibly-zero) summary fields below.
-    def _totals_by_loc(point_type: str) -> dict[int, float]:
-        return {
-            row["location_id"]: float(row["t"] or 0.0)
-            for row in EmissionPoint.objects.filter(
-                location__forecast_run_id__in=run_ids,
-                point_type=point_type,
-            )
-            .values("location_id")
-            .annotate(t=Sum("emissions"))
-        }
-
-    totals_hist = _totals_by_loc("historical")
-    totals_fc = _totals_by_loc("forecast")
+    totals_hist = location_totals(run_ids, "historical")
+    totals_fc = location_totals(run_ids, "forecast")
     totals_active = totals_hist if data_type == "historical" else totals_fc
 
     candidate_ids = set(totals_hist) | set(totals_fc)
@@ -136,6 +113,56 @@ def point_sources_view(request):
             },
         })
     result.sort(key=lambda x: x["emissions"], reverse=True)
+    return result
+
+
+def warm_payloads():
+    """(label, cache_key, build) for `manage.py warm_caches`."""
+    for sector in POINT_SOURCE_SECTORS:
+        for data_type in ("historical", "forecast"):
+            yield (
+                f"point_sources {sector}/{data_type}",
+                _cache_key(sector, data_type),
+                lambda s=sector, d=data_type: _build_point_sources(s, d),
+            )
+
 
-    cache.set(cache_key, result, CACHE_TTL)
-    return Response(result)
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def point_sources_view(request):
+    """
+    Returns `[{source, type, lat, lng, emissions, summary, sector}]` for
+    a given sector's facility-level locations.
+
+    Query params:
+        sector:    'energy' | 'industry' | 'transport' | 'waste' | 'buildings'
+                   (default 'energy'). Aliases like 'power' or 'industrial'
+                   map onto the canonical bucket.
+        data_type: 'historical' | 'forecast' (default 'historical')
+        bbox:      'minLon,minLat,maxLon,maxLat' — only facilities in view
+        zoom:      map zoom level; with `bbox`, keeps only the largest
+                   facility per few-pixel cell
+    """
+    try:
+        bbox, zoom = viewport_params(request.query_params)
+    except InvalidViewport as e:
+        return Response({"detail": str(e)}, status=400)
+
+    raw_sector = request.query_params.get("sector", "energy").lower()
+    sector = SECTOR_MAP.get(raw_sector, raw_sector)
+
+    data_type = request.query_params.get("data_type", "historical")
+    if data_type not in ("historical", "forecast"):
+        data_type = "historical"
+
+    cache_key = _cache_key(sector, data_type)
+    sources = get_or_build(
+        cache_key,
+        lambda: _build_point_sources(sector, data_type),
+        cache_if=bool,
+    )
+    if bbox is not None:
+        sources = viewport_filter(
+            cache_key, sources, lambda p: (p["lng"], p["lat"]), bbox, zoom
+        )
+    return Response(sources)
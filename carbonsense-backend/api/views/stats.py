@@ -4,19 +4,25 @@ Aggregate stats endpoint for the dashboard overview.
 Returns the four scalars the KPI cards display, computed in the database
 rather than by summing thousands of rows in the browser. The response is a
 tiny JSON object that's cheap to gzip and cheap to cache.
+
+Everything except `total_sources` comes from one grouped pass over the
+per-date totals: rows are grouped by run × year, and each point_type's
+date range and sum are separate `FILTER (WHERE point_type = ...)`
+aggregates, so the historical and forecast figures, the per-sector split
+and the per-year split all fall out of the same scan.
 """
 
-from django.core.cache import cache
-from django.db.models import Max, Min, Sum
+from django.db.models import Max, Min, Q, Sum
+from django.db.models.functions import ExtractYear
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 
-from api.models import EmissionPoint, Location
-from api.services.runs import CACHE_TTL, get_active_runs, sector_field
-
-
-_CACHE_KEY = "api_stats"
+from api.models import Location
+from api.services.caching import get_or_build
+from api.services.generation import dataset_key
+from api.services.rollups import monthly_totals
+from api.services.runs import get_active_runs, sector_field
 
 
 _EMPTY_SECTOR_TOTALS = {
@@ -35,23 +41,65 @@ def _empty_stats():
         "years_of_data": 0,
         "total_emissions": 0.0,
         "sector_totals": dict(_EMPTY_SECTOR_TOTALS),
-        "historical": {"years_of_data": 0, "total_emissions": 0.0},
-        "forecast": {"years_of_data": 0, "total_emissions": 0.0},
+        "historical": _empty_type_stats(),
+        "forecast": _empty_type_stats(),
+    }
+
+
+def _empty_type_stats():
+    return {
+        "years_of_data": 0,
+        "total_emissions": 0.0,
+        "sector_totals": dict(_EMPTY_SECTOR_TOTALS),
+        "yearly_totals": {},
     }
 
 
-def _aggregate_for_type(qs, point_type):
-    """Date range + total for a single point_type. Returns (years, total)."""
-    a = qs.filter(point_type=point_type).aggregate(
-        min_date=Min("date"),
-        max_date=Max("date"),
-        total=Sum("emissions"),
+_POINT_TYPES = ("historical", "forecast")
+
+
+def _grouped_totals(qs, value_field, run_field):
+    """
+    One row per run × year with, for each point_type `t`, `t_min`, `t_max`
+    and `t_total` as conditional aggregates.
+    """
+    aggregates = {}
+    for point_type in _POINT_TYPES:
+        only = Q(point_type=point_type)
+        aggregates[f"{point_type}_min"] = Min("date", filter=only)
+        aggregates[f"{point_type}_max"] = Max("date", filter=only)
+        aggregates[f"{point_type}_total"] = Sum(value_field, filter=only)
+    return (
+        qs.filter(point_type__in=_POINT_TYPES)
+        .annotate(year=ExtractYear("date"))
+        .values(run_field, "year")
+        .annotate(**aggregates)
+        .order_by()
     )
-    if a["min_date"] and a["max_date"]:
-        years = a["max_date"].year - a["min_date"].year + 1
-    else:
-        years = 0
-    return years, float(a["total"] or 0.0)
+
+
+def _fold_type_stats(rows, point_type, run_field, run_sector):
+    """Collapse the run × year rows into one point_type's stats block."""
+    stats = _empty_type_stats()
+    first = last = None
+    for row in rows:
+        lo, hi = row[f"{point_type}_min"], row[f"{point_type}_max"]
+        if lo is None:
+            continue
+        first = lo if first is None else min(first, lo)
+        last = hi if last is None else max(last, hi)
+
+        total = float(row[f"{point_type}_total"] or 0.0)
+        sector = run_sector.get(row[run_field], "energy")
+        stats["sector_totals"][sector] = stats["sector_totals"].get(sector, 0.0) + total
+        year = str(row["year"])
+        stats["yearly_totals"][year] = stats["yearly_totals"].get(year, 0.0) + total
+        stats["total_emissions"] += total
+
+    if first and last:
+        stats["years_of_data"] = last.year - first.year + 1
+    stats["yearly_totals"] = dict(sorted(stats["yearly_totals"].items()))
+    return stats
 
 
 def _compute_stats():
@@ -65,48 +113,34 @@ def _compute_stats():
 
     total_sources = Location.objects.filter(forecast_run_id__in=run_ids).count()
 
-    points_qs = EmissionPoint.objects.filter(
-        location__forecast_run_id__in=run_ids,
-    )
-    hist_years, hist_total = _aggregate_for_type(points_qs, "historical")
-    fc_years, fc_total = _aggregate_for_type(points_qs, "forecast")
-
-    # Per-sector totals computed from historical only — that's what the pie
-    # chart is meant to display ("emissions to date by sector"). The forecast
-    # totals are exposed separately under `forecast.total_emissions` for any
-    # consumer that wants them.
-    totals_by_run = (
-        points_qs.filter(point_type="historical")
-        .values("location__forecast_run_id")
-        .annotate(total=Sum("emissions"))
-    )
-    sector_totals = dict(_EMPTY_SECTOR_TOTALS)
-    for row in totals_by_run:
-        sector = run_sector.get(row["location__forecast_run_id"], "energy")
-        sector_totals[sector] = sector_totals.get(sector, 0.0) + float(
-            row["total"] or 0.0
-        )
+    # Per-date rollups when they're current, raw points otherwise.
+    points_qs, value_field, run_field = monthly_totals(run_ids)
+    rows = list(_grouped_totals(points_qs, value_field, run_field))
+    historical = _fold_type_stats(rows, "historical", run_field, run_sector)
+    forecast = _fold_type_stats(rows, "forecast", run_field, run_sector)
 
     # Top-level fields default to *historical* — the intended KPI shape that
     # matches the existing UI ("Total Emissions", "Years of Data" mean the
-    # data we've measured, not anything we've projected forward).
+    # data we've measured, not anything we've projected forward). The pie
+    # chart's `sector_totals` is likewise historical ("emissions to date by
+    # sector"); the forecast split is under `forecast.sector_totals`.
     return {
         "total_sources": total_sources,
         "sectors_tracked": len(sectors),
-        "years_of_data": hist_years,
-        "total_emissions": hist_total,
-        "sector_totals": sector_totals,
-        "historical": {"years_of_data": hist_years, "total_emissions": hist_total},
-        "forecast": {"years_of_data": fc_years, "total_emissions": fc_total},
+        "years_of_data": historical["years_of_data"],
+        "total_emissions": historical["total_emissions"],
+        "sector_totals": dict(historical["sector_totals"]),
+        "historical": historical,
+        "forecast": forecast,
     }
 
 
+def warm_payloads():
+    """(label, cache_key, build) for `manage.py warm_caches`."""
+    yield "stats", dataset_key("api_stats"), _compute_stats
+
+
 @api_view(["GET"])
 @permission_classes([AllowAny])
 def stats_view(request):
-    cached = cache.get(_CACHE_KEY)
-    if cached is not None:
-        return Response(cached)
-    stats = _compute_stats()
-    cache.set(_CACHE_KEY, stats, CACHE_TTL)
-    return Response(stats)
+    return Response(get_or_build(dataset_key("api_stats"), _compute_stats))
@@ -0,0 +1,105 @@
+"""
+Vector tiles for the UC choropleth — `/api/tiles/{z}/{x}/{y}.mvt`.
+
+The map used to fetch `/api/uc-summary/` plus the full `lahore_ucs.geojson`
+and join them client-side; at city zoom that's every vertex of all 151
+polygons on every pan. Tiles carry only the polygons that touch them,
+clipped and snapped to the tile grid, with the values the choropleth
+colours by attached as feature properties:
+
+    uc_code, uc_name, display_t, <sector>_t (for each sector the UC has)
+
+Takes the same `data_type` / `view_mode` / `month` (and window `start` /
+`end`) params as `/api/uc-summary/`; `all_months` isn't a choropleth and
+falls back to `yearly`. Encoded tiles are kept in a per-process LRU keyed
+by the summary's cache key (which carries the dataset version) and z/x/y,
+so a data reload invalidates them; the LRU is bounded by total bytes as
+well as tile count. A tile no UC touches is a 204 with no body.
+"""
+
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes, renderer_classes
+from rest_framework.permissions import AllowAny
+from rest_framework.renderers import BaseRenderer
+from rest_framework.response import Response
+
+from api.services.emissions_cube import SECTORS
+from api.services.uc_summary import get_summary, normalize_summary_params, summary_cache_key
+from api.services.vector_tiles import render_uc_tile, valid_tile
+
+# Encoded tiles kept per process. A full city view at z10–z14 is a few
+# hundred tiles per param combination, at up to tens of KB each (more at
+# low zoom), so the byte budget is what normally binds.
+MAX_TILES = 4096
+MAX_TILE_BYTES = getattr(settings, "TILE_CACHE_MAX_BYTES", 32 * 1024 * 1024)
+
+
+class MVTRenderer(BaseRenderer):
+    media_type = "application/vnd.mapbox-vector-tile"
+    format = "mvt"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return data if isinstance(data, bytes) else b""
+
+
+_lock = threading.Lock()
+_tiles = OrderedDict()
+_tile_bytes = 0
+
+
+def _tile_properties(data_type, view_mode, target_month):
+    """uc_code → `{display_t, <sector>_t}` from the cached UC summary."""
+    properties = {}
+    for entry in get_summary(data_type, view_mode, target_month):
+        props = {"display_t": entry["display_t"]}
+        for sector in SECTORS:
+            block = entry["sectors"].get(sector)
+            if isinstance(block, dict):
+                props[f"{sector}_t"] = block["display_t"]
+        properties[entry["uc_code"]] = props
+    return properties
+
+
+def _get_tile(data_type, view_mode, target_month, z, x, y):
+    global _tile_bytes
+    key = f"{summary_cache_key(data_type, view_mode, target_month)}:tile:{z}/{x}/{y}"
+    with _lock:
+        tile = _tiles.get(key)
+        if tile is not None:
+            _tiles.move_to_end(key)
+            return tile
+    tile = render_uc_tile(z, x, y, _tile_properties(data_type, view_mode, target_month))
+    if len(tile) > MAX_TILE_BYTES // 4:
+        return tile  # too big to be worth a quarter of the budget
+    with _lock:
+        previous = _tiles.pop(key, None)
+        if previous is not None:
+            _tile_bytes -= len(previous)
+        _tiles[key] = tile
+        _tile_bytes += len(tile)
+        while len(_tiles) > MAX_TILES or _tile_bytes > MAX_TILE_BYTES:
+            _, evicted = _tiles.popitem(last=False)
+            _tile_bytes -= len(evicted)
+    return tile
+
+
+@api_view(["GET"])
+@permission_classes([AllowAny])
+@renderer_classes([MVTRenderer])
+def uc_tile(request, z, x, y):
+    """One MVT tile with a `ucs` polygon layer; 204 if no UC touches it."""
+    if not valid_tile(z, x, y):
+        return Response(status=status.HTTP_404_NOT_FOUND)
+    data_type, view_mode, target_month = normalize_summary_params(request.query_params)
+    if view_mode == "all_months":
+        view_mode = "yearly"
+    tile = _get_tile(data_type, view_mode, target_month, z, x, y)
+    if not tile:
+        return Response(status=status.HTTP_204_NO_CONTENT)
+    return Response(tile)
@@ -0,0 +1,47 @@
+"""
+UC boundary endpoint — simplified TopoJSON for the map's outlines.
+
+    GET /api/uc-boundaries/?zoom=10
+
+Returns the `lahore_ucs.geojson` polygons as a TopoJSON `Topology` with
+quantised, delta-encoded arcs (shared UC borders stored once), simplified
+to about one pixel at `zoom`. Zooms below `MIN_ZOOM` get `MIN_ZOOM`'s
+geometry; without `zoom`, or past `MAX_ZOOM`, the full-detail topology.
+Each zoom level is cached per dataset version and warmed by
+`manage.py warm_caches`.
+"""
+
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+
+from api.services.caching import get_or_build
+from api.services.generation import dataset_key
+from api.services.spatial_index import InvalidViewport, parse_zoom
+from api.services.uc_topology import MAX_ZOOM, MIN_ZOOM, effective_zoom, topology
+
+
+def _cache_key(zoom):
+    return dataset_key("uc_boundaries", "full" if zoom is None else zoom)
+
+
+def warm_payloads():
+    """(label, cache_key, build) for `manage.py warm_caches`: every zoom level + full."""
+    for zoom in (*range(MIN_ZOOM, MAX_ZOOM + 1), None):
+        yield (
+            f"uc_boundaries z{'full' if zoom is None else zoom}",
+            _cache_key(zoom),
+            lambda z=zoom: topology(z),
+        )
+
+
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def uc_boundaries_view(request):
+    raw_zoom = request.query_params.get("zoom")
+    try:
+        zoom = effective_zoom(parse_zoom(raw_zoom) if raw_zoom else None)
+    except InvalidViewport as e:
+        return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(get_or_build(_cache_key(zoom), lambda: topology(zoom)))
@@ -1,179 +1,165 @@
 """
 UC summary endpoint — one entry per Union Council, joining all sector data.
 
-This is the heaviest endpoint by far: it parses four JSON files (transport,
-buildings, waste, industry) and joins them into 151 UC entries. The parse
-cost is paid once per worker (in-process JSON cache); per-request cost is
-the join + the response cache.
+The payloads themselves are built and cached in `api.services.uc_summary`
+(shared with `/api/tiles/`); this module adds the response shapes —
+`fields=` projection, `format=columnar` and the per-UC `retrieve`.
 """
 
-from django.core.cache import cache
 from rest_framework import viewsets
+from rest_framework.negotiation import DefaultContentNegotiation
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 
-from api.services.data_files import (
-    build_buildings_by_uc,
-    build_industry_by_uc,
-    build_transport_by_uc,
-    build_waste_by_uc,
-    find_month_index,
-    get_monthly_dates,
-    load_data_file,
+from api.services.caching import get_or_build
+from api.services.emissions_cube import DATA_TYPES, SECTORS, get_cube
+from api.services.json_projection import compile_projection, project
+from api.services.uc_summary import (
+    build_month_matrix,
+    build_summary,
+    get_summary,
+    normalize_summary_params,
+    summary_cache_key,
 )
-from api.services.runs import CACHE_TTL, safe_float
-
-
-def _build_summary(data_type, view_mode, target_month):
-    """Pure function: build the full 151-UC summary list. Cacheable."""
-    transport_by_uc = build_transport_by_uc(data_type)
-    buildings_by_uc = build_buildings_by_uc(data_type)
-    waste_by_uc = build_waste_by_uc(data_type)
-    industry_by_uc = build_industry_by_uc(data_type)
-    # Energy is *not* allocated to UCs: power plants are point sources with
-    # fixed coordinates, not entities that belong to a Union Council. They
-    # are exposed separately via /api/power-plants/ so the frontend can
-    # render them as map markers. We deliberately set the per-UC energy
-    # share to 0 here so the choropleth and totals don't include a
-    # misleading uniform value.
-    energy_total = 0.0
-
-    sector_dates = get_monthly_dates(data_type)
-
-    month_indices = {}
-    month_label = ""
-    if view_mode == "monthly" and target_month:
-        for sector_key, dates in sector_dates.items():
-            month_indices[sector_key] = find_month_index(dates, target_month)
-        month_label = target_month
-
-    buildings_data = load_data_file("carbonsense_buildings_v15.json")
-    transport_data = load_data_file("carbonsense_transport_v16.json")
-    transport_meta = {
-        uc["uc_code"]: uc for uc in transport_data.get("uc_emissions", [])
+
+# Entry keys that are identical for every UC in one response. Columnar mode
+# sends them once at the top level instead of 151 times.
+_SHARED_KEYS = ("data_type", "view_mode", "month_label", "available_months")
+
+
+def _month_matrix_row(matrix, uc_code):
+    """One UC's slice of `build_month_matrix`, or None."""
+    try:
+        i = matrix["uc_codes"].index(uc_code)
+    except ValueError:
+        return None
+    return {
+        "uc_code": uc_code,
+        "uc_name": matrix["uc_names"][i],
+        "data_type": matrix["data_type"],
+        "view_mode": matrix["view_mode"],
+        "months": matrix["months"],
+        "sectors": {s: rows[i] for s, rows in matrix["sectors"].items()},
+        "energy": matrix["energy"][i],
+        "display_t": matrix["display_t"][i],
     }
-    buildings_meta = {
-        uc["uc_code"]: uc for uc in buildings_data.get("uc_data", [])
+
+
+def _normalize_shape(request):
+    """
+    `(fields, columnar)` from `?fields=` and `?format=`.
+
+    `fields` is a sorted tuple of dotted paths (`display_t`,
+    `sectors.transport.display_t`, …) with `uc_code` always included, or
+    None for the full entry.
+    """
+    raw = request.query_params.get("fields", "")
+    paths = {p.strip() for p in raw.split(",") if p.strip()}
+    fields = tuple(sorted(paths | {"uc_code"})) if paths else None
+    columnar = request.query_params.get("format") == "columnar"
+    return fields, columnar
+
+
+def _project_entries(entries, fields):
+    if fields is None:
+        return entries
+    spec = compile_projection(fields)
+    return [project(entry, spec) for entry in entries]
+
+
+def _columns(values):
+    """
+    Transpose a list of per-UC values into parallel arrays.
+
+    Dicts become dicts of columns (recursively, over the union of their
+    keys); anything else — numbers, strings, `monthly_t` lists — is kept
+    as one array element per UC. A sector a UC has no data for stays
+    `None` in every one of that sector's columns.
+    """
+    if not any(isinstance(v, dict) for v in values):
+        return list(values)
+    keys = dict.fromkeys(k for v in values if isinstance(v, dict) for k in v)
+    return {
+        k: _columns([v.get(k) if isinstance(v, dict) else None for v in values])
+        for k in keys
     }
 
-    all_codes = sorted(set(transport_meta) | set(buildings_meta))
-    n_ucs = len(all_codes) or 1
-
-    if view_mode == "monthly":
-        n_months_energy = max(len(sector_dates.get("buildings", [])), 1)
-        energy_share = (energy_total / n_months_energy) / n_ucs
-    else:
-        energy_share = energy_total / n_ucs
-
-    all_dates = sorted(
-        set(
-            sector_dates.get("transport", [])
-            + sector_dates.get("buildings", [])
-            + sector_dates.get("waste", [])
-            + sector_dates.get("industry", [])
-        )
-    )
-    available_months = sorted({d[:7] for d in all_dates})
-
-    def _display(sector_data, sector_key, annual_key="annual_t"):
-        if not sector_data:
-            return 0.0
-        if view_mode == "yearly":
-            return safe_float(sector_data.get(annual_key))
-        idx = month_indices.get(sector_key, -1)
-        mt = sector_data.get("monthly_t", [])
-        if 0 <= idx < len(mt):
-            return safe_float(mt[idx])
-        return 0.0
-
-    results = []
-    for uc_code in all_codes:
-        tmeta = transport_meta.get(uc_code, {})
-        bmeta = buildings_meta.get(uc_code, {})
-        uc_name = tmeta.get("uc_name") or bmeta.get("uc_name", "")
-        area_km2 = safe_float(tmeta.get("area_km2") or bmeta.get("area_km2"))
-        lat = safe_float(
-            tmeta.get("centroid_lat")
-            or (bmeta.get("coordinates", {}).get("lat"))
-        )
-        lon = safe_float(
-            tmeta.get("centroid_lon")
-            or (bmeta.get("coordinates", {}).get("lon"))
-        )
 
-        t_data = transport_by_uc.get(uc_code)
-        b_data = buildings_by_uc.get(uc_code)
-        w_data = waste_by_uc.get(uc_code)
-        i_data = industry_by_uc.get(uc_code)
-
-        t_display = _display(t_data, "transport")
-        b_display = _display(b_data, "buildings", "total_t")
-        w_display = _display(w_data, "waste")
-        i_display = _display(i_data, "industry")
-
-        if t_data:
-            t_data = {**t_data, "display_t": round(t_display, 2)}
-        if b_data:
-            b_data = {**b_data, "display_t": round(b_display, 2)}
-        if w_data:
-            w_data = {**w_data, "display_t": round(w_display, 2)}
-        if i_data:
-            i_data = {**i_data, "display_t": round(i_display, 2)}
-
-        total_display = (
-            t_display + b_display + w_display + i_display + energy_share
+def _to_columnar(entries, data_type, view_mode, month_label):
+    """
+    One object with the shared fields and date axes sent once and every
+    per-UC field as a parallel array ordered like `uc_code`. `month_label`
+    is the one `build_summary` settled on (e.g. a clipped window).
+    """
+    cube = get_cube(data_type)
+    payload = {
+        "format": "columnar",
+        "data_type": data_type,
+        "view_mode": view_mode,
+        "month_label": month_label,
+        "available_months": cube.months,
+        # `sectors.<sector>.monthly_t[i]` is aligned with `sector_months[sector]`.
+        "sector_months": {
+            sector: [d[:7] for d in cube.sector_dates.get(sector, [])]
+            for sector in SECTORS
+        },
+        "count": len(entries),
+    }
+    rows = [{k: v for k, v in e.items() if k not in _SHARED_KEYS} for e in entries]
+    payload["columns"] = _columns(rows) if rows else {}
+    return payload
+
+
+def _get_shaped_summary(data_type, view_mode, target_month, fields, columnar):
+    """The cached list, projected and/or transposed; cached per shape."""
+    if view_mode == "all_months" or (fields is None and not columnar):
+        # The month matrix is already columnar.
+        return get_summary(data_type, view_mode, target_month)
+    shape = f"{'columnar' if columnar else 'rows'}_{','.join(fields or ())}"
+
+    def build():
+        summary = get_summary(data_type, view_mode, target_month)
+        entries = _project_entries(summary, fields)
+        if columnar:
+            month_label = summary[0]["month_label"] if summary else ""
+            entries = _to_columnar(entries, data_type, view_mode, month_label)
+        return entries
+
+    return get_or_build(f"{summary_cache_key(data_type, view_mode, target_month)}:{shape}", build)
+
+
+def warm_payloads():
+    """
+    (label, cache_key, build) for `manage.py warm_caches`: the yearly view
+    and every available month, for both data types.
+    """
+    for data_type in DATA_TYPES:
+        combos = [("yearly", "")]
+        combos += [("monthly", m) for m in get_cube(data_type).months]
+        for view_mode, month in combos:
+            yield (
+                f"uc_summary {data_type}/{view_mode}{'/' + month if month else ''}",
+                summary_cache_key(data_type, view_mode, month),
+                lambda d=data_type, v=view_mode, m=month: build_summary(d, v, m),
+            )
+        yield (
+            f"uc_summary {data_type}/all_months",
+            summary_cache_key(data_type, "all_months", ""),
+            lambda d=data_type: build_month_matrix(d),
         )
 
-        results.append({
-            "uc_code": uc_code,
-            "uc_name": uc_name,
-            "area_km2": area_km2,
-            "centroid": [lat, lon],
-            "data_type": data_type,
-            "view_mode": view_mode,
-            "month_label": month_label,
-            "sectors": {
-                "transport": t_data,
-                "buildings": b_data,
-                "waste": w_data,
-                "industry": i_data,
-                "energy": round(energy_share, 2),
-            },
-            "display_t": round(total_display, 2),
-            "total_annual_t": round(
-                (t_data["annual_t"] if t_data else 0)
-                + (b_data["total_t"] if b_data else 0)
-                + (w_data["annual_t"] if w_data else 0)
-                + (i_data["annual_t"] if i_data else 0)
-                + (energy_total / n_ucs),
-                2,
-            ),
-            "available_months": available_months,
-        })
-
-    return results
-
-
-def _normalize_params(request):
-    data_type = request.query_params.get("data_type", "forecast")
-    if data_type not in ("historical", "forecast"):
-        data_type = "forecast"
-    view_mode = request.query_params.get("view_mode", "yearly")
-    if view_mode not in ("monthly", "yearly"):
-        view_mode = "yearly"
-    target_month = request.query_params.get("month", "")
-    return data_type, view_mode, target_month
-
-
-def _get_cached_summary(data_type, view_mode, target_month):
-    """Cache the full 151-entry list keyed by params; build on miss."""
-    cache_key = f"uc_summary_{data_type}_{view_mode}_{target_month}"
-    cached = cache.get(cache_key)
-    if cached is not None:
-        return cached
-    results = _build_summary(data_type, view_mode, target_month)
-    cache.set(cache_key, results, CACHE_TTL)
-    return results
+
+class _ShapeAwareNegotiation(DefaultContentNegotiation):
+    """
+    DRF reads `?format=` as a renderer override and 404s on unknown values;
+    `format=columnar` is a payload shape here, so it leaves renderer choice
+    to the Accept header.
+    """
+
+    def filter_renderers(self, renderers, format):
+        if format == "columnar":
+            return renderers
+        return super().filter_renderers(renderers, format)
 
 
 class UCSummaryViewSet(viewsets.ViewSet):
@@ -182,21 +168,41 @@ class UCSummaryViewSet(viewsets.ViewSet):
 
     Query params:
         data_type:  'historical' | 'forecast'   (default: 'forecast')
-        view_mode:  'monthly'    | 'yearly'     (default: 'yearly')
+        view_mode:  'monthly' | 'yearly' | 'all_months'   (default: 'yearly')
+                    'all_months' returns the UC × month × sector matrix
+                    in one object (see `build_month_matrix`)
+                    'window' sums each sector over `start`..`end`
         month:      'YYYY-MM'                   (only used when view_mode=monthly)
+        start, end: 'YYYY-MM', inclusive        (only used when view_mode=window;
+                    either may be omitted for an open-ended range)
+        fields:     comma-separated dotted paths to keep, e.g.
+                    'display_t,sectors.transport.display_t' (default: all;
+                    `uc_code` is always kept)
+        format:     'columnar' to send shared fields and date axes once and
+                    per-UC values as parallel arrays under `columns`
     """
 
     permission_classes = [AllowAny]
+    content_negotiation_class = _ShapeAwareNegotiation
 
     def list(self, request):
-        data_type, view_mode, target_month = _normalize_params(request)
-        return Response(_get_cached_summary(data_type, view_mode, target_month))
+        data_type, view_mode, target_month = normalize_summary_params(request.query_params)
+        fields, columnar = _normalize_shape(request)
+        return Response(
+            _get_shaped_summary(data_type, view_mode, target_month, fields, columnar)
+        )
 
     def retrieve(self, request, pk=None):
         # Use the cached list (build once, filter in memory) — was previously
         # rebuilding the entire 151-UC list per request.
-        data_type, view_mode, target_month = _normalize_params(request)
-        for entry in _get_cached_summary(data_type, view_mode, target_month):
+        data_type, view_mode, target_month = normalize_summary_params(request.query_params)
+        if view_mode == "all_months":
+            row = _month_matrix_row(get_summary(data_type, view_mode, ""), pk)
+            if row is None:
+                return Response({"detail": "Not found."}, status=404)
+            return Response(row)
+        fields, _ = _normalize_shape(request)
+        for entry in get_summary(data_type, view_mode, target_month):
             if entry["uc_code"] == pk:
-                return Response(entry)
+                return Response(_project_entries([entry], fields)[0])
         return Response({"detail": "Not found."}, status=404)
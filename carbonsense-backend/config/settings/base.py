@@ -70,6 +70,27 @@ TEMPLATES = [
 WSGI_APPLICATION = "config.wsgi.application"
 
 
+# Data files
+
+# Compiled, memory-mapped snapshot of data/*.json (manage.py compile_data_snapshot).
+DATA_SNAPSHOT_DIR = str(BASE_DIR / "data" / "snapshot")
+# How often (seconds) a worker re-stats a loaded data file to pick up changes.
+DATA_FILE_CHECK_INTERVAL = float(os.environ.get("DATA_FILE_CHECK_INTERVAL", "5"))
+
+
+# API response cache
+
+# Keys are namespaced by dataset generation, so loads invalidate instantly;
+# the TTL only bounds how long superseded entries linger.
+API_CACHE_TTL = int(os.environ.get("API_CACHE_TTL", str(7 * 24 * 3600)))
+# After this many seconds a cached payload is served stale while one worker
+# rebuilds it in the background (api.services.caching).
+API_CACHE_SOFT_TTL = int(os.environ.get("API_CACHE_SOFT_TTL", "3600"))
+# How long (seconds) a process trusts its cached generation before re-reading
+# the dataset_generation row.
+DATASET_GENERATION_TTL = int(os.environ.get("DATASET_GENERATION_TTL", "60"))
+
+
 # Password validation
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -53,13 +53,24 @@ CORS_ALLOW_CREDENTIALS = True
 
 REDIS_URL = os.environ.get("REDIS_URL", "")
 if REDIS_URL:
+    # Redis is the shared source of truth; each process keeps a bounded LRU
+    # of deserialised hot payloads in front of it (api.services.tiered_cache).
     CACHES = {
         "default": {
+            "BACKEND": "api.services.tiered_cache.TieredCache",
+            "TIMEOUT": 300,
+            "OPTIONS": {
+                "SHARED_ALIAS": "shared",
+                "LOCAL_MAX_ENTRIES": int(os.environ.get("CACHE_LOCAL_MAX_ENTRIES", "512")),
+                "LOCAL_MAX_BYTES": int(os.environ.get("CACHE_LOCAL_MAX_MB", "128")) * 1024 * 1024,
+            },
+        },
+        "shared": {
             "BACKEND": "django_redis.cache.RedisCache",
             "LOCATION": REDIS_URL,
             "OPTIONS": {"CLIENT_CLASS": "django_redis.client.DefaultClient"},
             "TIMEOUT": 300,
-        }
+        },
     }
 else:
     CACHES = {
@@ -23,12 +23,41 @@ from recommendations.pipeline_tracer import PipelineTracer
 logger = logging.getLogger(__name__)
 
 
+# Only the paths `_load_uc_data` reads — the streaming reader skips the rest
+# (monthly series, rag_chunks, point_sources, …).
+_UC_DATA_FIELDS = {
+    'carbonsense_transport_v16.json': tuple(
+        f'uc_emissions.*.{key}'
+        for key in (
+            'uc_code', 'uc_name', 'area_km2', 'historical.total_t', 'historical.period',
+            'dominant_source', 'risk_flags',
+            *(
+                f'forecast.{field}'
+                for field in (
+                    'annual_t', 'road_annual_t', 'dom_avi_annual_t', 'intl_avi_annual_t',
+                    'rail_annual_t', 'road_pct', 'intensity_t_per_km2', 'rank_in_division',
+                )
+            ),
+        )
+    ),
+    'carbonsense_buildings_v15.json': tuple(
+        f'uc_data.*.{key}'
+        for key in ('uc_code', 'uc_name', 'annual_emissions', 'risk')
+    ),
+    'carbonsense_per_location_waste_v2_3.json': tuple(
+        f'aggregate_forecast.uc_allocation.*.{key}'
+        for key in ('uc_code', 'uc_name', 'emissions')
+    ),
+}
+
+
 def _load_uc_data(area_name, sector, coordinates):
     """Load real UC emission data from JSON files for the given area."""
-    import os
-    from django.conf import settings
+    from api.services.data_files import load_data_file
+
+    def _load(filename):
+        return load_data_file(filename, _UC_DATA_FIELDS[filename])
 
-    data_dir = os.path.join(settings.BASE_DIR, 'data')
     uc_data = {
         'area_name': area_name,
         'sector': sector,
@@ -47,8 +76,7 @@ def _load_uc_data(area_name, sector, coordinates):
 
     # Transport
     try:
-        with open(os.path.join(data_dir, 'carbonsense_transport_v16.json'), encoding='utf-8') as f:
-            t = json.load(f)
+        t = _load('carbonsense_transport_v16.json')
         for uc in t.get('uc_emissions', []):
             if uc.get('uc_name', '').lower().strip() == name_lower:
                 fc = uc.get('forecast', {})
@@ -75,8 +103,7 @@ def _load_uc_data(area_name, sector, coordinates):
 
     # Buildings
     try:
-        with open(os.path.join(data_dir, 'carbonsense_buildings_v15.json'), encoding='utf-8') as f:
-            b = json.load(f)
+        b = _load('carbonsense_buildings_v15.json')
         for uc in b.get('uc_data', []):
             if uc.get('uc_name', '').lower().strip() == name_lower:
                 ae = uc.get('annual_emissions', {})
@@ -96,8 +123,7 @@ def _load_uc_data(area_name, sector, coordinates):
 
     # Waste
     try:
-        with open(os.path.join(data_dir, 'carbonsense_per_location_waste_v2_3.json'), encoding='utf-8') as f:
-            w = json.load(f)
+        w = _load('carbonsense_per_location_waste_v2_3.json')
         for uc in w.get('aggregate_forecast', {}).get('uc_allocation', []):
             if uc.get('uc_name', '').lower().strip() == name_lower:
                 em = uc.get('emissions', {})
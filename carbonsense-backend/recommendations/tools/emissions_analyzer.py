@@ -13,8 +13,9 @@ import hashlib
 
 from django.db.models import Avg, Sum
 from api.models import (
-    ForecastRun, Location, EmissionPoint, LocationSummary, make_area_id,
+    ForecastRun, Location, EmissionPoint, LocationSummary,
 )
+from api.services.area_index import location_ids_for_area
 
 SECTORS = ["transport", "industry", "energy", "waste", "buildings"]
 
@@ -165,13 +166,19 @@ class EmissionsAnalyzer:
     @staticmethod
     def _find_location(area_id: str):
         """Find Location, sector, and ForecastRun by area_id slug."""
-        runs = ForecastRun.objects.filter(is_active=True)
-        for run in runs:
-            sector = SECTOR_MAP.get(run.sector.lower(), "energy")
-            for loc in Location.objects.filter(forecast_run=run):
-                if make_area_id(loc.source, sector) == area_id:
-                    return loc, sector, run
-        return None, None, None
+        loc_ids = location_ids_for_area(area_id)
+        if not loc_ids:
+            return None, None, None
+        loc = (
+            Location.objects.select_related("forecast_run")
+            .filter(id__in=loc_ids, forecast_run__is_active=True)
+            .order_by("id")
+            .first()
+        )
+        if loc is None:
+            return None, None, None
+        run = loc.forecast_run
+        return loc, SECTOR_MAP.get(run.sector.lower(), "energy"), run
 
     @staticmethod
     def _get_sector_totals(source_name: str) -> dict: